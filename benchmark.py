@@ -0,0 +1,216 @@
+import os
+import json
+import time
+import argparse
+import tempfile
+
+from main import GoogleDriveTopicModelling
+from fake_drive import FakeDrivePool
+from synthetic_corpus import generar_corpus
+from onnx_embedder import EMBEDDING_BACKENDS
+
+# Tamaños (número de grupos) que se miden si no se indican otros
+DEFAULT_SIZES = [10, 100, 1000]
+
+# Columnas de keywords de los resultados
+KEYWORD_COLUMNS = [f'keyword {i+1}' for i in range(5)]
+
+
+def run_benchmark(n_grupos, latency=0.0, error_rate=0.0, bandwidth=None, max_workers=8,
+                  use_pipeline=True, docx_engine='stream', incremental=False, seed=0, keybert_model=None,
+                  embedding_backend='pytorch', reference_keywords=None):
+    """
+    Procesa un árbol sintético de n_grupos grupos con un Drive simulado y mide la ejecución
+
+    Args:
+        n_grupos (int): Número de grupos del árbol sintético
+        latency (float): Latencia simulada por petición a Drive, en segundos
+        error_rate (float): Probabilidad de error por petición a Drive
+        bandwidth (float): Bytes por segundo de las descargas (None = sin límite)
+        max_workers (int): Hilos de procesamiento
+        use_pipeline (bool): Usar el pipeline por etapas
+        docx_engine (str): Lector de documentos ('stream' o 'python-docx')
+        incremental (bool): Repetir la ejecución con el manifiesto ya cargado
+        seed (int): Semilla del corpus y de los errores inyectados
+        keybert_model (KeyBERT): Modelo ya cargado, compartido entre tamaños
+        embedding_backend (str): Backend de embeddings con que se cargó keybert_model
+        reference_keywords (dict): Keywords por ID de archivo de otro backend (el de
+            referencia) sobre el mismo corpus, para medir cuánto coinciden
+
+    Returns:
+        dict: Resultado de la ejecución en frío (y de la incremental, si se pidió), con
+            las keywords obtenidas por ID de archivo en 'keywords'
+    """
+    service, parent_id = generar_corpus(
+        n_grupos, seed=seed, latency=latency, error_rate=error_rate, bandwidth=bandwidth
+    )
+
+    with tempfile.TemporaryDirectory(prefix="benchmark_") as tmp_dir:
+        topic_model = GoogleDriveTopicModelling(
+            language='spanish',
+            manifest_path=os.path.join(tmp_dir, 'manifest.json'),
+            max_workers=max_workers,
+            embedding_cache_dir=None,
+            docx_engine=docx_engine,
+            use_pipeline=use_pipeline,
+            keybert_model=keybert_model,
+            search_index_path=os.path.join(tmp_dir, 'indice_busqueda.sqlite'),
+            vector_index_path=os.path.join(tmp_dir, 'indice_semantico.npz'),
+            metrics_dir=None,
+            blob_cache_dir=os.path.join(tmp_dir, 'cache_documentos'),
+            embedding_backend=embedding_backend
+        )
+        topic_model.use_drive_pool(FakeDrivePool(service))
+
+        result = {'grupos': n_grupos, 'backend': embedding_backend}
+        result['frio'], result_df = _measure(topic_model, service, parent_id)
+        if incremental:
+            result['incremental'], _ = _measure(topic_model, service, parent_id)
+
+        result['keywords'] = {
+            file_id: [keyword for keyword in row if keyword] for file_id, row in result_df[KEYWORD_COLUMNS].iterrows()
+        } if not result_df.empty else {}
+        if reference_keywords is not None:
+            result['coincidencia_keywords'] = keyword_agreement(reference_keywords, result['keywords'])
+        return result
+
+
+def keyword_agreement(reference, keywords):
+    """
+    Fracción promedio de las keywords de referencia que se repiten en otro resultado,
+    por proyecto (1.0 = mismas keywords en todos los proyectos)
+
+    Args:
+        reference (dict): Keywords por ID de archivo del resultado de referencia
+        keywords (dict): Keywords por ID de archivo del resultado a comparar
+
+    Returns:
+        float: Coincidencia promedio, o None si no hay proyectos en común
+    """
+    shared = [file_id for file_id in reference if file_id in keywords and reference[file_id]]
+    if not shared:
+        return None
+    return round(sum(
+        len(set(reference[file_id]) & set(keywords[file_id])) / len(reference[file_id]) for file_id in shared
+    ) / len(shared), 3)
+
+
+def _measure(topic_model, service, parent_id):
+    """
+    Ejecuta process_all_diplomados una vez y junta el tiempo total, el reporte por etapa
+    y las peticiones recibidas por el Drive simulado
+
+    Returns:
+        tuple: (medición, DataFrame de resultados)
+    """
+    calls_before = dict(service.calls)
+    errors_before = service.injected_errors
+
+    start = time.perf_counter()
+    result_df = topic_model.process_all_diplomados(parent_id, top_keywords=5)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'segundos': round(elapsed, 3),
+        'proyectos': len(result_df),
+        'proyectos_por_segundo': round(len(result_df) / elapsed, 3) if elapsed > 0 else 0.0,
+        'peticiones_drive': {kind: count - calls_before.get(kind, 0) for kind, count in service.calls.items()},
+        'errores_inyectados': service.injected_errors - errors_before,
+        'planificador': topic_model.drive_scheduler.stats(),
+        'etapas': topic_model.metrics.report()['etapas'],
+    }, result_df
+
+
+def print_result(result):
+    """
+    Muestra el resultado de un tamaño como tabla de texto
+    """
+    for run_name in ('frio', 'incremental'):
+        run = result.get(run_name)
+        if run is None:
+            continue
+
+        print(f"\n📊 {result['grupos']} grupos ({run_name}, {result['backend']}): {run['proyectos']} proyectos en "
+              f"{run['segundos']:.2f}s ({run['proyectos_por_segundo']:.1f} proyectos/s)")
+        print(f"   Peticiones a Drive: {run['peticiones_drive']} | Errores inyectados: {run['errores_inyectados']} | "
+              f"Reintentos: {run['planificador']['reintentos']} | "
+              f"Concurrencia final: {run['planificador']['limite_concurrencia']}")
+        print(f"   {'Etapa':<18}{'Llamadas':>9}{'Errores':>9}{'Elementos':>11}{'Segundos':>10}"
+              f"{'Elem/s':>10}{'p50':>9}{'p95':>9}")
+        for name, stage in run['etapas'].items():
+            print(f"   {name:<18}{stage['llamadas']:>9}{stage['errores']:>9}{stage['elementos']:>11}"
+                  f"{stage['segundos']:>10.3f}{stage['elementos_por_segundo']:>10.1f}"
+                  f"{stage['latencia']['p50']:>9.4f}{stage['latencia']['p95']:>9.4f}")
+
+    if result.get('coincidencia_keywords') is not None:
+        print(f"   Coincidencia de keywords con la referencia: {result['coincidencia_keywords']:.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Mide el procesamiento de sistematizaciones con un Drive simulado y un corpus sintético"
+    )
+    parser.add_argument('--grupos', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Tamaños a medir (número de grupos)")
+    parser.add_argument('--latencia', type=float, default=0.05,
+                        help="Latencia simulada por petición a Drive, en segundos")
+    parser.add_argument('--errores', type=float, default=0.0,
+                        help="Probabilidad de error (403/429/5xx) por petición a Drive")
+    parser.add_argument('--ancho-banda', type=float, default=None,
+                        help="Bytes por segundo de las descargas (sin límite si no se indica)")
+    parser.add_argument('--workers', type=int, default=8, help="Hilos de procesamiento")
+    parser.add_argument('--sin-pipeline', action='store_true',
+                        help="Procesar sin el pipeline por etapas")
+    parser.add_argument('--motor', choices=['stream', 'python-docx'], default='stream',
+                        help="Lector de documentos")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Repetir cada ejecución con el manifiesto ya cargado")
+    parser.add_argument('--seed', type=int, default=0, help="Semilla del corpus y de los errores")
+    parser.add_argument('--backends', nargs='+', choices=EMBEDDING_BACKENDS, default=['pytorch'],
+                        help="Backends de embeddings a medir; el primero es la referencia de las keywords")
+    parser.add_argument('--hilos', type=int, default=None,
+                        help="Hilos intra-op de la inferencia en CPU (por defecto, los del backend)")
+    parser.add_argument('--json', help="Guardar los resultados en este archivo JSON")
+    args = parser.parse_args()
+
+    # Cargar los modelos antes de medir, así su carga no se suma al primer tamaño
+    keybert_models = {
+        backend: GoogleDriveTopicModelling(
+            embedding_cache_dir=None, embedding_backend=backend, embedding_threads=args.hilos
+        ).keybert_model
+        for backend in args.backends
+    }
+
+    results = []
+    for n_grupos in args.grupos:
+        reference_keywords = None
+        for backend in args.backends:
+            print(f"\n🚀 Procesando {n_grupos} grupos sintéticos (embeddings con {backend})...")
+            result = run_benchmark(
+                n_grupos,
+                latency=args.latencia,
+                error_rate=args.errores,
+                bandwidth=args.ancho_banda,
+                max_workers=args.workers,
+                use_pipeline=not args.sin_pipeline,
+                docx_engine=args.motor,
+                incremental=args.incremental,
+                seed=args.seed,
+                keybert_model=keybert_models[backend],
+                embedding_backend=backend,
+                reference_keywords=reference_keywords
+            )
+            keywords = result.pop('keywords')
+            if reference_keywords is None:
+                reference_keywords = keywords
+            results.append(result)
+            print_result(result)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n✅ Resultados guardados en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import os
+import re
+import shutil
+import hashlib
+import threading
+
+# Tamaño de los bloques al copiar archivos de la caché
+CHUNK_SIZE = 1024 * 1024
+
+# Fracción del límite a la que se baja al descartar entradas (evita descartar en cada escritura)
+EVICTION_TARGET = 0.9
+
+
+class BlobCache:
+    """
+    Caché en disco de los archivos descargados de Drive, direccionada por contenido.
+
+    La clave es el ID del archivo más su md5Checksum, así una entrada nunca queda
+    desactualizada: si el archivo cambia en Drive cambia su md5 y la versión anterior
+    se elimina. Cada archivo se escribe en un temporal y se renombra (escritura
+    atómica), así varios hilos o procesos pueden compartir la carpeta. Al superar
+    max_bytes se descartan los archivos usados hace más tiempo (LRU, según su mtime,
+    que se actualiza en cada lectura).
+    """
+
+    def __init__(self, cache_dir, max_bytes=2 * 1024 ** 3):
+        """
+        Args:
+            cache_dir (str): Carpeta de la caché
+            max_bytes (int): Tamaño máximo total de los archivos guardados
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._total_bytes = sum(size for _, size, _ in self._entries())
+
+    def _shard(self, file_id):
+        """
+        Subcarpeta de un archivo (reparte las entradas para no tener una carpeta enorme)
+        """
+        return os.path.join(self.cache_dir, hashlib.md5(file_id.encode('utf-8')).hexdigest()[:2])
+
+    def _path(self, file_id, md5_checksum):
+        safe_id = re.sub(r'[^A-Za-z0-9_-]', '_', file_id)
+        return os.path.join(self._shard(file_id), f"{safe_id}.{md5_checksum}.blob")
+
+    def _entries(self):
+        """
+        Archivos de la caché
+
+        Returns:
+            list: Tuplas (ruta, tamaño, mtime)
+        """
+        entries = []
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith('.blob'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def copy_to(self, file_id, md5_checksum, destination):
+        """
+        Copia por bloques el contenido guardado de un archivo a un destino (por ejemplo
+        un DownloadBuffer), sin cargarlo entero en memoria
+
+        Args:
+            file_id (str): ID del archivo en Drive
+            md5_checksum (str): md5Checksum informado por Drive
+            destination: Objeto con método write()
+
+        Returns:
+            bool: True si estaba en la caché y se copió completo y verificado. Si es False
+                el destino puede tener datos parciales y se debe descartar
+        """
+        if not md5_checksum:
+            return False
+
+        path = self._path(file_id, md5_checksum)
+        digest = hashlib.md5()
+        try:
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    destination.write(chunk)
+            os.utime(path, None)
+        except FileNotFoundError:
+            return False
+
+        if digest.hexdigest() != md5_checksum:
+            self._remove(path)
+            return False
+        return True
+
+    def put(self, file_id, md5_checksum, content):
+        """
+        Guarda el contenido de un archivo, reemplazando sus versiones anteriores
+
+        Args:
+            file_id (str): ID del archivo en Drive
+            md5_checksum (str): md5Checksum informado por Drive
+            content (bytes | file): Contenido descargado, o un archivo abierto posicionado
+                al inicio (se copia por bloques)
+        """
+        if not md5_checksum or content is None:
+            return
+
+        path = self._path(file_id, md5_checksum)
+        shard = os.path.dirname(path)
+        os.makedirs(shard, exist_ok=True)
+
+        # Versiones anteriores del mismo archivo
+        prefix = os.path.basename(path).rsplit('.', 2)[0] + '.'
+        for entry in os.scandir(shard):
+            if entry.name.startswith(prefix) and entry.path != path and entry.name.endswith('.blob'):
+                self._remove(entry.path)
+
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            if hasattr(content, 'read'):
+                shutil.copyfileobj(content, f, CHUNK_SIZE)
+            else:
+                f.write(content)
+            size = f.tell()
+
+        if size > self.max_bytes:
+            os.remove(tmp_path)
+            return
+        replaced = os.path.exists(path)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if not replaced:
+                self._total_bytes += size
+            over_limit = self._total_bytes > self.max_bytes
+
+        if over_limit:
+            self.evict()
+
+    def _remove(self, path):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        with self._lock:
+            self._total_bytes -= size
+
+    def evict(self):
+        """
+        Descarta los archivos usados hace más tiempo hasta bajar del límite
+        """
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICTION_TARGET
+
+        removed = 0
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+
+        with self._lock:
+            self._total_bytes = total
+        if removed:
+            print(f"🧹 Caché de documentos: {removed} archivos descartados ({total / 1024 ** 2:.1f} MB en uso)")
@@ -0,0 +1,385 @@
+import io
+import re
+import zipfile
+import posixpath
+import xml.etree.ElementTree as ET
+
+# Espacios de nombres de WordprocessingML
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+OFFICE_DOCUMENT_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+
+# Elementos de un run y su equivalente en texto (igual que python-docx)
+RUN_TEXT = {
+    W + 'tab': '\t',
+    W + 'ptab': '\t',
+    W + 'cr': '\n',
+    W + 'noBreakHyphen': '-',
+}
+
+
+def titulo_en_fila(textos_celdas):
+    """
+    Busca el título del proyecto en una fila de tabla
+    Busca la celda que está a la derecha de "TÍTULO" o "TITULO"
+
+    Args:
+        textos_celdas (list): Texto de cada celda de la fila
+
+    Returns:
+        str: Título encontrado o None
+    """
+    for i, celda_texto in enumerate(textos_celdas):
+        celda_text = celda_texto.strip().upper()
+
+        # Verificar si la celda contiene "TÍTULO" o "TITULO"
+        if 'TÍTULO' in celda_text or 'TITULO' in celda_text:
+            # Intentar obtener la celda siguiente (a la derecha)
+            if i + 1 < len(textos_celdas):
+                titulo = textos_celdas[i + 1].strip()
+                if titulo and len(titulo) > 5:  # Verificar que no esté vacío
+                    return titulo
+
+            # Si no hay celda a la derecha, intentar en la misma celda después del texto "TÍTULO"
+            if ':' in celda_texto:
+                partes = celda_texto.split(':', 1)
+                if len(partes) > 1:
+                    titulo = partes[1].strip()
+                    if titulo and len(titulo) > 5:
+                        return titulo
+
+    return None
+
+
+def resumen_en_fila(textos_celdas):
+    """
+    Devuelve el texto de la primera celda de la fila si tiene contenido de resumen
+    """
+    if textos_celdas:
+        texto_primera_celda = textos_celdas[0].strip()
+        # Verificar si este texto contiene contenido del resumen ejecutivo
+        if len(texto_primera_celda) > 50:
+            return texto_primera_celda
+    return None
+
+
+def resolver_titulo(titulo_tabla, parrafos, filename):
+    """
+    Devuelve el título encontrado en tablas o, si no hay, el de los párrafos
+    """
+    if titulo_tabla is not None:
+        return titulo_tabla
+
+    # Si no se encuentra en tablas, buscar en párrafos
+    for text in parrafos:
+        text = text.strip()
+        if ('TÍTULO' in text.upper() or 'TITULO' in text.upper()) and ':' in text:
+            partes = text.split(':', 1)
+            if len(partes) > 1:
+                titulo = partes[1].strip()
+                if titulo and len(titulo) > 5:
+                    return titulo
+
+    print(f"No se pudo extraer el título del proyecto de {filename}")
+    return "TÍTULO NO ENCONTRADO"
+
+
+def resolver_resumen(primera_celda_resumen, parrafos, texto_completo, filename):
+    """
+    Aplica las reglas de búsqueda del resumen ejecutivo sobre el contenido ya leído
+    """
+    # Buscar el párrafo que contiene "1. Resumen ejecutivo"
+    seccion_encontrada = any("Resumen ejecutivo" in text for text in parrafos)
+
+    if not seccion_encontrada:
+        print(f"No se encontró la sección de Resumen Ejecutivo en {filename}")
+        # Si no hay resumen ejecutivo, obtener todo el texto del documento
+        return texto_completo
+
+    # Primera celda de tabla con contenido suficiente
+    if primera_celda_resumen is not None:
+        return primera_celda_resumen
+
+    # Si no se encontró en tablas, intentar extraer texto de párrafos después de "Resumen ejecutivo"
+    full_text = []
+    found_section = False
+    next_section = False
+
+    for text in parrafos:
+        text = text.strip()
+        if not found_section and "Resumen ejecutivo" in text:
+            found_section = True
+            continue
+        elif found_section and text and not next_section:
+            # Verificar si llegamos a la siguiente sección (usualmente comienza con un número)
+            if re.match(r'^\d+\.', text) and "Resumen" not in text:
+                next_section = True
+            else:
+                full_text.append(text)
+        elif next_section:
+            break
+
+    if full_text:
+        return ' '.join(full_text)
+
+    # Si todo falla, extraer todo el contenido del documento
+    print(f"No se pudo extraer el resumen específico de {filename}, usando texto completo")
+    return texto_completo
+
+
+def _texto_completo(parrafos):
+    return ' '.join(text for text in parrafos if text.strip())
+
+
+def _abrir_fuente(source):
+    """
+    Acepta bytes, una ruta o un objeto tipo archivo
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+
+def extraer_datos_python_docx(source, filename):
+    """
+    Extrae título, resumen ejecutivo y texto completo cargando el documento con python-docx.
+    Las tablas se recorren en una única pasada (cada fila.cells se calcula una vez) y
+    el texto de los párrafos se lee una sola vez.
+
+    Args:
+        source (bytes | str | file): Contenido del DOCX, ruta o archivo abierto
+        filename (str): Nombre del archivo para logging
+
+    Returns:
+        dict: {'titulo': str, 'resumen': str, 'texto_completo': str}
+    """
+    import docx
+
+    # Cargar el documento desde el stream
+    doc = docx.Document(_abrir_fuente(source))
+
+    # Texto de los párrafos, leído una sola vez
+    parrafos = [para.text for para in doc.paragraphs]
+    texto_completo = _texto_completo(parrafos)
+
+    # Una pasada por las tablas: celda del título y primera celda del resumen
+    titulo = None
+    primera_celda_resumen = None
+    for tabla in doc.tables:
+        for fila in tabla.rows:
+            textos_celdas = [celda.text for celda in fila.cells]
+
+            if titulo is None:
+                titulo = titulo_en_fila(textos_celdas)
+
+            if primera_celda_resumen is None:
+                primera_celda_resumen = resumen_en_fila(textos_celdas)
+
+            if titulo is not None and primera_celda_resumen is not None:
+                break
+        else:
+            continue
+        break
+
+    return {
+        'titulo': resolver_titulo(titulo, parrafos, filename),
+        'resumen': resolver_resumen(primera_celda_resumen, parrafos, texto_completo, filename),
+        'texto_completo': texto_completo
+    }
+
+
+def _main_document_part(zf):
+    """
+    Nombre de la parte principal del documento dentro del zip (normalmente word/document.xml)
+    """
+    names = set(zf.namelist())
+    if 'word/document.xml' in names:
+        return 'word/document.xml'
+
+    # Resolver la parte desde las relaciones del paquete
+    with zf.open('_rels/.rels') as rels:
+        for rel in ET.parse(rels).getroot().iter(REL + 'Relationship'):
+            if rel.get('Type') == OFFICE_DOCUMENT_REL:
+                return posixpath.normpath(rel.get('Target').lstrip('/'))
+
+    raise KeyError("El paquete no tiene documento principal")
+
+
+def extraer_datos_stream(source, filename):
+    """
+    Extrae título, resumen ejecutivo y texto completo leyendo word/document.xml directamente
+    desde el zip con parseo XML incremental. No construye el modelo de objetos de python-docx,
+    no descomprime imágenes ni otras partes, y deja de leer en cuanto tiene la celda del
+    TÍTULO, la sección "Resumen ejecutivo" y la primera celda del resumen.
+
+    Reproduce las reglas de python-docx: párrafos y tablas de primer nivel del cuerpo,
+    texto de runs e hipervínculos, celdas combinadas horizontalmente (gridSpan) repetidas
+    y combinadas verticalmente (vMerge) resueltas a la celda de arriba.
+
+    Args:
+        source (bytes | str | file): Contenido del DOCX, ruta o archivo abierto
+        filename (str): Nombre del archivo para logging
+
+    Returns:
+        dict: {'titulo': str, 'resumen': str, 'texto_completo': str o None}.
+            'texto_completo' es None si la lectura se detuvo antes del final del documento
+    """
+    parrafos = []
+    titulo = None
+    primera_celda_resumen = None
+    seccion_encontrada = False
+    lectura_completa = True
+
+    with zipfile.ZipFile(_abrir_fuente(source)) as zf:
+        with zf.open(_main_document_part(zf)) as xml_stream:
+            stack = []
+            body = None
+
+            # Estado del párrafo actual (de primer nivel o de celda de tabla de primer nivel)
+            parrafo_depth = None
+            parrafo_partes = []
+
+            # Estado de la tabla, fila y celda actuales
+            fila_anterior = {}      # offset de grilla -> (texto, gridSpan) de la fila anterior
+            fila_actual = {}
+            celdas_fila = []
+            grid_offset = 0
+            celda_parrafos = []
+            celda_span = 1
+            celda_vmerge = None
+
+            for event, elem in ET.iterparse(xml_stream, events=('start', 'end')):
+                tag = elem.tag
+
+                if event == 'start':
+                    stack.append(tag)
+                    depth = len(stack)
+
+                    if tag == W + 'body' and depth == 2:
+                        body = elem
+                    elif tag == W + 'p' and (
+                        (depth == 3 and stack[1] == W + 'body') or
+                        (depth == 6 and stack[2] == W + 'tbl' and stack[4] == W + 'tc')
+                    ):
+                        parrafo_depth = depth
+                        parrafo_partes = []
+                    elif tag == W + 'tbl' and depth == 3:
+                        fila_anterior = {}
+                    elif tag == W + 'tr' and depth == 4 and stack[2] == W + 'tbl':
+                        fila_actual = {}
+                        celdas_fila = []
+                        grid_offset = 0
+                    elif tag == W + 'tc' and depth == 5 and stack[2] == W + 'tbl':
+                        celda_parrafos = []
+                        celda_span = 1
+                        celda_vmerge = None
+                    continue
+
+                # event == 'end'
+                depth = len(stack)
+
+                if parrafo_depth is not None and depth > parrafo_depth:
+                    # Contenido de un run: hijo directo de w:r, que es hijo del párrafo
+                    # o de un w:hyperlink hijo del párrafo
+                    run_depth = depth - 1
+                    es_run = (
+                        stack[run_depth - 1] == W + 'r' and (
+                            run_depth - 1 == parrafo_depth or
+                            (run_depth - 2 == parrafo_depth and stack[parrafo_depth] == W + 'hyperlink')
+                        )
+                    )
+                    if es_run:
+                        if tag == W + 't':
+                            parrafo_partes.append(elem.text or '')
+                        elif tag == W + 'br':
+                            if elem.get(W + 'type', 'textWrapping') == 'textWrapping':
+                                parrafo_partes.append('\n')
+                        elif tag in RUN_TEXT:
+                            parrafo_partes.append(RUN_TEXT[tag])
+
+                elif tag == W + 'gridBefore' and depth == 6 and stack[2] == W + 'tbl' and stack[4] == W + 'trPr':
+                    grid_offset = int(elem.get(W + 'val', 0))
+
+                elif tag == W + 'gridSpan' and depth == 7 and stack[2] == W + 'tbl' and stack[5] == W + 'tcPr':
+                    celda_span = int(elem.get(W + 'val', 1))
+
+                elif tag == W + 'vMerge' and depth == 7 and stack[2] == W + 'tbl' and stack[5] == W + 'tcPr':
+                    celda_vmerge = elem.get(W + 'val', 'continue')
+
+                elif tag == W + 'p' and depth == parrafo_depth:
+                    texto = ''.join(parrafo_partes)
+                    parrafo_depth = None
+
+                    if depth == 3:
+                        parrafos.append(texto)
+                        if "Resumen ejecutivo" in texto:
+                            seccion_encontrada = True
+                    else:
+                        celda_parrafos.append(texto)
+
+                elif tag == W + 'tc' and depth == 5 and stack[2] == W + 'tbl':
+                    if celda_vmerge == 'continue':
+                        # Continuación de una combinación vertical: usar la celda de arriba
+                        texto, span = fila_anterior.get(grid_offset, ('', celda_span))
+                    else:
+                        texto, span = '\n'.join(celda_parrafos), celda_span
+
+                    fila_actual[grid_offset] = (texto, span)
+                    celdas_fila.extend([texto] * span)
+                    grid_offset += celda_span
+
+                elif tag == W + 'tr' and depth == 4 and stack[2] == W + 'tbl':
+                    fila_anterior = fila_actual
+
+                    if titulo is None:
+                        titulo = titulo_en_fila(celdas_fila)
+                    if primera_celda_resumen is None:
+                        primera_celda_resumen = resumen_en_fila(celdas_fila)
+
+                stack.pop()
+
+                # Liberar los elementos ya procesados del cuerpo para acotar la memoria
+                if depth == 3 and body is not None:
+                    body.remove(elem)
+
+                # Todo lo necesario ya está leído: dejar de leer el documento
+                if titulo is not None and primera_celda_resumen is not None and seccion_encontrada:
+                    lectura_completa = False
+                    break
+
+    texto_completo = _texto_completo(parrafos) if lectura_completa else None
+
+    return {
+        'titulo': resolver_titulo(titulo, parrafos, filename),
+        'resumen': resolver_resumen(primera_celda_resumen, parrafos, texto_completo, filename),
+        'texto_completo': texto_completo
+    }
+
+
+def extraer_datos_documento(source, filename, motor='stream'):
+    """
+    Extrae título, resumen ejecutivo y texto completo de un DOCX
+
+    Args:
+        source (bytes | str | file): Contenido del DOCX, ruta o archivo abierto
+        filename (str): Nombre del archivo para logging
+        motor (str): 'stream' (lector OOXML incremental, con python-docx como respaldo)
+            o 'python-docx'
+
+    Returns:
+        dict: {'titulo': str, 'resumen': str, 'texto_completo': str o None}
+    """
+    try:
+        if motor == 'stream':
+            try:
+                return extraer_datos_stream(source, filename)
+            except Exception as e:
+                print(f"Lector OOXML falló con {filename} ({e}), usando python-docx")
+                if hasattr(source, 'seek'):
+                    source.seek(0)
+
+        return extraer_datos_python_docx(source, filename)
+
+    except Exception as e:
+        print(f"Error al procesar {filename}: {e}")
+        return {'titulo': "ERROR AL EXTRAER TÍTULO", 'resumen': "", 'texto_completo': ""}
@@ -0,0 +1,160 @@
+import io
+import os
+import tempfile
+import threading
+
+# Tamaño a partir del cual una descarga pasa de memoria a un archivo temporal
+SPOOL_THRESHOLD = 8 * 1024 ** 2
+
+
+class ByteBudget:
+    """
+    Límite de bytes de descargas en curso (descargados y todavía sin procesar),
+    compartido por todos los hilos. Una reserva espera hasta que haya lugar; si no hay
+    nada en curso se concede aunque supere el límite, así un archivo enorme no bloquea
+    para siempre.
+    """
+
+    def __init__(self, max_bytes):
+        """
+        Args:
+            max_bytes (int): Máximo de bytes en curso (None = sin límite)
+        """
+        self.max_bytes = max_bytes
+        self.in_use = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, size, wait=True):
+        """
+        Reserva size bytes, esperando si el límite está ocupado
+
+        Args:
+            size (int): Bytes a reservar
+            wait (bool): Esperar lugar (False = reservar de inmediato aunque se pase
+                del límite; las próximas reservas esperan hasta que se libere)
+        """
+        with self._condition:
+            if wait and self.max_bytes is not None:
+                while self.in_use > 0 and self.in_use + size > self.max_bytes:
+                    self._condition.wait()
+            self.in_use += size
+
+    def release(self, size):
+        with self._condition:
+            self.in_use -= size
+            self._condition.notify_all()
+
+
+class DownloadBuffer:
+    """
+    Destino de una descarga: los bytes quedan en memoria hasta spool_threshold y, por
+    encima, en un archivo temporal. El lector lee el mismo buffer (sin copias) y, para
+    parsear en otro proceso, se pasa la ruta del archivo temporal en lugar de los bytes
+    (o una copia de los bytes en memoria, que también se cuenta en el ByteBudget).
+
+    close() libera la memoria o borra el archivo temporal y devuelve la reserva del
+    ByteBudget, si la hay.
+    """
+
+    def __init__(self, spool_threshold=SPOOL_THRESHOLD, spool_dir=None, budget=None, reserved=0):
+        """
+        Args:
+            spool_threshold (int): Bytes a partir de los cuales se pasa a disco
+            spool_dir (str): Carpeta de los archivos temporales (None = la del sistema)
+            budget (ByteBudget): Límite del que se reservaron los bytes de esta descarga
+            reserved (int): Bytes reservados en budget
+        """
+        self.spool_threshold = spool_threshold
+        self.spool_dir = spool_dir
+        self.size = 0
+        self.path = None
+        self._memory = io.BytesIO()
+        self._file = None
+        self._budget = budget
+        self._reserved = reserved
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def on_disk(self):
+        return self.path is not None
+
+    def write(self, data):
+        """
+        Agrega bytes (interfaz de archivo que usa MediaIoBaseDownload)
+        """
+        if self._file is None and self.size + len(data) > self.spool_threshold:
+            self._spill()
+        target = self._file if self._file is not None else self._memory
+        target.write(data)
+        self.size += len(data)
+        return len(data)
+
+    def _spill(self):
+        """
+        Pasa el contenido en memoria a un archivo temporal
+        """
+        self._file = tempfile.NamedTemporaryFile(
+            mode='w+b', prefix='descarga_', suffix='.tmp', dir=self.spool_dir, delete=False
+        )
+        self.path = self._file.name
+        self._file.write(self._memory.getbuffer())
+        self._memory = None
+
+    def reader(self):
+        """
+        Archivo posicionado al inicio para leer el contenido (el mismo buffer, sin copiarlo)
+
+        Returns:
+            Objeto tipo archivo
+        """
+        if self._file is None and self.path is not None:
+            self._file = open(self.path, 'r+b')
+        target = self._file if self._file is not None else self._memory
+        target.flush()
+        target.seek(0)
+        return target
+
+    def source(self):
+        """
+        Contenido para pasar a otro proceso: la ruta del archivo temporal o los bytes.
+        La copia en memoria se suma a la reserva del ByteBudget sin esperar (el buffer
+        ya tiene su parte reservada) y se devuelve en close()
+
+        Returns:
+            str | bytes: Ruta (si está en disco) o contenido
+        """
+        if self.path is not None:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            return self.path
+
+        data = self._memory.getvalue()
+        if self._budget is not None:
+            self._budget.acquire(len(data), wait=False)
+            self._reserved += len(data)
+        return data
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+        self._memory = None
+
+        if self._budget is not None:
+            self._budget.release(self._reserved)
+            self._budget = None
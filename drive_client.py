@@ -0,0 +1,174 @@
+import json
+import queue
+import threading
+
+# Tiempo máximo de espera de cada petición HTTP a Drive, en segundos
+HTTP_TIMEOUT = 120
+
+# Documento de discovery de Drive v3, cargado una sola vez por proceso
+_discovery_document = None
+_discovery_lock = threading.Lock()
+
+
+def _warm_up_resources(service, description):
+    """
+    Recorre todos los recursos de un cliente. La librería completa el documento de
+    discovery la primera vez que crea cada recurso; hacerlo una vez de antemano deja
+    el documento estable para compartirlo entre hilos
+    """
+    for name, sub_description in description.get('resources', {}).items():
+        _warm_up_resources(getattr(service, name)(), sub_description)
+
+
+def get_discovery_document():
+    """
+    Documento de discovery de Drive v3: la copia estática incluida en
+    google-api-python-client (sin petición a la red), parseada una sola vez por proceso
+
+    Returns:
+        dict: Documento de discovery
+    """
+    global _discovery_document
+
+    with _discovery_lock:
+        if _discovery_document is None:
+            import httplib2
+            from googleapiclient.discovery import build_from_document
+            from googleapiclient.discovery_cache import get_static_doc
+
+            document = json.loads(get_static_doc('drive', 'v3'))
+            # Cliente sin credenciales: solo se usa para recorrer los recursos, no hace peticiones
+            _warm_up_resources(build_from_document(document, http=httplib2.Http()), document)
+            _discovery_document = document
+
+        return _discovery_document
+
+
+def share_credential_refresh(credentials):
+    """
+    Serializa la renovación del token de unas credenciales compartidas entre hilos:
+    si varios hilos encuentran el token vencido a la vez, solo uno lo renueva y el
+    resto usa el nuevo
+
+    Args:
+        credentials: Credenciales de google-auth
+
+    Returns:
+        Las mismas credenciales
+    """
+    if credentials is None or getattr(credentials, '_refresh_lock', None) is not None:
+        return credentials
+
+    refresh = credentials.refresh
+    lock = threading.Lock()
+
+    def locked_refresh(request):
+        token = credentials.token
+        with lock:
+            # Otro hilo ya lo renovó mientras se esperaba el lock
+            if credentials.token != token and credentials.valid:
+                return
+            refresh(request)
+
+    credentials.refresh = locked_refresh
+    credentials._refresh_lock = lock
+    return credentials
+
+
+def build_drive_service(credentials, timeout=HTTP_TIMEOUT):
+    """
+    Construye un cliente de la API de Google Drive v3 desde el documento de discovery
+    en caché, con su propio transporte HTTP autorizado (conexiones keep-alive)
+
+    Args:
+        credentials: Credenciales de google-auth
+        timeout (int): Tiempo máximo de espera de cada petición, en segundos
+
+    Returns:
+        Resource: Cliente de Drive
+    """
+    import httplib2
+    import google_auth_httplib2
+    from googleapiclient.discovery import build_from_document
+
+    http = google_auth_httplib2.AuthorizedHttp(
+        share_credential_refresh(credentials), http=httplib2.Http(timeout=timeout)
+    )
+    return build_from_document(get_discovery_document(), http=http)
+
+
+class _Lease:
+    """
+    Cliente prestado a un hilo; cuando el hilo termina vuelve al pool
+    """
+
+    def __init__(self, pool, service):
+        self.pool = pool
+        self.service = service
+
+    def __del__(self):
+        try:
+            self.pool._release(self.service)
+        except Exception:
+            pass
+
+
+class DriveServicePool:
+    """
+    Clientes de Drive compartidos por todo el proceso (por ejemplo, entre sesiones de
+    Streamlit o entre los pools de hilos de una ejecución). Todos usan las mismas
+    credenciales, con la renovación del token serializada.
+
+    Cada hilo recibe su propio cliente, porque el transporte httplib2 no es thread-safe,
+    y lo usa en todas sus peticiones. Cuando el hilo termina, el cliente vuelve al pool
+    con sus conexiones abiertas y lo toma el próximo hilo, así no se repite el handshake
+    TLS en cada lote de hilos. Se conservan hasta size clientes libres.
+    """
+
+    def __init__(self, credentials, size=8, timeout=HTTP_TIMEOUT):
+        """
+        Args:
+            credentials: Credenciales de google-auth
+            size (int): Clientes libres que se conservan (normalmente, el número de hilos)
+            timeout (int): Tiempo máximo de espera de cada petición, en segundos
+        """
+        self.credentials = share_credential_refresh(credentials)
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=max(1, int(size)))
+        self._local = threading.local()
+
+    def build(self):
+        """
+        Construye un cliente nuevo, fuera del pool
+
+        Returns:
+            Resource: Cliente de Drive
+        """
+        return build_drive_service(self.credentials, timeout=self.timeout)
+
+    def get(self):
+        """
+        Devuelve el cliente del hilo actual: el que ya tenía, uno libre del pool o uno nuevo
+
+        Returns:
+            Resource: Cliente de Drive
+        """
+        lease = getattr(self._local, 'lease', None)
+        if lease is None:
+            try:
+                service = self._idle.get_nowait()
+            except queue.Empty:
+                service = self.build()
+            lease = _Lease(self, service)
+            self._local.lease = lease
+        return lease.service
+
+    def _release(self, service):
+        try:
+            self._idle.put_nowait(service)
+        except queue.Full:
+            # Pool lleno: cerrar las conexiones del cliente sobrante
+            try:
+                service._http.close()
+            except Exception:
+                pass
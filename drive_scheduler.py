@@ -0,0 +1,268 @@
+import ssl
+import json
+import time
+import random
+import threading
+
+# Cuota de la API de Drive por usuario: 12.000 consultas por minuto
+DRIVE_QUOTA_PER_MINUTE = 12000
+
+# Estados HTTP que se reintentan siempre
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# Motivos de un 403 que indican límite de cuota (el resto de los 403 son permisos)
+RATE_LIMIT_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}
+
+
+def _error_reasons(error):
+    """
+    Motivos ('reason') del cuerpo JSON de un HttpError
+    """
+    try:
+        content = json.loads(error.content.decode('utf-8'))
+        return {detail.get('reason') for detail in content['error'].get('errors', [])}
+    except Exception:
+        return set()
+
+
+def classify_error(error):
+    """
+    Clasifica un error de una petición a Drive
+
+    Returns:
+        str: 'limite' (cuota excedida, 403/429), 'servidor' (5xx), 'red' (conexión,
+            timeout, TLS o DNS) o None si el error no se debe reintentar
+    """
+    from httplib2 import ServerNotFoundError
+    from googleapiclient.errors import HttpError
+
+    if isinstance(error, HttpError):
+        status = error.resp.status
+        if status == 429 or (status == 403 and _error_reasons(error) & RATE_LIMIT_REASONS):
+            return 'limite'
+        if status in RETRYABLE_STATUSES:
+            return 'servidor'
+        return None
+
+    if isinstance(error, (ConnectionError, TimeoutError, ssl.SSLError, ServerNotFoundError)):
+        return 'red'
+    # Los sockets lanzan OSError sin subclase (por ejemplo, red inalcanzable); las
+    # subclases como FileNotFoundError o PermissionError no son errores de red
+    if type(error) is OSError:
+        return 'red'
+    return None
+
+
+class TokenBucket:
+    """
+    Limitador de ritmo: se reponen rate fichas por segundo hasta capacity y cada
+    petición consume las suyas, esperando si no alcanzan
+    """
+
+    def __init__(self, rate, capacity):
+        """
+        Args:
+            rate (float): Fichas que se reponen por segundo
+            capacity (float): Máximo de fichas acumuladas (ráfaga permitida)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """
+        Consume fichas, esperando hasta que haya suficientes
+
+        Args:
+            tokens (float): Fichas a consumir (una por consulta a la API)
+        """
+        tokens = min(tokens, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class DriveScheduler:
+    """
+    Planificador central de las peticiones a Google Drive.
+
+    Todas las llamadas pasan por execute() o call(), que:
+    - respetan la cuota por usuario con un token bucket,
+    - limitan las peticiones simultáneas con un límite adaptativo (AIMD): se reduce a
+      la mitad ante errores de cuota o del servidor y crece de a uno con los éxitos,
+    - reintentan los errores 403 de cuota, 429, 5xx y de red con backoff exponencial
+      con jitter (respetando Retry-After si Drive lo envía).
+
+    Es thread-safe y se comparte entre los hilos de descarga y de búsqueda.
+    """
+
+    def __init__(self, max_concurrency=8, min_concurrency=1, requests_per_minute=DRIVE_QUOTA_PER_MINUTE,
+                 burst=None, max_retries=6, base_delay=0.5, max_delay=32.0, cooldown=1.0):
+        """
+        Args:
+            max_concurrency (int): Máximo de peticiones simultáneas
+            min_concurrency (int): Mínimo al que puede bajar el límite adaptativo
+            requests_per_minute (int): Cuota de consultas por minuto
+            burst (int): Consultas que se pueden hacer de golpe (None = las de un segundo)
+            max_retries (int): Reintentos de una petición antes de propagar el error
+            base_delay (float): Espera del primer reintento, en segundos
+            max_delay (float): Espera máxima entre reintentos, en segundos
+            cooldown (float): Segundos mínimos entre dos reducciones del límite
+        """
+        rate = requests_per_minute / 60.0
+        self.bucket = TokenBucket(rate, burst or max(1.0, rate))
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.min_concurrency = max(1, min(int(min_concurrency), self.max_concurrency))
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.cooldown = cooldown
+
+        self.limit = self.max_concurrency
+        self._in_flight = 0
+        self._successes = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+        # Métricas de la ejecución en curso (las asigna GoogleDriveTopicModelling)
+        self.metrics = None
+        self.retries = 0
+        self.throttled = 0
+        # Peticiones con errores transitorios que se abandonaron tras agotar los reintentos
+        self.exhausted = 0
+
+    def execute(self, request, cost=1, max_retries=None):
+        """
+        Ejecuta una petición de la API (HttpRequest o BatchHttpRequest) con reintentos
+
+        Args:
+            request: Objeto con método execute()
+            cost (int): Consultas que representa (las de un batch cuentan por separado)
+            max_retries (int): Reintentos de esta petición (None = los del planificador).
+                Con 0 no se reintenta, para peticiones que no son idempotentes
+
+        Returns:
+            Respuesta de la petición
+        """
+        return self.call(request.execute, cost=cost, max_retries=max_retries)
+
+    def call(self, func, *args, cost=1, max_retries=None, **kwargs):
+        """
+        Llama a func respetando la cuota y la concurrencia, reintentando los errores
+        transitorios
+
+        Args:
+            func (callable): Llamada que hace la petición (por ejemplo downloader.next_chunk)
+            cost (int): Consultas que representa la llamada
+            max_retries (int): Reintentos de esta llamada (None = los del planificador)
+
+        Returns:
+            El resultado de func
+        """
+        if max_retries is None:
+            max_retries = self.max_retries
+        attempt = 0
+        while True:
+            self.bucket.acquire(cost)
+            self._acquire_slot()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                self._release_slot()
+                kind = self.observe(e)
+                if kind is None:
+                    raise
+                if attempt >= max_retries:
+                    with self._condition:
+                        self.exhausted += 1
+                    print(f"❌ Drive siguió respondiendo con error ({kind}) tras {max_retries} reintentos")
+                    raise
+
+                delay = self._backoff_delay(attempt, e)
+                attempt += 1
+                with self._condition:
+                    self.retries += 1
+                if self.metrics is not None:
+                    self.metrics.record('drive_reintentos', delay, items=1)
+                print(f"⏳ Drive respondió con error ({kind}), reintento {attempt}/{max_retries} en {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            self._release_slot(success=True)
+            return result
+
+    def observe(self, error):
+        """
+        Registra un error de Drive (también los de peticiones dentro de un batch) y
+        reduce el límite de concurrencia si indica saturación
+
+        Returns:
+            str: Clasificación del error (ver classify_error)
+        """
+        kind = classify_error(error)
+        if kind in ('limite', 'servidor'):
+            with self._condition:
+                self.throttled += 1
+                now = time.monotonic()
+                if now - self._last_decrease >= self.cooldown:
+                    self.limit = max(self.min_concurrency, self.limit // 2)
+                    self._last_decrease = now
+                    self._successes = 0
+        return kind
+
+    def _backoff_delay(self, attempt, error):
+        """
+        Espera antes del reintento: exponencial con jitter, o la que pida Retry-After
+        """
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        delay = ceiling / 2 + random.uniform(0, ceiling / 2)
+
+        resp = getattr(error, 'resp', None)
+        retry_after = resp.get('retry-after') if resp is not None else None
+        try:
+            delay = max(delay, min(self.max_delay, float(retry_after)))
+        except (TypeError, ValueError):
+            pass
+        return delay
+
+    def _acquire_slot(self):
+        with self._condition:
+            while self._in_flight >= self.limit:
+                self._condition.wait()
+            self._in_flight += 1
+
+    def _release_slot(self, success=False):
+        with self._condition:
+            self._in_flight -= 1
+            if success and self.limit < self.max_concurrency:
+                # Aumento aditivo: un lugar más por cada "ventana" completa de éxitos
+                self._successes += 1
+                if self._successes >= self.limit:
+                    self.limit += 1
+                    self._successes = 0
+            self._condition.notify_all()
+
+    def stats(self):
+        """
+        Returns:
+            dict: límite de concurrencia actual, peticiones en curso, reintentos,
+                errores de cuota o del servidor observados y peticiones abandonadas
+                tras agotar los reintentos
+        """
+        with self._condition:
+            return {
+                'limite_concurrencia': self.limit,
+                'en_curso': self._in_flight,
+                'reintentos': self.retries,
+                'limitadas': self.throttled,
+                'agotadas': self.exhausted,
+            }
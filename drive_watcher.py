@@ -0,0 +1,348 @@
+import os
+import json
+import time
+import argparse
+
+import pandas as pd
+
+from main import GoogleDriveTopicModelling, RESULT_COLUMNS
+from results_store import ResultsStore
+
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+# Versión del formato del archivo de estado.
+# Incrementarla hace que el próximo inicio vuelva a recorrer todo el árbol
+WATCHER_STATE_VERSION = 1
+
+# Campos pedidos de cada cambio (lo justo para ubicar el archivo en el árbol)
+CHANGES_FIELDS = "nextPageToken, newStartPageToken, changes(fileId, removed, file(id, name, mimeType, parents))"
+
+# Cambios por página (máximo que admite la API de Drive)
+CHANGES_PAGE_SIZE = 1000
+
+
+class DriveWatcher:
+    """
+    Mantiene los resultados al día con el feed de cambios de Drive, sin recorrer el árbol.
+
+    Al iniciar guarda el token de página de changes().getStartPageToken, procesa todo una
+    vez y guarda el árbol de carpetas (diplomados, EVIDENCIA DE TRABAJOS, MÓDULO IV y
+    grupos) junto con la sistematización elegida en cada grupo. En cada tick pide solo
+    los cambios desde ese token, ubica cada archivo modificado, agregado o borrado en su
+    grupo y vuelve a procesar solo esos grupos; el resultado reemplaza sus filas en el
+    ResultsStore. Si cambió una carpeta del árbol (un grupo o diplomado nuevo, renombrado
+    o borrado) se vuelve a recorrer todo, lo que sigue siendo incremental por el manifiesto.
+
+    El token solo avanza cuando los cambios se aplicaron: si un tick falla, el siguiente
+    vuelve a pedir los mismos cambios.
+    """
+
+    def __init__(self, topic_model, parent_folder_id, results_store, state_path='estado_cambios.json', top_keywords=5):
+        """
+        Args:
+            topic_model (GoogleDriveTopicModelling): Instancia autenticada (de uso exclusivo del watcher)
+            parent_folder_id (str): ID de la carpeta padre que contiene los diplomados
+            results_store (ResultsStore): Snapshot de resultados que se mantiene al día
+            state_path (str): Archivo JSON con el token de página y el árbol de carpetas
+            top_keywords (int): Número de palabras clave por documento
+        """
+        self.topic_model = topic_model
+        self.parent_folder_id = parent_folder_id
+        self.results_store = results_store
+        self.state_path = state_path
+        self.top_keywords = top_keywords
+        self.state = None
+
+    # --- Estado ---
+
+    def load_state(self):
+        """
+        Carga el estado guardado (token de página y árbol de carpetas)
+
+        Returns:
+            dict: Estado o None si no hay uno válido para esta carpeta padre
+        """
+        if not os.path.exists(self.state_path):
+            return None
+
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except Exception as e:
+            print(f"Error al leer el estado de cambios {self.state_path}: {e}")
+            return None
+
+        if state.get('version') != WATCHER_STATE_VERSION or state.get('parent_folder_id') != self.parent_folder_id:
+            print("Estado de cambios de otra versión o carpeta, se recorrerá todo el árbol")
+            return None
+        return state
+
+    def save_state(self):
+        """
+        Guarda el estado en disco de forma atómica (archivo temporal + reemplazo)
+        """
+        try:
+            tmp_path = f"{self.state_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f, ensure_ascii=False)
+            os.replace(tmp_path, self.state_path)
+        except Exception as e:
+            print(f"Error al guardar el estado de cambios {self.state_path}: {e}")
+
+    def _build_state(self, page_token, tree, group_files):
+        """
+        Arma el estado a partir del árbol de crawl_folder_tree y de la sistematización
+        encontrada en cada grupo
+        """
+        structure = [self.parent_folder_id]
+        groups = {}
+        for node in tree:
+            structure.append(node['diplomado']['id'])
+            structure.extend(folder_id for folder_id in (node['evidencia_id'], node['modulo_iv_id']) if folder_id)
+            for group_num, folder in node['groups']:
+                groups[folder['id']] = {
+                    'diplomado': node['diplomado']['name'],
+                    'grupo': group_num,
+                    'nombre': folder['name'],
+                }
+
+        return {
+            'version': WATCHER_STATE_VERSION,
+            'parent_folder_id': self.parent_folder_id,
+            'page_token': page_token,
+            'estructura': structure,
+            'grupos': groups,
+            'archivos': {folder_id: file_id for folder_id, file_id in group_files.items() if folder_id in groups},
+        }
+
+    # --- Procesamiento ---
+
+    def start(self):
+        """
+        Carga el estado guardado o, si no hay, hace el procesamiento inicial completo
+        """
+        self.state = self.load_state()
+        if self.state is None:
+            self.resync()
+        else:
+            print(f"👀 Vigilando cambios desde el token {self.state['page_token']} "
+                  f"({len(self.state['grupos'])} grupos en el árbol)")
+
+    def resync(self, page_token=None):
+        """
+        Recorre todo el árbol, procesa todos los grupos y guarda resultados y estado
+
+        Args:
+            page_token (str): Token desde el que seguir leyendo cambios. Si es None se pide
+                uno nuevo antes de recorrer, así no se pierden los cambios hechos durante
+                el recorrido (se vuelven a aplicar en el próximo tick)
+        """
+        topic_model = self.topic_model
+        if page_token is None:
+            page_token = topic_model.drive_scheduler.execute(
+                topic_model.service.changes().getStartPageToken()
+            )['startPageToken']
+
+        print("🔄 Recorriendo todo el árbol de carpetas")
+        result_df = topic_model.process_all_diplomados(self.parent_folder_id, top_keywords=self.top_keywords)
+        if topic_model.crawl_incomplete:
+            # No guardar un árbol ni resultados parciales; el próximo tick lo reintenta
+            raise Exception("El recorrido del árbol quedó incompleto")
+        if not result_df.empty and not self.results_store.save(result_df):
+            raise Exception("No se pudieron guardar los resultados")
+
+        self.state = self._build_state(page_token, topic_model._folder_tree, topic_model._group_files)
+        self.save_state()
+
+    def fetch_changes(self):
+        """
+        Lee todas las páginas del feed de cambios desde el token guardado
+
+        Returns:
+            tuple: (dict {ID de archivo: último cambio}, nuevo token de página)
+        """
+        topic_model = self.topic_model
+        page_token = self.state['page_token']
+        changes = {}
+
+        while True:
+            response = topic_model.drive_scheduler.execute(
+                topic_model.service.changes().list(
+                    pageToken=page_token,
+                    fields=CHANGES_FIELDS,
+                    pageSize=CHANGES_PAGE_SIZE,
+                    includeRemoved=True,
+                    spaces='drive'
+                )
+            )
+            for change in response.get('changes', []):
+                if change.get('fileId'):
+                    changes[change['fileId']] = change
+
+            if 'newStartPageToken' in response:
+                return changes, response['newStartPageToken']
+            page_token = response['nextPageToken']
+
+    def _classify_changes(self, changes):
+        """
+        Ubica los archivos cambiados en el árbol guardado
+
+        Returns:
+            tuple: (True si cambió una carpeta del árbol, set de carpetas de grupo afectadas)
+        """
+        structure = set(self.state['estructura'])
+        groups = self.state['grupos']
+        group_by_file = {file_id: folder_id for folder_id, file_id in self.state['archivos'].items()}
+
+        affected = set()
+        for file_id, change in changes.items():
+            file_info = change.get('file') or {}
+            parents = set(file_info.get('parents', []))
+
+            if file_id in structure or file_id in groups:
+                return True, affected
+            if file_info.get('mimeType') == FOLDER_MIME_TYPE:
+                # Carpeta nueva o movida dentro del árbol (por ejemplo, un grupo nuevo)
+                if parents & structure:
+                    return True, affected
+                continue
+
+            # El archivo está en un grupo, o era la sistematización de uno (borrado o movido)
+            affected.update(parents & groups.keys())
+            if file_id in group_by_file:
+                affected.add(group_by_file[file_id])
+
+        return False, affected
+
+    def tick(self):
+        """
+        Aplica los cambios ocurridos en Drive desde el último tick
+
+        Returns:
+            dict: Cambios leídos, grupos reprocesados, si se recorrió todo el árbol y
+                proyectos en el snapshot
+        """
+        if self.state is None:
+            self.start()
+
+        changes, new_token = self.fetch_changes()
+        summary = {'cambios': len(changes), 'grupos': 0, 'recorrido_completo': False, 'proyectos': None}
+
+        if not changes:
+            self.state['page_token'] = new_token
+            self.save_state()
+            return summary
+
+        structural, affected = self._classify_changes(changes)
+        snapshot = self.results_store.load()
+
+        if structural or snapshot is None:
+            print("📂 Cambió la estructura de carpetas (o no hay snapshot), se recorre todo el árbol")
+            self.resync(page_token=new_token)
+            summary['recorrido_completo'] = True
+            summary['grupos'] = len(self.state['grupos'])
+            snapshot = self.results_store.load()
+            summary['proyectos'] = len(snapshot.df) if snapshot is not None else 0
+            return summary
+
+        if affected:
+            summary['grupos'] = len(affected)
+            summary['proyectos'] = self._reprocess_groups(affected, snapshot.df)
+
+        self.state['page_token'] = new_token
+        self.save_state()
+        return summary
+
+    def _reprocess_groups(self, affected, df):
+        """
+        Vuelve a procesar los grupos afectados y reemplaza sus filas en el snapshot
+
+        Args:
+            affected (set): IDs de las carpetas de grupo
+            df (pd.DataFrame): Resultados actuales (indexados por ID de archivo)
+
+        Returns:
+            int: Proyectos en el nuevo snapshot
+        """
+        groups = self.state['grupos']
+        files = self.state['archivos']
+        ordered = [folder_id for folder_id in groups if folder_id in affected]
+
+        print(f"✏️ {len(ordered)} grupos con cambios")
+        tasks = [
+            (groups[folder_id]['diplomado'], groups[folder_id]['grupo'], {'id': folder_id, 'name': groups[folder_id]['nombre']})
+            for folder_id in ordered
+        ]
+        old_file_ids = {files[folder_id] for folder_id in ordered if folder_id in files}
+
+        records, group_files = self.topic_model.process_groups(
+            tasks, top_keywords=self.top_keywords, stale_file_ids=old_file_ids
+        )
+
+        for folder_id in ordered:
+            if folder_id in group_files:
+                files[folder_id] = group_files[folder_id]
+            else:
+                files.pop(folder_id, None)
+
+        # Reemplazar las filas de los grupos y conservar el orden del árbol
+        df = df.drop(index=[file_id for file_id in old_file_ids if file_id in df.index])
+        if records:
+            new_df = pd.DataFrame(records).set_index('ID de archivo')[RESULT_COLUMNS]
+            df = pd.concat([df.drop(index=[file_id for file_id in new_df.index if file_id in df.index]), new_df])
+        order = [files[folder_id] for folder_id in groups if files.get(folder_id) in df.index]
+        ordered_ids = set(order)
+        df = df.loc[order + [file_id for file_id in df.index if file_id not in ordered_ids]]
+
+        if not self.results_store.save(df):
+            raise Exception("No se pudieron guardar los resultados")
+        return len(df)
+
+    def run(self, interval=60, stop_event=None, max_ticks=None):
+        """
+        Aplica los cambios cada interval segundos hasta que se active stop_event
+
+        Args:
+            interval (float): Segundos entre ticks
+            stop_event (threading.Event): Detiene el ciclo al activarse
+            max_ticks (int): Máximo de ticks (None = sin límite)
+        """
+        # El primer tick carga el estado o hace el procesamiento inicial (y lo reintenta si falla)
+        ticks = 0
+        while max_ticks is None or ticks < max_ticks:
+            try:
+                summary = self.tick()
+                if summary['cambios']:
+                    print(f"✅ {summary['cambios']} cambios, {summary['grupos']} grupos reprocesados"
+                          f"{' (recorrido completo)' if summary['recorrido_completo'] else ''}")
+            except Exception as e:
+                print(f"Error al aplicar los cambios de Drive: {e}")
+
+            ticks += 1
+            if stop_event is not None:
+                if stop_event.wait(interval):
+                    break
+            elif max_ticks is None or ticks < max_ticks:
+                time.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Mantiene los resultados al día con el feed de cambios de Google Drive"
+    )
+    parser.add_argument('--carpeta', default="1-_W-Esk4lzkztPSeZpqO4Gq3ao1P9XKo",
+                        help="ID de la carpeta padre que contiene los diplomados")
+    parser.add_argument('--intervalo', type=float, default=60, help="Segundos entre consultas de cambios")
+    parser.add_argument('--estado', default='estado_cambios.json', help="Archivo con el token y el árbol de carpetas")
+    parser.add_argument('--resultados', default='resultados.sqlite', help="Snapshot de resultados a mantener")
+    args = parser.parse_args()
+
+    topic_model = GoogleDriveTopicModelling(language='spanish', max_workers=8)
+    topic_model.authenticate_google_drive()
+
+    watcher = DriveWatcher(topic_model, args.carpeta, ResultsStore(args.resultados), state_path=args.estado)
+    watcher.run(interval=args.intervalo)
+
+
+if __name__ == "__main__":
+    main()
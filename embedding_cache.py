@@ -0,0 +1,267 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+# Lecturas acumuladas antes de escribir su uso reciente (LRU) en el índice
+TOUCH_BATCH_SIZE = 1000
+
+
+class EmbeddingCache:
+    """
+    Caché persistente de embeddings direccionada por contenido.
+
+    Los vectores viven en un archivo .npy mapeado en memoria (una fila por entrada)
+    y el índice clave -> fila en SQLite. La clave es un hash del texto y del nombre
+    del modelo, así el caché se comparte entre ejecuciones, sesiones de Streamlit y
+    procesos. Las escrituras se serializan con un bloqueo de archivo y, al llenarse,
+    se descartan las entradas usadas hace más tiempo (LRU). Las lecturas solo toman el
+    bloqueo compartido: su uso reciente se acumula en memoria y se escribe junto con la
+    próxima escritura (o cada TOUCH_BATCH_SIZE lecturas).
+    """
+
+    def __init__(self, cache_dir, model_name, max_entries=100000):
+        """
+        Args:
+            cache_dir (str): Carpeta donde se guardan el índice y los vectores
+            model_name (str): Nombre del modelo de embeddings (forma parte de la clave)
+            max_entries (int): Número máximo de embeddings guardados
+        """
+        self.cache_dir = cache_dir
+        self.model_name = model_name
+        self.max_entries = max_entries
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index_path = os.path.join(cache_dir, 'index.sqlite')
+        self.vectors_path = os.path.join(cache_dir, 'vectors.npy')
+        self.lock_path = os.path.join(cache_dir, '.lock')
+
+        self._thread_lock = threading.Lock()
+        self._vectors = None
+        # Uso reciente pendiente de escribir: clave -> momento de la última lectura
+        self._touched = {}
+
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, slot INTEGER UNIQUE, last_used REAL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER)")
+
+    @contextmanager
+    def _connect(self):
+        """
+        Conexión al índice que confirma la transacción y se cierra al salir
+        """
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _file_lock(self, exclusive):
+        """
+        Bloqueo de archivo compartido (lecturas) o exclusivo (escrituras) entre procesos
+        """
+        with self._thread_lock, open(self.lock_path, 'a+') as fd:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def _write_touches(self, conn):
+        """
+        Escribe el uso reciente acumulado (con el bloqueo exclusivo tomado)
+        """
+        if self._touched:
+            conn.executemany(
+                "UPDATE entries SET last_used = ? WHERE key = ?",
+                [(used, key) for key, used in self._touched.items()]
+            )
+            self._touched = {}
+
+    def _key(self, text):
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode('utf-8')).hexdigest()
+
+    def _open_vectors(self, conn, dim=None):
+        """
+        Abre (o crea, si se conoce la dimensión) el archivo de vectores mapeado en memoria
+        """
+        if self._vectors is not None:
+            return self._vectors
+
+        row = conn.execute("SELECT value FROM meta WHERE name = 'dim'").fetchone()
+        if row is None:
+            if dim is None:
+                return None
+            conn.execute("INSERT INTO meta (name, value) VALUES ('dim', ?)", (int(dim),))
+            conn.commit()
+            self._vectors = np.lib.format.open_memmap(
+                self.vectors_path, mode='w+', dtype=np.float32, shape=(self.max_entries, int(dim))
+            )
+        else:
+            self._vectors = np.load(self.vectors_path, mmap_mode='r+')
+
+        return self._vectors
+
+    def get_many(self, texts):
+        """
+        Busca los embeddings de varios textos
+
+        Args:
+            texts (list): Textos a buscar
+
+        Returns:
+            list: Un vector (np.ndarray) por texto, o None si no está en el caché
+        """
+        keys = [self._key(text) for text in texts]
+        found = [None] * len(texts)
+
+        with self._file_lock(exclusive=False), self._connect() as conn:
+            vectors = self._open_vectors(conn)
+            if vectors is None:
+                return found
+
+            slots = {}
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                for key, slot in conn.execute(
+                    f"SELECT key, slot FROM entries WHERE key IN ({placeholders})", chunk
+                ):
+                    slots[key] = slot
+
+            for i, key in enumerate(keys):
+                if key in slots:
+                    found[i] = np.array(vectors[slots[key]])
+
+            # El uso reciente (LRU) se escribe más tarde, en lote
+            now = time.time()
+            self._touched.update((key, now) for key in slots)
+            flush_touches = len(self._touched) >= TOUCH_BATCH_SIZE
+
+        if flush_touches:
+            with self._file_lock(exclusive=True), self._connect() as conn:
+                self._write_touches(conn)
+
+        return found
+
+    def put_many(self, texts, embeddings):
+        """
+        Guarda los embeddings de varios textos, descartando los menos usados si hace falta
+
+        Args:
+            texts (list): Textos
+            embeddings (np.ndarray): Matriz de embeddings, una fila por texto
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if len(texts) == 0:
+            return
+
+        # Un texto repetido se guarda una sola vez
+        unique = {}
+        for text, vector in zip(texts, embeddings):
+            unique[self._key(text)] = vector
+        items = list(unique.items())[:self.max_entries]
+
+        now = time.time()
+        with self._file_lock(exclusive=True), self._connect() as conn:
+            vectors = self._open_vectors(conn, dim=embeddings.shape[1])
+            if vectors.shape[1] != embeddings.shape[1]:
+                print(f"Dimensión de embeddings distinta a la del caché {self.cache_dir}, no se guardan")
+                return
+
+            existing = set()
+            for i in range(0, len(items), 500):
+                chunk = [key for key, _ in items[i:i + 500]]
+                placeholders = ','.join('?' * len(chunk))
+                existing.update(
+                    key for (key,) in conn.execute(f"SELECT key FROM entries WHERE key IN ({placeholders})", chunk)
+                )
+            # Las lecturas pendientes (y los textos repetidos del lote) cuentan como uso
+            # reciente antes de elegir qué desalojar
+            self._touched.update((key, now) for key in existing)
+            self._write_touches(conn)
+
+            new_items = [(key, vector) for key, vector in items if key not in existing]
+            if not new_items:
+                return
+
+            used_slots = {slot for (slot,) in conn.execute("SELECT slot FROM entries")}
+            free_slots = [slot for slot in range(self.max_entries) if slot not in used_slots]
+
+            # Desalojar las entradas usadas hace más tiempo hasta tener lugar
+            missing = len(new_items) - len(free_slots)
+            if missing > 0:
+                candidates = conn.execute(
+                    "SELECT key, slot FROM entries ORDER BY last_used ASC LIMIT ?",
+                    (missing + len(existing),)
+                ).fetchall()
+                # Los textos del lote actual que ya estaban en el caché no se desalojan
+                evicted = [(key, slot) for key, slot in candidates if key not in existing][:missing]
+                conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key, _ in evicted])
+                free_slots.extend(slot for _, slot in evicted)
+
+            rows = []
+            for (key, vector), slot in zip(new_items, free_slots):
+                vectors[slot] = vector
+                rows.append((key, slot, now))
+            vectors.flush()
+
+            conn.executemany("INSERT INTO entries (key, slot, last_used) VALUES (?, ?, ?)", rows)
+
+
+class CachedEmbedder:
+    """
+    Backend de KeyBERT que consulta el EmbeddingCache antes de llamar al modelo.
+    Solo los textos que no están en el caché pasan por el modelo.
+
+    KeyBERT solo usa el método embed() del backend, así que no hace falta heredar de
+    keybert.backend.BaseEmbedder (importarlo cargaría sentence-transformers).
+    """
+
+    def __init__(self, embedder, cache):
+        """
+        Args:
+            embedder (BaseEmbedder): Backend real de KeyBERT
+            cache (EmbeddingCache): Caché de embeddings
+        """
+        self.embedder = embedder
+        self.cache = cache
+
+    def embed(self, documents, verbose=False):
+        documents = list(documents)
+
+        try:
+            cached = self.cache.get_many(documents)
+        except Exception as e:
+            print(f"Error al leer el caché de embeddings: {e}")
+            cached = [None] * len(documents)
+
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+        if missing:
+            missing_docs = [documents[i] for i in missing]
+            new_vectors = np.asarray(self.embedder.embed(missing_docs, verbose), dtype=np.float32)
+
+            for i, vector in zip(missing, new_vectors):
+                cached[i] = vector
+
+            try:
+                self.cache.put_many(missing_docs, new_vectors)
+            except Exception as e:
+                print(f"Error al guardar en el caché de embeddings: {e}")
+
+        if not documents:
+            return np.empty((0, 0), dtype=np.float32)
+
+        return np.vstack(cached)
@@ -0,0 +1,451 @@
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+from datetime import datetime, timezone
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+DOCX_MIME_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+# Errores que se inyectan: (estado HTTP, motivo de la API de Drive)
+INJECTED_ERRORS = [
+    (403, 'rateLimitExceeded'),
+    (429, 'rateLimitExceeded'),
+    (500, 'backendError'),
+    (503, 'backendError'),
+]
+
+# Campos que la API devuelve por defecto si la consulta no pide otros
+DEFAULT_FIELDS = ['id', 'name', 'mimeType']
+
+
+def _parse_fields(fields):
+    """
+    Extrae la lista de campos de un archivo de una expresión como
+    "nextPageToken, files(id, name, parents)"
+    """
+    if not fields:
+        return DEFAULT_FIELDS
+    match = re.search(r'files\(([^)]*)\)', fields)
+    if match:
+        return [field.strip() for field in match.group(1).split(',') if field.strip()]
+    return [field.strip() for field in fields.split(',') if field.strip()]
+
+
+def _parse_change_fields(fields):
+    """
+    Extrae la lista de campos del archivo de cada cambio de una expresión como
+    "newStartPageToken, changes(fileId, removed, file(id, name, parents))"
+    """
+    match = re.search(r'\bfile\(([^)]*)\)', fields or '')
+    if match:
+        return [field.strip() for field in match.group(1).split(',') if field.strip()]
+    return DEFAULT_FIELDS
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+class FakeDriveService:
+    """
+    Sustituto local del cliente de Google Drive v3 (build('drive', 'v3')) para medir el
+    procesamiento sin acceder a Drive.
+
+    Implementa lo que usa GoogleDriveTopicModelling: files().list (con consultas por
+    padre, mimeType y nombre, y paginación), files().get, files().get_media compatible
+    con MediaIoBaseDownload y new_batch_http_request, más el feed de cambios
+    (changes().getStartPageToken y changes().list) que usa DriveWatcher: cada alta,
+    modificación o borrado agrega una entrada al feed. Cada ida y vuelta puede tener una
+    latencia simulada y fallar con una probabilidad configurable (403/429/5xx).
+    Es thread-safe, así puede compartirse entre los hilos de descarga.
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, seed=None, bandwidth=None):
+        """
+        Args:
+            latency (float): Segundos de latencia por petición (ida y vuelta)
+            error_rate (float): Probabilidad de que una petición falle (0 a 1)
+            seed (int): Semilla para la latencia y los errores inyectados
+            bandwidth (float): Bytes por segundo de las descargas (None = sin límite)
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.bandwidth = bandwidth
+
+        self._files = {}
+        self._children = {}
+        self._contents = {}
+        self._next_id = 0
+        self._changes = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        # Peticiones recibidas por tipo ('list', 'get', 'get_media', 'batch') y errores inyectados
+        self.calls = {}
+        self.injected_errors = 0
+
+    # --- Construcción del árbol ---
+
+    def _new_id(self):
+        with self._lock:
+            self._next_id += 1
+            return f"fake{self._next_id:07d}"
+
+    def add_folder(self, name, parent_id=None, file_id=None):
+        """
+        Agrega una carpeta
+
+        Returns:
+            str: ID de la carpeta
+        """
+        return self._add(name, FOLDER_MIME_TYPE, parent_id, file_id, None)
+
+    def add_file(self, name, parent_id, content, mime_type=DOCX_MIME_TYPE, file_id=None):
+        """
+        Agrega un archivo con su contenido
+
+        Returns:
+            str: ID del archivo
+        """
+        return self._add(name, mime_type, parent_id, file_id, content)
+
+    def _add(self, name, mime_type, parent_id, file_id, content):
+        file_id = file_id or self._new_id()
+        metadata = {
+            'id': file_id,
+            'name': name,
+            'mimeType': mime_type,
+            'parents': [parent_id] if parent_id else [],
+            'modifiedTime': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+            'webViewLink': f"https://docs.google.com/document/d/{file_id}/edit",
+        }
+        if content is not None:
+            metadata['md5Checksum'] = hashlib.md5(content).hexdigest()
+            metadata['size'] = str(len(content))
+            self._contents[file_id] = content
+
+        self._files[file_id] = metadata
+        self._children.setdefault(parent_id, []).append(file_id)
+        self._record_change(file_id)
+        return file_id
+
+    def update_file(self, file_id, content):
+        """
+        Reemplaza el contenido de un archivo (cambia su md5Checksum y modifiedTime)
+        """
+        metadata = self._files[file_id]
+        metadata['md5Checksum'] = hashlib.md5(content).hexdigest()
+        metadata['size'] = str(len(content))
+        metadata['modifiedTime'] = _now()
+        self._contents[file_id] = content
+        self._record_change(file_id)
+
+    def rename_file(self, file_id, name):
+        """
+        Cambia el nombre de un archivo o carpeta
+        """
+        self._files[file_id]['name'] = name
+        self._files[file_id]['modifiedTime'] = _now()
+        self._record_change(file_id)
+
+    def delete_file(self, file_id):
+        """
+        Elimina un archivo o carpeta (sin su contenido: las carpetas deben estar vacías)
+        """
+        metadata = self._files.pop(file_id)
+        for parent_id in metadata['parents'] or [None]:
+            self._children[parent_id].remove(file_id)
+        self._contents.pop(file_id, None)
+        self._record_change(file_id)
+
+    def _record_change(self, file_id):
+        """
+        Agrega una entrada al feed de cambios; el token de página es su posición
+        """
+        with self._lock:
+            self._changes.append((file_id, _now()))
+
+    # --- Simulación de red ---
+
+    def _round_trip(self, kind, size=0):
+        """
+        Simula una petición: cuenta la llamada, espera la latencia y quizás falla
+
+        Returns:
+            tuple: (estado HTTP, motivo) del error inyectado, o None si la petición funciona
+        """
+        with self._lock:
+            self.calls[kind] = self.calls.get(kind, 0) + 1
+            failure = None
+            if self.error_rate and self._random.random() < self.error_rate:
+                failure = self._random.choice(INJECTED_ERRORS)
+                self.injected_errors += 1
+
+        delay = self.latency
+        if self.bandwidth and size:
+            delay += size / self.bandwidth
+        if delay:
+            time.sleep(delay)
+        return failure
+
+    @staticmethod
+    def _error_response(failure):
+        """
+        Respuesta HTTP y cuerpo JSON de un error de la API de Drive
+        """
+        status, reason = failure
+        resp = httplib2.Response({'status': status, 'content-type': 'application/json'})
+        resp.reason = reason
+        content = json.dumps({
+            'error': {
+                'code': status,
+                'message': f"Error simulado: {reason}",
+                'errors': [{'reason': reason, 'message': f"Error simulado: {reason}"}],
+            }
+        }).encode('utf-8')
+        return resp, content
+
+    @staticmethod
+    def _http_error(failure, uri=None):
+        resp, content = FakeDriveService._error_response(failure)
+        return HttpError(resp, content, uri=uri)
+
+    # --- Consultas ---
+
+    def _matches(self, metadata, query):
+        """
+        Evalúa las consultas que usa la aplicación: padres unidos con "or" y el resto
+        de las condiciones con "and" (mimeType, name =, name contains, trashed)
+        """
+        parents = re.findall(r"'([^']+)' in parents", query)
+        if parents and not set(parents) & set(metadata['parents']):
+            return False
+
+        mime_type = re.search(r"mimeType\s*=\s*'([^']+)'", query)
+        if mime_type and metadata['mimeType'] != mime_type.group(1):
+            return False
+
+        for name in re.findall(r"name\s*=\s*'([^']+)'", query):
+            if metadata['name'] != name:
+                return False
+
+        for fragment in re.findall(r"name contains '([^']+)'", query):
+            if fragment.lower() not in metadata['name'].lower():
+                return False
+
+        return True
+
+    def _query(self, query):
+        parents = re.findall(r"'([^']+)' in parents", query or '')
+        if parents:
+            candidates = [file_id for parent in parents for file_id in self._children.get(parent, [])]
+        else:
+            candidates = list(self._files)
+        return [self._files[file_id] for file_id in candidates if self._matches(self._files[file_id], query or '')]
+
+    def files(self):
+        return _FilesResource(self)
+
+    def changes(self):
+        return _ChangesResource(self)
+
+    def new_batch_http_request(self, callback=None):
+        return _FakeBatch(self, callback)
+
+
+class _FilesResource:
+    """
+    Equivalente de service.files()
+    """
+
+    def __init__(self, service):
+        self._service = service
+
+    def list(self, q=None, fields=None, pageSize=100, pageToken=None, **kwargs):
+        service = self._service
+
+        def run():
+            matches = service._query(q)
+            start = int(pageToken or 0)
+            page = matches[start:start + pageSize]
+            wanted = _parse_fields(fields)
+            result = {'files': [{key: f[key] for key in wanted if key in f} for f in page]}
+            if start + pageSize < len(matches):
+                result['nextPageToken'] = str(start + pageSize)
+            return result
+
+        return _FakeRequest(service, 'list', run)
+
+    def get(self, fileId, fields=None, **kwargs):
+        service = self._service
+
+        def run():
+            if fileId not in service._files:
+                raise FakeDriveService._http_error((404, 'notFound'))
+            metadata = service._files[fileId]
+            if not fields:
+                return {key: metadata[key] for key in DEFAULT_FIELDS}
+            return {key: metadata[key] for key in _parse_fields(fields) if key in metadata}
+
+        return _FakeRequest(service, 'get', run)
+
+    def get_media(self, fileId, **kwargs):
+        return _FakeMediaRequest(self._service, fileId)
+
+
+class _ChangesResource:
+    """
+    Equivalente de service.changes(). Como en Drive, cada cambio trae el estado actual
+    del archivo, o removed=True si ya no existe
+    """
+
+    def __init__(self, service):
+        self._service = service
+
+    def getStartPageToken(self, **kwargs):
+        service = self._service
+        return _FakeRequest(service, 'changes', lambda: {'startPageToken': str(len(service._changes))})
+
+    def list(self, pageToken, fields=None, pageSize=100, includeRemoved=True, **kwargs):
+        service = self._service
+
+        def run():
+            start = int(pageToken)
+            entries = service._changes[start:start + pageSize]
+            wanted = _parse_change_fields(fields)
+
+            changes = []
+            for file_id, change_time in entries:
+                metadata = service._files.get(file_id)
+                if metadata is None and not includeRemoved:
+                    continue
+                change = {'changeType': 'file', 'fileId': file_id, 'time': change_time, 'removed': metadata is None}
+                if metadata is not None:
+                    change['file'] = {key: metadata[key] for key in wanted if key in metadata}
+                changes.append(change)
+
+            result = {'changes': changes}
+            if start + pageSize < len(service._changes):
+                result['nextPageToken'] = str(start + pageSize)
+            else:
+                result['newStartPageToken'] = str(len(service._changes))
+            return result
+
+        return _FakeRequest(service, 'changes', run)
+
+
+class _FakeRequest:
+    """
+    Equivalente de HttpRequest para consultas de metadatos
+    """
+
+    def __init__(self, service, kind, run):
+        self._service = service
+        self._kind = kind
+        self._run = run
+
+    def execute(self, num_retries=0, _batched=False):
+        if not _batched:
+            failure = self._service._round_trip(self._kind)
+            if failure:
+                raise FakeDriveService._http_error(failure)
+        return self._run()
+
+
+class _FakeMediaRequest:
+    """
+    Petición de descarga compatible con MediaIoBaseDownload: expone uri, headers y un
+    objeto http cuyo request() responde a cada rango pedido
+    """
+
+    def __init__(self, service, file_id):
+        self._service = service
+        self.file_id = file_id
+        self.uri = f"https://www.googleapis.com/drive/v3/files/{file_id}?alt=media"
+        self.headers = {}
+        self.http = self
+
+    def request(self, uri, method='GET', headers=None, **kwargs):
+        content = self._service._contents.get(self.file_id)
+        if content is None:
+            return httplib2.Response({'status': 404}), b''
+
+        start, end = 0, len(content) - 1
+        match = re.match(r'bytes=(\d+)-(\d+)', (headers or {}).get('range', ''))
+        if match:
+            start, end = int(match.group(1)), min(int(match.group(2)), len(content) - 1)
+        chunk = content[start:end + 1]
+
+        failure = self._service._round_trip('get_media', size=len(chunk))
+        if failure:
+            return FakeDriveService._error_response(failure)
+
+        resp = httplib2.Response({
+            'status': 206,
+            'content-range': f"bytes {start}-{end}/{len(content)}",
+        })
+        return resp, chunk
+
+    def execute(self, num_retries=0):
+        failure = self._service._round_trip('get_media', size=len(self._service._contents.get(self.file_id, b'')))
+        if failure:
+            raise FakeDriveService._http_error(failure, uri=self.uri)
+        return self._service._contents[self.file_id]
+
+
+class _FakeBatch:
+    """
+    Equivalente de BatchHttpRequest: una sola ida y vuelta para todas las peticiones
+    """
+
+    def __init__(self, service, callback):
+        self._service = service
+        self._callback = callback
+        self._requests = []
+
+    def add(self, request, callback=None, request_id=None):
+        self._requests.append((request_id, request, callback))
+
+    def execute(self, http=None):
+        failure = self._service._round_trip('batch')
+        if failure:
+            raise FakeDriveService._http_error(failure)
+
+        for request_id, request, callback in self._requests:
+            callback = callback or self._callback
+            response, exception = None, None
+            try:
+                # Dentro de un batch también pueden fallar peticiones individuales
+                with self._service._lock:
+                    fails = self._service.error_rate and self._service._random.random() < self._service.error_rate
+                    if fails:
+                        self._service.injected_errors += 1
+                        failure = self._service._random.choice(INJECTED_ERRORS)
+                if fails:
+                    raise FakeDriveService._http_error(failure)
+                response = request.execute(_batched=True)
+            except HttpError as e:
+                exception = e
+            if callback is not None:
+                callback(request_id, response, exception)
+
+
+class FakeDrivePool:
+    """
+    Equivalente de DriveServicePool que entrega el mismo FakeDriveService a todos los
+    hilos (se usa con GoogleDriveTopicModelling.use_drive_pool)
+    """
+
+    def __init__(self, service):
+        self.service = service
+        # Cualquier valor no nulo: habilita el procesamiento con varios hilos
+        self.credentials = 'sintetico'
+
+    def get(self):
+        return self.service
@@ -0,0 +1,76 @@
+import threading
+from collections import OrderedDict, defaultdict
+
+# Columnas de keywords del DataFrame de resultados
+KEYWORD_COLUMNS = [f'keyword {i}' for i in range(1, 6)]
+
+
+class KeywordIndex:
+    """
+    Índice invertido keyword -> proyectos, construido una vez por snapshot de resultados.
+
+    Cada keyword apunta al conjunto de posiciones (filas) de los proyectos que la tienen,
+    así una búsqueda es una unión (OR) o intersección (AND) de conjuntos en lugar de
+    recorrer las columnas del DataFrame. Las consultas recientes se memorizan.
+    """
+
+    def __init__(self, df, memo_size=256):
+        """
+        Args:
+            df (pd.DataFrame): Resultados del procesamiento (no se modifica)
+            memo_size (int): Número de consultas recientes que se memorizan
+        """
+        self.memo_size = memo_size
+        self._memo = OrderedDict()
+        self._memo_lock = threading.Lock()
+
+        postings = defaultdict(set)
+        for col_name in KEYWORD_COLUMNS:
+            if col_name not in df.columns:
+                continue
+            for position, keyword in enumerate(df[col_name].tolist()):
+                if keyword and isinstance(keyword, str) and keyword.strip():
+                    postings[keyword].add(position)
+
+        self.postings = {keyword: frozenset(positions) for keyword, positions in postings.items()}
+        self.keywords = sorted(self.postings)
+
+    def match(self, keywords, mode='or'):
+        """
+        Posiciones de los proyectos que cumplen la consulta
+
+        Args:
+            keywords (list): Keywords seleccionadas
+            mode (str): 'or' (alguna de las keywords) o 'and' (todas)
+
+        Returns:
+            tuple: Posiciones de las filas en orden ascendente
+        """
+        if not keywords:
+            return ()
+
+        key = (mode, frozenset(keywords))
+        with self._memo_lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                return self._memo[key]
+
+        # Empezar por las listas más cortas acota el trabajo de la intersección
+        postings = sorted((self.postings.get(keyword, frozenset()) for keyword in key[1]), key=len)
+        if mode == 'and':
+            positions = set(postings[0])
+            for posting in postings[1:]:
+                if not positions:
+                    break
+                positions &= posting
+        else:
+            positions = set().union(*postings)
+
+        result = tuple(sorted(positions))
+
+        with self._memo_lock:
+            self._memo[key] = result
+            if len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+
+        return result
@@ -1,63 +1,333 @@
 import os
 import re
-import io
-import docx
+import json
+import time
+import threading
 import pandas as pd
 import numpy as np
 from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
-# Procesamiento de texto
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
+# Las dependencias pesadas (NLTK, KeyBERT/sentence-transformers y el cliente de la API
+# de Google Drive) se importan recién cuando se usan, así importar este módulo es casi
+# instantáneo y autenticar o subir un Excel no carga el modelo
 
-# Google Drive API
-from googleapiclient.discovery import build
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.http import MediaIoBaseDownload
-from google.oauth2 import service_account
+from embedding_cache import EmbeddingCache, CachedEmbedder
+from onnx_embedder import OnnxEmbedder, EMBEDDING_BACKENDS, embedding_model_key
 
-# Solo KeyBERT para extracción de palabras clave
-from keybert import KeyBERT
+# Extracción de título y resumen de los documentos de sistematización
+from docx_extractor import extraer_datos_documento
+from pipeline import ProcessingPipeline
+from results_store import ResultsStore
+from search_index import BM25Index
+from vector_index import VectorIndex
+from metrics import MetricsRecorder
+from blob_cache import BlobCache
+from download_buffer import DownloadBuffer, ByteBudget, SPOOL_THRESHOLD
+from drive_scheduler import DriveScheduler
+from drive_client import DriveServicePool, build_drive_service
 
-# Descargar recursos de NLTK si no están presentes
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+# Recursos de NLTK necesarios para stopwords y tokenización
+NLTK_RESOURCES = [
+    ('tokenizers/punkt', 'punkt'),
+    ('tokenizers/punkt_tab', 'punkt_tab'),
+    ('corpora/stopwords', 'stopwords'),
+]
+
+_nltk_ready = False
+_nltk_lock = threading.Lock()
+
+# Modelos KeyBERT cargados en este proceso, compartidos entre instancias:
+# (modelo, carpeta de caché, backend, hilos) -> (KeyBERT, lock de inferencia)
+_shared_models = {}
+_shared_models_lock = threading.Lock()
+
+
+def ensure_nltk_resources():
+    """
+    Descarga los recursos de NLTK si no están presentes. La verificación se hace una
+    sola vez por proceso.
+    """
+    global _nltk_ready
     
-try:
-    nltk.data.find('tokenizers/punkt_tab')
-except LookupError:
-    nltk.download('punkt_tab')
+    if _nltk_ready:
+        return
     
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+    with _nltk_lock:
+        if _nltk_ready:
+            return
+        
+        import nltk
+        
+        # Descargar recursos de NLTK si no están presentes
+        for resource_path, package in NLTK_RESOURCES:
+            try:
+                nltk.data.find(resource_path)
+            except LookupError:
+                nltk.download(package)
+        
+        _nltk_ready = True
+
+
+class SerializedEmbedder:
+    """
+    Backend de KeyBERT que toma el lock del modelo en cada llamada a embed(): las
+    inferencias sobre el modelo compartido van de a una, pero una consulta de búsqueda
+    solo espera a la inferencia en curso y no a todo un lote de keywords
+    """
+    
+    def __init__(self, embedder, lock):
+        """
+        Args:
+            embedder (BaseEmbedder): Backend real de KeyBERT
+            lock (threading.Lock): Lock que serializa la inferencia
+        """
+        self.embedder = embedder
+        self.lock = lock
+    
+    def embed(self, documents, verbose=False):
+        with self.lock:
+            return self.embedder.embed(documents, verbose)
+
+
+def get_shared_keybert(model_name=None, embedding_cache_dir='cache_embeddings', embedding_cache_size=100000,
+                       backend='pytorch', threads=None):
+    """
+    Devuelve un modelo KeyBERT cargado una sola vez por proceso y compartido entre
+    instancias de GoogleDriveTopicModelling
+    
+    Args:
+        model_name (str): Modelo de sentence-transformers (None = KEYBERT_MODEL_NAME)
+        embedding_cache_dir (str): Carpeta del caché de embeddings (None para desactivarlo)
+        embedding_cache_size (int): Número máximo de embeddings en el caché
+        backend (str): Cálculo de los embeddings: 'pytorch' (sentence-transformers en
+            fp32), 'onnx' (ONNX Runtime) u 'onnx-int8' (ONNX Runtime con pesos int8)
+        threads (int): Hilos intra-op de la inferencia en CPU (None = valor por defecto
+            del backend)
+        
+    Returns:
+        tuple: (KeyBERT, threading.Lock que serializa cada inferencia sobre ese modelo)
+    """
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Backend de embeddings no soportado: {backend}")
+    
+    model_name = model_name or KEYBERT_MODEL_NAME
+    key = (model_name, embedding_cache_dir, backend, threads)
+    
+    with _shared_models_lock:
+        if key not in _shared_models:
+            from keybert import KeyBERT
+            
+            print(f"Cargando modelo KeyBERT ({model_name}, backend {backend})...")
+            if backend == 'pytorch':
+                if threads:
+                    import torch
+                    torch.set_num_threads(threads)
+                keybert_model = KeyBERT(model=model_name)
+            else:
+                # Con un backend vacío KeyBERT no carga el modelo de PyTorch; después se
+                # reemplaza por el de ONNX Runtime (KeyBERT solo usa su método embed())
+                from keybert.backend import BaseEmbedder
+                
+                keybert_model = KeyBERT(model=BaseEmbedder())
+                keybert_model.model = OnnxEmbedder(model_name, quantized=backend == 'onnx-int8', threads=threads)
+            
+            model_lock = threading.Lock()
+            keybert_model.model = SerializedEmbedder(keybert_model.model, model_lock)
+            
+            # Caché de embeddings de resúmenes y n-gramas candidatos, compartido entre ejecuciones
+            if embedding_cache_dir:
+                try:
+                    cache = EmbeddingCache(
+                        embedding_cache_dir, embedding_model_key(model_name, backend), max_entries=embedding_cache_size
+                    )
+                    keybert_model.model = CachedEmbedder(keybert_model.model, cache)
+                except Exception as e:
+                    print(f"No se pudo abrir el caché de embeddings {embedding_cache_dir}: {e}")
+            
+            _shared_models[key] = (keybert_model, model_lock)
+        
+        return _shared_models[key]
+
+
+# Versión del formato del manifiesto de sistematizaciones procesadas.
+# Incrementarla invalida los registros guardados (por ejemplo, al cambiar la extracción)
+MANIFEST_VERSION = 2
+
+# Campos pedidos al listar archivos de sistematización (incluye webViewLink y la huella)
+SISTEMATIZACION_FIELDS = "files(id, name, webViewLink, md5Checksum, modifiedTime, size)"
+
+# Columnas del DataFrame de resultados (el índice es el ID de archivo)
+RESULT_COLUMNS = ['Diplomado', 'Nombre de documento', 'Título del proyecto', 'Enlace de descarga'] + [f'keyword {i+1}' for i in range(5)]
+
+# Bytes pedidos a Drive por petición al descargar (acota la respuesta en memoria)
+DOWNLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Máximo de llamadas por petición batch que admite la API de Drive
+DRIVE_BATCH_SIZE = 100
+
+# Carpetas padre unidas con "or" en una misma consulta (limita el largo de la consulta)
+PARENTS_PER_QUERY = 40
+
+# Documentos por llamada a KeyBERT en la extracción por lotes
+KEYBERT_BATCH_SIZE = 256
+
+# Grupos terminados entre dos guardados del manifiesto en el procesamiento sin pipeline
+# (sus keywords se extraen en ese momento, en un lote)
+MANIFEST_CHECKPOINT_GROUPS = 100
+
+# Modelo de sentence-transformers usado por KeyBERT (el mismo que KeyBERT usa por defecto)
+KEYBERT_MODEL_NAME = 'all-MiniLM-L6-v2'
 
 
 class GoogleDriveTopicModelling:
-    def __init__(self, language='spanish'):
+    def __init__(self, language='spanish', manifest_path='manifest_sistematizaciones.json', max_workers=1,
+                 embedding_cache_dir='cache_embeddings', embedding_cache_size=100000, docx_engine='stream',
+                 use_pipeline=False, keybert_model=None, search_index_path='indice_busqueda.sqlite',
+                 vector_index_path='indice_semantico.npz', vector_dtype='float32', ann_threshold=20000,
+                 metrics_dir='metricas', drive_scheduler=None, blob_cache_dir='cache_documentos',
+                 blob_cache_size=2 * 1024 ** 3, spool_threshold=SPOOL_THRESHOLD,
+                 max_inflight_bytes=256 * 1024 ** 2, embedding_backend='pytorch', embedding_threads=None):
         """
         Inicializa el extractor de palabras clave con Google Drive integration
         
         Args:
             language (str): Idioma para stopwords ('spanish' o 'english')
+            manifest_path (str): Ruta del manifiesto con los documentos ya procesados
+                (None para desactivar el procesamiento incremental)
+            max_workers (int): Número de hilos para procesar diplomados y grupos
+                (1 = procesamiento secuencial)
+            embedding_cache_dir (str): Carpeta del caché persistente de embeddings
+                (None para desactivarlo)
+            embedding_cache_size (int): Número máximo de embeddings en el caché
+            docx_engine (str): Lector de documentos: 'stream' (OOXML incremental) o 'python-docx'
+            use_pipeline (bool): Procesar con el pipeline por etapas (descarga, parseo en
+                procesos y embeddings por lotes superpuestos)
+            keybert_model (KeyBERT): Modelo ya cargado a reutilizar (opcional). Si no se
+                indica, se usa el modelo compartido del proceso, cargado en el primer uso
+            search_index_path (str): Ruta del índice BM25 de títulos y resúmenes
+                (None para no mantenerlo)
+            vector_index_path (str): Ruta del índice semántico con los embeddings de los
+                resúmenes (None para no mantenerlo)
+            vector_dtype (str): Tipo de la matriz de embeddings: 'float32' o 'int8'
+            ann_threshold (int): Documentos a partir de los cuales la búsqueda semántica
+                usa un índice aproximado (None para buscar siempre de forma exacta)
+            metrics_dir (str): Carpeta donde se exportan las métricas por etapa de cada
+                ejecución (None para no exportarlas)
+            drive_scheduler (DriveScheduler): Planificador de peticiones a Drive a compartir
+                (opcional). Si no se indica, se crea uno con concurrencia máxima max_workers
+            blob_cache_dir (str): Carpeta de la caché de documentos descargados, por ID y
+                md5Checksum (None para desactivarla)
+            blob_cache_size (int): Tamaño máximo de la caché de documentos, en bytes
+            spool_threshold (int): Bytes a partir de los cuales una descarga se guarda en
+                un archivo temporal en lugar de en memoria
+            max_inflight_bytes (int): Máximo de bytes descargados y todavía sin procesar
+                entre todos los hilos (None = sin límite)
+            embedding_backend (str): Cálculo de los embeddings de KeyBERT: 'pytorch',
+                'onnx' u 'onnx-int8' (ver get_shared_keybert)
+            embedding_threads (int): Hilos intra-op de la inferencia en CPU (None = valor
+                por defecto del backend)
         """
         self.language = language
-        # Configurar stopwords según el idioma
-        self.stop_words = set(stopwords.words(language if language != 'spanish' else 'spanish'))
+        self.docx_engine = docx_engine
+        self.use_pipeline = use_pipeline
+        # Stopwords según el idioma, cargadas en el primer uso
+        self._stop_words = None
         
-        # Inicializar KeyBERT
-        self.keybert_model = KeyBERT()
+        # KeyBERT se carga en el primer uso (ver la propiedad keybert_model)
+        self._keybert_model = keybert_model
+        self.embedding_cache_dir = embedding_cache_dir
+        self.embedding_cache_size = embedding_cache_size
+        self.embedding_backend = embedding_backend
+        self.embedding_threads = embedding_threads
+        self._keyword_vectorizer = None
         
         # Google Drive API setup
         self.SCOPES = ['https://www.googleapis.com/auth/drive']
         self.service = None
+        self.credentials = None
+        self._drive_pool = None
+        
+        # Procesamiento concurrente: cada hilo usa su propio cliente de Drive,
+        # porque el transporte httplib2 de build('drive', 'v3') no es thread-safe
+        self.max_workers = max(1, int(max_workers))
+        self._thread_local = threading.local()
+        
+        # Todas las peticiones a Drive pasan por el planificador: cuota, concurrencia
+        # adaptativa y reintentos con backoff ante errores 403/429/5xx
+        self.drive_scheduler = drive_scheduler or DriveScheduler(max_concurrency=self.max_workers)
+        
+        # Manifiesto para procesamiento incremental: file_id -> huella + registro extraído
+        self.manifest_path = manifest_path
+        self.manifest = None
+        self._manifest_modified = False
+        self._manifest_lock = threading.RLock()
         
+        # Índice de texto completo, se abre en el primer uso
+        self.search_index_path = search_index_path
+        self._search_index = None
+        
+        # Índice semántico, se abre en el primer uso
+        self.vector_index_path = vector_index_path
+        self.vector_dtype = vector_dtype
+        self.ann_threshold = ann_threshold
+        self._vector_index = None
+        
+        # Seguimiento y cancelación de la ejecución en curso (ver process_all_diplomados)
+        self._progress_callback = None
+        self._cancel_event = None
+        
+        # Caché en disco de los documentos descargados, se abre en el primer uso
+        self.blob_cache_dir = blob_cache_dir
+        self.blob_cache_size = blob_cache_size
+        self._blob_cache = None
+        self._blob_cache_lock = threading.Lock()
+        
+        # Descargas en buffers que pasan a disco al crecer, con un límite de bytes en curso
+        self.spool_threshold = spool_threshold
+        self.download_budget = ByteBudget(max_inflight_bytes)
+        
+        # Tiempos, volumen y errores por etapa; se reinician en cada process_all_diplomados
+        self.metrics_dir = metrics_dir
+        self.metrics = MetricsRecorder()
+        self.drive_scheduler.metrics = self.metrics
+        self._seen_file_ids = set()
+        # Documentos que no se pudieron procesar por un error (descarga, parseo o keywords)
+        self._failed_file_ids = set()
+        
+        # True si en el último recorrido falló alguna consulta de carpetas o archivos: los
+        # grupos afectados parecen vacíos, así que no se poda el manifiesto con ese recorrido
+        self.crawl_incomplete = False
+        
+        # Árbol de carpetas (crawl_folder_tree) y sistematización elegida en cada carpeta
+        # de grupo ({ID de carpeta: ID de archivo}) del último recorrido
+        self._folder_tree = []
+        self._group_files = {}
+        
+    @property
+    def stop_words(self):
+        """
+        Stopwords del idioma configurado (se cargan de NLTK en el primer uso)
+        """
+        if self._stop_words is None:
+            ensure_nltk_resources()
+            from nltk.corpus import stopwords
+            # Configurar stopwords según el idioma
+            self._stop_words = set(stopwords.words(self.language if self.language != 'spanish' else 'spanish'))
+        return self._stop_words
+    
+    @property
+    def keybert_model(self):
+        """
+        Modelo KeyBERT; se carga en el primer uso y se comparte entre las instancias del proceso
+        """
+        if self._keybert_model is None:
+            self._keybert_model, _ = get_shared_keybert(
+                KEYBERT_MODEL_NAME, self.embedding_cache_dir, self.embedding_cache_size,
+                backend=self.embedding_backend, threads=self.embedding_threads
+            )
+        return self._keybert_model
+    
     def authenticate_with_service_account(self, credentials_dict):
         """
         Autentica con Google Drive API usando credenciales de service account
@@ -66,10 +336,12 @@ class GoogleDriveTopicModelling:
             credentials_dict (dict): Diccionario con las credenciales del service account
         """
         try:
+            from google.oauth2 import service_account
+            
             credentials = service_account.Credentials.from_service_account_info(
                 credentials_dict, scopes=self.SCOPES
             )
-            self.service = build('drive', 'v3', credentials=credentials)
+            self.use_drive_pool(DriveServicePool(credentials, size=self.max_workers))
             print("Autenticación con Service Account exitosa!")
             return True
         except Exception as e:
@@ -84,6 +356,10 @@ class GoogleDriveTopicModelling:
             credentials_file (str): Ruta al archivo credentials.json descargado de Google Cloud Console
             token_file (str): Ruta donde se guardará el token de acceso
         """
+        from google.oauth2.credentials import Credentials
+        from google.auth.transport.requests import Request
+        from google_auth_oauthlib.flow import InstalledAppFlow
+        
         creds = None
         
         # Si hay un token existente y está dando problemas, eliminarlo
@@ -121,7 +397,7 @@ class GoogleDriveTopicModelling:
                 token.write(creds.to_json())
             print("Nuevas credenciales guardadas.")
         
-        self.service = build('drive', 'v3', credentials=creds)
+        self.use_drive_pool(DriveServicePool(creds, size=self.max_workers))
         print("Autenticación con Google Drive exitosa!")
     
     def reset_authentication(self, token_file='token.json'):
@@ -134,6 +410,272 @@ class GoogleDriveTopicModelling:
         else:
             print("No hay token para eliminar.")
 
+    @property
+    def service(self):
+        """
+        Cliente principal de Drive: el propio de la instancia o el del pool compartido
+        """
+        if self._service is None and self._drive_pool is not None:
+            return self._drive_pool.get()
+        return self._service
+    
+    @service.setter
+    def service(self, value):
+        self._service = value
+    
+    def use_drive_pool(self, pool):
+        """
+        Usa los clientes de un DriveServicePool compartido en lugar de construir uno propio
+        
+        Args:
+            pool (DriveServicePool): Pool de clientes ya autenticado
+        """
+        self._drive_pool = pool
+        self.credentials = pool.credentials
+        self.service = None
+    
+    def _get_service(self):
+        """
+        Devuelve el cliente de Drive que corresponde al hilo actual
+        
+        Returns:
+            Resource: Cliente propio del hilo worker o el cliente principal
+        """
+        return getattr(self._thread_local, 'service', None) or self.service
+    
+    def _init_worker_service(self):
+        """
+        Construye el cliente de Drive propio de un hilo worker (initializer del pool)
+        """
+        if self._drive_pool is not None:
+            self._thread_local.service = self._drive_pool.get()
+        else:
+            self._thread_local.service = build_drive_service(self.credentials)
+    
+    def _effective_workers(self):
+        """
+        Número de hilos que realmente se pueden usar
+        
+        Returns:
+            int: max_workers, o 1 si no hay credenciales para crear clientes por hilo
+        """
+        if self.max_workers > 1 and self.credentials is None:
+            print("Sin credenciales para crear clientes por hilo, se procesará secuencialmente")
+            return 1
+        return self.max_workers
+    
+    def _map_concurrently(self, func, items, on_chunk=None, chunk_size=None):
+        """
+        Aplica func a cada elemento, en paralelo si hay más de un worker
+        
+        Args:
+            func (callable): Función a aplicar
+            items (list): Elementos a procesar
+            on_chunk (callable): Recibe cada tanda de chunk_size resultados consecutivos
+                apenas se completa, mientras los workers siguen con los demás (opcional)
+            chunk_size (int): Resultados por tanda de on_chunk
+            
+        Returns:
+            list: Resultados en el mismo orden que items
+        """
+        workers = min(self._effective_workers(), len(items))
+        
+        if workers <= 1:
+            return self._collect_in_chunks(map(func, items), on_chunk, chunk_size)
+        
+        with ThreadPoolExecutor(max_workers=workers, initializer=self._init_worker_service) as executor:
+            return self._collect_in_chunks(executor.map(func, items), on_chunk, chunk_size)
+    
+    @staticmethod
+    def _collect_in_chunks(results, on_chunk, chunk_size):
+        """
+        Junta los resultados en orden y entrega cada tanda completa a on_chunk
+        """
+        collected = []
+        chunk = []
+        for result in results:
+            collected.append(result)
+            if on_chunk is None:
+                continue
+            chunk.append(result)
+            if len(chunk) >= chunk_size:
+                on_chunk(chunk)
+                chunk = []
+        
+        if chunk:
+            on_chunk(chunk)
+        return collected
+
+    def _report_failed_document(self, file_info):
+        """
+        Registra un documento que no se pudo procesar por un error. No queda en el
+        manifiesto, así se vuelve a intentar en el siguiente procesamiento
+        
+        Args:
+            file_info (dict): Metadatos del archivo de sistematización
+        """
+        self._failed_file_ids.add(file_info['id'])
+        self._report_progress('grupo', estado='fallido', documento=file_info['name'])
+    
+    def _mark_crawl_incomplete(self, reason):
+        """
+        Registra que una consulta del recorrido falló, así no se toma como que las
+        carpetas o archivos que no se pudieron listar dejaron de existir
+        
+        Args:
+            reason (str): Descripción del error
+        """
+        self.crawl_incomplete = True
+        print(f"⚠️ Recorrido incompleto: {reason}")
+    
+    def _list_all_files(self, query, fields="files(id, name)"):
+        """
+        Lista todos los archivos de una consulta siguiendo nextPageToken
+        
+        Args:
+            query (str): Consulta de la API de Drive
+            fields (str): Campos de cada archivo, con la forma "files(...)"
+            
+        Returns:
+            list: Todos los archivos de todas las páginas
+        """
+        files = []
+        page_token = None
+        
+        while True:
+            start = time.perf_counter()
+            try:
+                results = self.drive_scheduler.execute(self._get_service().files().list(
+                    q=query,
+                    fields=f"nextPageToken, {fields}",
+                    pageSize=1000,
+                    pageToken=page_token
+                ))
+            except Exception:
+                self.metrics.record('drive_listado', time.perf_counter() - start, error=True)
+                raise
+            self.metrics.record('drive_listado', time.perf_counter() - start, items=len(results.get('files', [])))
+            
+            files.extend(results.get('files', []))
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                return files
+    
+    def list_child_folders_bulk(self, parent_ids, extra_query=None):
+        """
+        Lista las subcarpetas de muchas carpetas a la vez, uniendo las condiciones
+        de padre con "or" en una misma consulta y recorriendo todas las páginas
+        
+        Args:
+            parent_ids (list): IDs de las carpetas padre
+            extra_query (str): Condición adicional para la consulta (opcional)
+            
+        Returns:
+            dict: parent_id -> lista de subcarpetas (en el orden devuelto por Drive)
+        """
+        parent_ids = list(dict.fromkeys(parent_ids))
+        children = {parent_id: [] for parent_id in parent_ids}
+        
+        for i in range(0, len(parent_ids), PARENTS_PER_QUERY):
+            chunk = parent_ids[i:i + PARENTS_PER_QUERY]
+            parents_clause = ' or '.join(f"'{parent_id}' in parents" for parent_id in chunk)
+            query = f"({parents_clause}) and mimeType='application/vnd.google-apps.folder'"
+            if extra_query:
+                query += f" and {extra_query}"
+            
+            try:
+                folders = self._list_all_files(query, fields="files(id, name, parents)")
+            except Exception as e:
+                print(f"Error al listar subcarpetas de {len(chunk)} carpetas: {e}")
+                self._mark_crawl_incomplete(f"no se pudieron listar las subcarpetas de {len(chunk)} carpetas")
+                continue
+            
+            for folder in folders:
+                for parent_id in folder.get('parents', []):
+                    if parent_id in children:
+                        children[parent_id].append(folder)
+        
+        return children
+    
+    def _filter_diplomado_folders(self, folders):
+        """
+        Filtra las carpetas que corresponden a diplomados
+        """
+        # Filtrar carpetas que coincidan con el patrón "#. DIPLOMADO"
+        filtered_folders = []
+        for folder in folders:
+            # Buscar patrón: número seguido de punto y DIPLOMADO
+            if 'DIPLOMADO' in folder['name'].upper():
+                filtered_folders.append(folder)
+        return filtered_folders
+    
+    def _select_evidencia_folder(self, folders):
+        """
+        Elige la carpeta "6. EVIDENCIA DE TRABAJOS" entre las subcarpetas de un diplomado
+        """
+        for folder in folders:
+            if 'EVIDENCIA' in folder['name'].upper() and 'TRABAJOS' in folder['name'].upper():
+                return folder
+        return None
+    
+    def _select_modulo_iv_folder(self, folders):
+        """
+        Elige la carpeta "MÓDULO IV" entre las subcarpetas de EVIDENCIA DE TRABAJOS
+        """
+        for folder in folders:
+            if 'MÓDULO' in folder['name'].upper() and 'IV' in folder['name'].upper():
+                return folder
+        return None
+    
+    def _select_group_folders(self, folders):
+        """
+        Filtra las carpetas de grupo de MÓDULO IV, una por número de grupo
+        
+        Returns:
+            tuple: (lista de carpetas de grupo, dict número de grupo -> carpeta)
+        """
+        # Filtrar y procesar carpetas de grupo
+        group_folders = {}
+        
+        for folder in folders:
+            folder_name = folder['name']
+            
+            # Solo procesar carpetas que contengan "grupo" (case insensitive)
+            if 'grupo' not in folder_name.lower():
+                continue
+            
+            # Patrones más flexibles para extraer números
+            patterns = [
+                r'[Gg]rupo\s*0*(\d+)',         # "Grupo 01", "grupo 1", "GRUPO 001"
+                r'[Gg]rupo\s*(\d+)',           # "Grupo1", "grupo23"
+                r'(\d+).*[Gg]rupo',            # "01 Grupo", "1-Grupo"
+                r'(\d+)',                      # Cualquier número en el nombre
+            ]
+            
+            group_number = None
+            for pattern in patterns:
+                match = re.search(pattern, folder_name)
+                if match:
+                    # Remover ceros a la izquierda pero mantener al menos un dígito
+                    group_number = match.group(1).lstrip('0') or '0'
+                    break
+            
+            if group_number:
+                # Usar el número como clave para evitar duplicados
+                if group_number not in group_folders:
+                    group_folders[group_number] = folder
+                else:
+                    # Si hay múltiples carpetas con el mismo número, elegir la más "estándar"
+                    current_name = group_folders[group_number]['name']
+                    new_name = folder['name']
+                    
+                    # Preferir nombres más estándar (con "Grupo" al inicio)
+                    if (new_name.lower().startswith('grupo') and 
+                        not current_name.lower().startswith('grupo')):
+                        group_folders[group_number] = folder
+        
+        return list(group_folders.values()), group_folders
+
     def find_diplomado_folders(self, parent_folder_id):
         """
         Encuentra todas las carpetas que contengan "DIPLOMADO" en su nombre
@@ -146,20 +688,9 @@ class GoogleDriveTopicModelling:
         """
         try:
             query = f"'{parent_folder_id}' in parents and mimeType='application/vnd.google-apps.folder' and name contains 'DIPLOMADO'"
-            results = self.service.files().list(
-                q=query, 
-                fields="files(id, name)",
-                pageSize=1000
-            ).execute()
-            
-            diplomado_folders = results.get('files', [])
+            diplomado_folders = self._list_all_files(query)
             
-            # Filtrar carpetas que coincidan con el patrón "#. DIPLOMADO"
-            filtered_folders = []
-            for folder in diplomado_folders:
-                # Buscar patrón: número seguido de punto y DIPLOMADO
-                if 'DIPLOMADO' in folder['name'].upper():
-                    filtered_folders.append(folder)
+            filtered_folders = self._filter_diplomado_folders(diplomado_folders)
             
             print(f"Encontradas {len(filtered_folders)} carpetas de diplomados:")
             for folder in filtered_folders:
@@ -169,6 +700,7 @@ class GoogleDriveTopicModelling:
             
         except Exception as e:
             print(f"Error al buscar carpetas de diplomados: {e}")
+            self._mark_crawl_incomplete("no se pudieron listar las carpetas de diplomados")
             return []
 
     def navigate_to_modulo_iv(self, diplomado_folder_id):
@@ -185,14 +717,7 @@ class GoogleDriveTopicModelling:
         try:
             # Paso 1: Buscar carpeta "6. EVIDENCIA DE TRABAJOS"
             query = f"'{diplomado_folder_id}' in parents and mimeType='application/vnd.google-apps.folder'"
-            results = self.service.files().list(q=query, fields="files(id, name)").execute()
-            folders = results.get('files', [])
-            
-            evidencia_folder = None
-            for folder in folders:
-                if 'EVIDENCIA' in folder['name'].upper() and 'TRABAJOS' in folder['name'].upper():
-                    evidencia_folder = folder
-                    break
+            evidencia_folder = self._select_evidencia_folder(self._list_all_files(query))
             
             if not evidencia_folder:
                 print("No se encontró la carpeta de EVIDENCIA DE TRABAJOS")
@@ -200,14 +725,7 @@ class GoogleDriveTopicModelling:
             
             # Paso 2: Buscar carpeta "MÓDULO IV" dentro de EVIDENCIA DE TRABAJOS
             query = f"'{evidencia_folder['id']}' in parents and mimeType='application/vnd.google-apps.folder'"
-            results = self.service.files().list(q=query, fields="files(id, name)").execute()
-            folders = results.get('files', [])
-            
-            modulo_iv_folder = None
-            for folder in folders:
-                if 'MÓDULO' in folder['name'].upper() and 'IV' in folder['name'].upper():
-                    modulo_iv_folder = folder
-                    break
+            modulo_iv_folder = self._select_modulo_iv_folder(self._list_all_files(query))
             
             if not modulo_iv_folder:
                 print("No se encontró la carpeta MÓDULO IV")
@@ -221,336 +739,806 @@ class GoogleDriveTopicModelling:
 
     def get_folders_by_pattern_improved(self, parent_folder_id):
         """
-        Encuentra TODOS los grupos en la carpeta MÓDULO IV
+        Encuentra TODOS los grupos en la carpeta MÓDULO IV
+        """
+        try:
+            query = f"'{parent_folder_id}' in parents and mimeType='application/vnd.google-apps.folder'"
+            
+            return self._select_group_folders(self._list_all_files(query))
+            
+        except Exception as e:
+            print(f"Error al obtener carpetas mejorado: {e}")
+            return [], {}
+
+    def crawl_folder_tree(self, parent_folder_id):
+        """
+        Recorre por niveles todo el árbol DIPLOMADO -> EVIDENCIA DE TRABAJOS -> MÓDULO IV -> Grupo
+        con una consulta multi-padre (paginada) por nivel, y aplica las mismas reglas de
+        nombres que find_diplomado_folders, navigate_to_modulo_iv y get_folders_by_pattern_improved
+        
+        Args:
+            parent_folder_id (str): ID de la carpeta padre que contiene los diplomados
+            
+        Returns:
+            list: Un dict por diplomado con las claves 'diplomado' (carpeta),
+                'evidencia_id' y 'modulo_iv_id' (str o None) y 'groups' (lista
+                ordenada de tuplas (número de grupo, carpeta))
+        """
+        diplomado_folders = self.find_diplomado_folders(parent_folder_id)
+        
+        if not diplomado_folders:
+            return []
+        
+        # Nivel 2: EVIDENCIA DE TRABAJOS de todos los diplomados
+        children = self.list_child_folders_bulk([folder['id'] for folder in diplomado_folders])
+        evidencia_by_diplomado = {
+            folder['id']: self._select_evidencia_folder(children[folder['id']])
+            for folder in diplomado_folders
+        }
+        
+        # Nivel 3: MÓDULO IV de todas las carpetas de evidencia
+        evidencia_ids = [evidencia['id'] for evidencia in evidencia_by_diplomado.values() if evidencia]
+        children = self.list_child_folders_bulk(evidencia_ids)
+        modulo_by_evidencia = {
+            evidencia_id: self._select_modulo_iv_folder(children[evidencia_id])
+            for evidencia_id in evidencia_ids
+        }
+        
+        # Nivel 4: carpetas de grupo de todos los MÓDULO IV
+        modulo_ids = [modulo['id'] for modulo in modulo_by_evidencia.values() if modulo]
+        children = self.list_child_folders_bulk(modulo_ids)
+        
+        tree = []
+        for diplomado_folder in diplomado_folders:
+            diplomado_name = diplomado_folder['name']
+            evidencia_folder = evidencia_by_diplomado[diplomado_folder['id']]
+            modulo_iv_folder = modulo_by_evidencia.get(evidencia_folder['id']) if evidencia_folder else None
+            
+            node = {
+                'diplomado': diplomado_folder,
+                'evidencia_id': evidencia_folder['id'] if evidencia_folder else None,
+                'modulo_iv_id': None,
+                'groups': []
+            }
+            tree.append(node)
+            
+            if not modulo_iv_folder:
+                print(f"No se pudo acceder a MÓDULO IV en {diplomado_name}")
+                continue
+            
+            node['modulo_iv_id'] = modulo_iv_folder['id']
+            all_group_folders, group_folders_dict = self._select_group_folders(children[modulo_iv_folder['id']])
+            
+            if not group_folders_dict:
+                print(f"No se encontraron grupos en {diplomado_name}")
+                continue
+            
+            group_numbers = sorted(group_folders_dict.keys(), key=int)
+            node['groups'] = [(group_num, group_folders_dict[group_num]) for group_num in group_numbers]
+        
+        total_groups = sum(len(node['groups']) for node in tree)
+        print(f"Árbol de carpetas: {len(tree)} diplomados, {total_groups} grupos")
+        
+        return tree
+
+    def _sistematizacion_query(self, folder_id):
+        """
+        Construye la consulta de archivos .docx dentro de una carpeta de grupo
+        """
+        return f"'{folder_id}' in parents and mimeType='application/vnd.openxmlformats-officedocument.wordprocessingml.document'"
+    
+    def _select_sistematizacion_file(self, files):
+        """
+        Elige el archivo de sistematización entre los .docx de una carpeta
+        
+        Args:
+            files (list): Archivos .docx de la carpeta
+            
+        Returns:
+            dict: Primer archivo con "SISTEMATIZACION" en su nombre o None
+        """
+        for file in files:
+            if ('SISTEMATIZACION' in file['name'].upper()) or (('SISTEMATIZACIÓN' in file['name'].upper())):
+                return file
+        return None
+    
+    def find_sistematizacion_file(self, folder_id):
+        """
+        Busca un archivo .docx que contenga "SISTEMATIZACION" en su nombre dentro de la carpeta
+        
+        Args:
+            folder_id (str): ID de la carpeta donde buscar
+            
+        Returns:
+            dict: Información del archivo encontrado o None
+        """
+        try:
+            # webViewLink se pide en el mismo listado para evitar un files().get adicional
+            results = self.drive_scheduler.execute(self._get_service().files().list(
+                q=self._sistematizacion_query(folder_id),
+                fields=SISTEMATIZACION_FIELDS
+            ))
+            files = results.get('files', [])
+            
+            return self._select_sistematizacion_file(files)
+            
+        except Exception as e:
+            print(f"Error al buscar archivo: {e}")
+            self._mark_crawl_incomplete(f"no se pudo buscar la sistematización de la carpeta {folder_id}")
+            return None
+    
+    def _find_sistematizacion_batch(self, folder_ids):
+        """
+        Ejecuta las búsquedas de sistematización de un lote de carpetas en una sola
+        petición batch de Drive
+        
+        Args:
+            folder_ids (list): IDs de carpetas (como máximo DRIVE_BATCH_SIZE)
+            
+        Returns:
+            tuple: (dict folder_id -> archivo o None, dict folder_id -> error)
+        """
+        found = {}
+        errors = {}
+        
+        def callback(request_id, response, exception):
+            # request_id es el ID de la carpeta, así cada respuesta vuelve a su grupo
+            if exception is not None:
+                # Un error de cuota dentro del lote también reduce la concurrencia
+                self.drive_scheduler.observe(exception)
+                errors[request_id] = exception
+            else:
+                found[request_id] = self._select_sistematizacion_file(response.get('files', []))
+        
+        service = self._get_service()
+        batch = service.new_batch_http_request(callback=callback)
+        for folder_id in folder_ids:
+            batch.add(
+                service.files().list(
+                    q=self._sistematizacion_query(folder_id),
+                    fields=SISTEMATIZACION_FIELDS
+                ),
+                request_id=folder_id
+            )
+        
+        start = time.perf_counter()
+        try:
+            self.drive_scheduler.execute(batch, cost=len(folder_ids))
+        except Exception as e:
+            # Si falla el lote completo, todas sus carpetas quedan con error
+            for folder_id in folder_ids:
+                if folder_id not in found:
+                    errors[folder_id] = e
+        self.metrics.record('drive_batch', time.perf_counter() - start, items=len(folder_ids), error=bool(errors))
+        
+        return found, errors
+    
+    def find_sistematizacion_files_batch(self, folder_ids):
+        """
+        Busca los archivos de sistematización de muchas carpetas de grupo usando
+        peticiones batch de Drive
+        
+        Args:
+            folder_ids (list): IDs de las carpetas de grupo
+            
+        Returns:
+            dict: folder_id -> información del archivo encontrado o None
+        """
+        folder_ids = list(dict.fromkeys(folder_ids))
+        chunks = [folder_ids[i:i + DRIVE_BATCH_SIZE] for i in range(0, len(folder_ids), DRIVE_BATCH_SIZE)]
+        
+        results = {}
+        failed = []
+        for found, errors in self._map_concurrently(self._find_sistematizacion_batch, chunks):
+            results.update(found)
+            for folder_id, error in errors.items():
+                print(f"Error en búsqueda batch para la carpeta {folder_id}: {error}")
+                failed.append(folder_id)
+        
+        # Reintentar individualmente las carpetas cuya respuesta del lote falló
+        for folder_id in failed:
+            results[folder_id] = self.find_sistematizacion_file(folder_id)
+        
+        return results
+    
+    def get_blob_cache(self):
+        """
+        Devuelve la caché de documentos descargados (la abre en el primer uso)
+        
+        Returns:
+            BlobCache: Caché o None si está desactivada o no se pudo abrir
+        """
+        with self._blob_cache_lock:
+            if self._blob_cache is None and self.blob_cache_dir:
+                try:
+                    self._blob_cache = BlobCache(self.blob_cache_dir, max_bytes=self.blob_cache_size)
+                except Exception as e:
+                    print(f"No se pudo abrir la caché de documentos {self.blob_cache_dir}: {e}")
+                    self.blob_cache_dir = None
+            return self._blob_cache
+    
+    def _new_download_buffer(self, size=None):
+        """
+        Reserva lugar en el límite de bytes en curso y crea el buffer de una descarga
+        
+        Args:
+            size (int): Tamaño informado por Drive (None = se reserva spool_threshold)
+        """
+        reserved = int(size) if size else self.spool_threshold
+        self.download_budget.acquire(reserved)
+        return DownloadBuffer(self.spool_threshold, budget=self.download_budget, reserved=reserved)
+    
+    def download_file_content(self, file_id, md5_checksum=None, size=None):
+        """
+        Descarga el contenido de un archivo de Google Drive, o lo lee de la caché de
+        documentos si ya se descargó esa misma versión. El contenido queda en un
+        DownloadBuffer (en memoria o, si es grande, en un archivo temporal) que hay que
+        cerrar después de procesarlo
+        
+        Args:
+            file_id (str): ID del archivo a descargar
+            md5_checksum (str): md5Checksum del archivo en Drive (habilita la caché)
+            size (int): Tamaño del archivo en Drive (para el límite de bytes en curso)
+            
+        Returns:
+            DownloadBuffer: Contenido del archivo o None si hay error
+        """
+        from googleapiclient.http import MediaIoBaseDownload
+        
+        blob_cache = self.get_blob_cache() if md5_checksum else None
+        if blob_cache is not None:
+            start = time.perf_counter()
+            buffer = self._new_download_buffer(size)
+            if blob_cache.copy_to(file_id, md5_checksum, buffer):
+                self.metrics.record('cache_documentos', time.perf_counter() - start, items=1, bytes_=buffer.size)
+                return buffer
+            buffer.close()
+        
+        start = time.perf_counter()
+        buffer = self._new_download_buffer(size)
+        try:
+            request = self._get_service().files().get_media(fileId=file_id)
+            downloader = MediaIoBaseDownload(buffer, request, chunksize=DOWNLOAD_CHUNK_SIZE)
+            
+            done = False
+            while done is False:
+                status, done = self.drive_scheduler.call(downloader.next_chunk)
+            
+            self.metrics.record('descarga', time.perf_counter() - start, items=1, bytes_=buffer.size)
+            
+            if blob_cache is not None:
+                try:
+                    blob_cache.put(file_id, md5_checksum, buffer.reader())
+                except Exception as e:
+                    print(f"No se pudo guardar {file_id} en la caché de documentos: {e}")
+            return buffer
+            
+        except Exception as e:
+            print(f"Error al descargar archivo: {e}")
+            self.metrics.record('descarga', time.perf_counter() - start, error=True)
+            buffer.close()
+            return None
+
+    def extraer_titulo_proyecto_from_bytes(self, file_bytes, filename):
+        """
+        Extrae el título del proyecto desde la primera tabla del documento
+        Busca la celda que está a la derecha de "TÍTULO" o "TITULO"
+        
+        Args:
+            file_bytes (bytes): Contenido del archivo DOCX en bytes
+            filename (str): Nombre del archivo para logging
+        
+        Returns:
+            str: Título del proyecto extraído
+        """
+        return self.extraer_datos_documento_from_bytes(file_bytes, filename)['titulo']
+
+    def extraer_resumen_ejecutivo_from_bytes(self, file_bytes, filename):
+        """
+        Extrae el contenido de la primera celda de la tabla que contiene el Resumen Ejecutivo
+        desde bytes del archivo.
+        
+        Args:
+            file_bytes (bytes): Contenido del archivo DOCX en bytes
+            filename (str): Nombre del archivo para logging
+        
+        Returns:
+            str: Texto extraído de la primera celda de la tabla del Resumen Ejecutivo
+        """
+        return self.extraer_datos_documento_from_bytes(file_bytes, filename)['resumen']
+
+    def extraer_datos_documento_from_bytes(self, file_bytes, filename):
+        """
+        Extrae título, resumen ejecutivo y texto completo de un DOCX leyéndolo una sola vez.
+        Con el motor 'stream' se lee word/document.xml de forma incremental y la lectura
+        se detiene en cuanto se encuentran el título y el resumen.
+        
+        Args:
+            file_bytes (bytes | DownloadBuffer): Contenido del archivo DOCX (un
+                DownloadBuffer se lee directamente, sin copiarlo)
+            filename (str): Nombre del archivo para logging
+        
+        Returns:
+            dict: {'titulo': str, 'resumen': str, 'texto_completo': str o None}
+        """
+        source = file_bytes.reader() if isinstance(file_bytes, DownloadBuffer) else file_bytes
+        start = time.perf_counter()
+        datos = extraer_datos_documento(source, filename, motor=self.docx_engine)
+        self.record_parse_metrics(datos, time.perf_counter() - start, len(file_bytes))
+        return datos
+    
+    def record_parse_metrics(self, datos, seconds, size):
+        """
+        Registra en las métricas el parseo de un documento
+        
+        Args:
+            datos (dict): Resultado de extraer_datos_documento
+            seconds (float): Duración del parseo
+            size (int): Tamaño del documento en bytes
+        """
+        error = datos.get('titulo') == "ERROR AL EXTRAER TÍTULO"
+        self.metrics.record('parseo', seconds, items=1, bytes_=size, error=error)
+
+    def preprocess_text(self, text):
+        """
+        Preprocesa el texto para análisis
+        
+        Args:
+            text (str): Texto a preprocesar
+            
+        Returns:
+            list: Lista de tokens procesados
+        """
+        # Verificar si text es None o vacío
+        if not text:
+            return []
+            
+        # Convertir a minúsculas y eliminar caracteres especiales
+        text = text.lower()
+        text = re.sub(r'[^\w\s]', '', text)
+        
+        # Tokenizar el texto
+        ensure_nltk_resources()
+        from nltk.tokenize import word_tokenize
+        tokens = word_tokenize(text)
+        
+        # Eliminar stopwords y palabras cortas
+        tokens = [token for token in tokens if token not in self.stop_words and len(token) > 2]
+        
+        return tokens
+    
+    def _get_keyword_vectorizer(self):
+        """
+        Devuelve el CountVectorizer de candidatos (n-gramas 1-2 sin stopwords),
+        construido una sola vez junto con la lista de stopwords
+        """
+        if self._keyword_vectorizer is None:
+            from sklearn.feature_extraction.text import CountVectorizer
+            self._keyword_vectorizer = CountVectorizer(
+                ngram_range=(1, 2),
+                stop_words=list(self.stop_words)
+            )
+        return self._keyword_vectorizer
+    
+    def extract_keywords_keybert(self, text, top_n=10):
+        """
+        Extrae palabras clave usando KeyBERT
+        
+        Args:
+            text (str): Texto del documento
+            top_n (int): Número de palabras clave a extraer
+            
+        Returns:
+            list: Lista de tuplas (palabra_clave, puntuación)
+        """
+        return self.extract_keywords_keybert_batch([text], top_n=top_n)[0]
+    
+    def extract_keywords_keybert_batch(self, texts, top_n=10, batch_size=KEYBERT_BATCH_SIZE):
+        """
+        Extrae palabras clave de muchos documentos a la vez usando KeyBERT.
+        Los embeddings de documentos y de candidatos se calculan por lotes, y cada
+        candidato compartido entre documentos del lote se embebe una sola vez.
+        
+        Args:
+            texts (list): Textos de los documentos
+            top_n (int): Número de palabras clave a extraer por documento
+            batch_size (int): Documentos por llamada al modelo
+            
+        Returns:
+            list: Una lista de tuplas (palabra_clave, puntuación) por texto, en el mismo orden
+        """
+        keywords_by_text = [[] for _ in texts]
+        
+        # Verificar que hay suficiente texto en cada documento
+        valid_indices = []
+        for i, text in enumerate(texts):
+            if not text or len(text.strip()) < 100:
+                print("Texto insuficiente para extraer palabras clave")
+            else:
+                valid_indices.append(i)
+        
+        for start in range(0, len(valid_indices), batch_size):
+            chunk_indices = valid_indices[start:start + batch_size]
+            docs = [texts[i] for i in chunk_indices]
+            
+            try:
+                vectorizer = self._get_keyword_vectorizer()
+                # El modelo compartido serializa cada inferencia (ver SerializedEmbedder),
+                # no el lote completo: las búsquedas semánticas no esperan a que termine
+                keybert_model = self.keybert_model
+                with self.metrics.stage('keywords', items=len(docs)):
+                    doc_embeddings, word_embeddings = keybert_model.extract_embeddings(
+                        docs, vectorizer=vectorizer
+                    )
+                    keywords = keybert_model.extract_keywords(
+                        docs,
+                        vectorizer=vectorizer,
+                        top_n=top_n,
+                        doc_embeddings=doc_embeddings,
+                        word_embeddings=word_embeddings
+                    )
+                
+                # Con un solo documento KeyBERT devuelve la lista de ese documento
+                if len(docs) == 1:
+                    keywords = [keywords]
+                
+                for i, doc_keywords in zip(chunk_indices, keywords):
+                    keywords_by_text[i] = doc_keywords
+                    
+            except Exception as e:
+                print(f"Error al extraer palabras clave: {e}")
+        
+        return keywords_by_text
+
+    def load_manifest(self):
+        """
+        Carga el manifiesto de documentos procesados desde disco
+        
+        Returns:
+            dict: Manifiesto con la forma {'version': int, 'files': {file_id: entrada}}
+        """
+        manifest = {'version': MANIFEST_VERSION, 'files': {}}
+        
+        if self.manifest_path and os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                
+                if data.get('version') == MANIFEST_VERSION:
+                    manifest = data
+                    print(f"Manifiesto cargado: {len(manifest['files'])} documentos registrados")
+                else:
+                    print("Manifiesto con versión distinta, se reprocesarán todos los documentos")
+            except Exception as e:
+                print(f"Error al leer el manifiesto {self.manifest_path}: {e}")
+        
+        self.manifest = manifest
+        self._manifest_modified = False
+        return manifest
+    
+    def save_manifest(self):
+        """
+        Guarda el manifiesto en disco de forma atómica (archivo temporal + reemplazo)
+        """
+        with self._manifest_lock:
+            if not self.manifest_path or self.manifest is None or not self._manifest_modified:
+                return
+            
+            try:
+                tmp_path = f"{self.manifest_path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.manifest, f, ensure_ascii=False)
+                os.replace(tmp_path, self.manifest_path)
+                self._manifest_modified = False
+            except Exception as e:
+                print(f"Error al guardar el manifiesto {self.manifest_path}: {e}")
+    
+    def _file_fingerprint(self, file_info):
+        """
+        Obtiene la huella de un archivo de Drive para detectar cambios
+        
+        Args:
+            file_info (dict): Metadatos del archivo (id, md5Checksum, modifiedTime)
+            
+        Returns:
+            dict: Huella con md5Checksum y modifiedTime
+        """
+        return {
+            'md5Checksum': file_info.get('md5Checksum'),
+            'modifiedTime': file_info.get('modifiedTime')
+        }
+    
+    def get_manifest_entry(self, file_info):
+        """
+        Devuelve la entrada del manifiesto si el archivo no cambió desde el último procesamiento
+        
+        Args:
+            file_info (dict): Metadatos del archivo de sistematización
+            
+        Returns:
+            dict: Entrada del manifiesto o None si el archivo es nuevo o cambió
+        """
+        if not self.manifest_path:
+            return None
+        
+        with self._manifest_lock:
+            if self.manifest is None:
+                self.load_manifest()
+            
+            entry = self.manifest['files'].get(file_info['id'])
+        
+        if not entry:
+            return None
+        
+        fingerprint = self._file_fingerprint(file_info)
+        # Sin ninguna huella disponible no se puede garantizar que el archivo no cambió
+        if not fingerprint['md5Checksum'] and not fingerprint['modifiedTime']:
+            return None
+        
+        if (entry.get('md5Checksum') == fingerprint['md5Checksum'] and
+                entry.get('modifiedTime') == fingerprint['modifiedTime']):
+            return entry
+        
+        return None
+    
+    def update_manifest_entry(self, file_info, record, resumen=None):
+        """
+        Registra en el manifiesto el resultado de procesar un archivo
+        
+        Args:
+            file_info (dict): Metadatos del archivo de sistematización
+            record (dict): Registro extraído o None si el documento no produjo registro
+            resumen (str): Texto del resumen ejecutivo (se usa en el índice de búsqueda)
+        """
+        if not self.manifest_path:
+            return
+        
+        entry = self._file_fingerprint(file_info)
+        entry['record'] = record
+        entry['resumen'] = resumen
+        
+        with self._manifest_lock:
+            if self.manifest is None:
+                self.load_manifest()
+            
+            self.manifest['files'][file_info['id']] = entry
+            self._manifest_modified = True
+    
+    def prune_manifest(self, seen_file_ids):
+        """
+        Elimina del manifiesto los archivos que ya no existen en Drive
+        
+        Args:
+            seen_file_ids (set): IDs de archivos encontrados en el recorrido actual
+        """
+        if self.manifest is None:
+            return
+        
+        stale_ids = [file_id for file_id in self.manifest['files'] if file_id not in seen_file_ids]
+        for file_id in stale_ids:
+            del self.manifest['files'][file_id]
+        
+        if stale_ids:
+            print(f"Eliminados {len(stale_ids)} documentos obsoletos del manifiesto")
+            self._manifest_modified = True
+    
+    def remove_manifest_entries(self, file_ids):
+        """
+        Elimina del manifiesto archivos puntuales (borrados en Drive o que dejaron de ser
+        la sistematización de su grupo)
+        
+        Args:
+            file_ids (iterable): IDs de archivos a olvidar
+        """
+        if self.manifest is None:
+            return
+        
+        with self._manifest_lock:
+            removed = [file_id for file_id in file_ids if self.manifest['files'].pop(file_id, None) is not None]
+            if removed:
+                self._manifest_modified = True
+        
+        if removed:
+            print(f"Eliminados {len(removed)} documentos del manifiesto")
+
+    def get_search_index(self):
+        """
+        Devuelve el índice BM25 de títulos y resúmenes (lo abre en el primer uso)
+        
+        Returns:
+            BM25Index: Índice de búsqueda o None si está desactivado
+        """
+        if self._search_index is None and self.search_index_path:
+            self._search_index = BM25Index(self.search_index_path, self.preprocess_text)
+        return self._search_index
+    
+    def _manifest_documents(self):
+        """
+        Documentos con registro en el manifiesto, con los datos que usan los índices de búsqueda
+        
+        Returns:
+            dict: file_id -> {'fingerprint', 'titulo', 'resumen'}
+        """
+        with self._manifest_lock:
+            return {
+                file_id: {
+                    'fingerprint': f"{entry.get('md5Checksum')}|{entry.get('modifiedTime')}",
+                    'titulo': entry['record'].get('Título del proyecto', ''),
+                    'resumen': entry.get('resumen') or ''
+                }
+                for file_id, entry in self.manifest['files'].items()
+                if entry.get('record') is not None
+            }
+    
+    def update_search_index(self):
         """
+        Sincroniza el índice de búsqueda con los documentos registrados en el manifiesto
+        """
+        if not self.search_index_path or self.manifest is None:
+            return
+        
+        documents = self._manifest_documents()
+        
         try:
-            query = f"'{parent_folder_id}' in parents and mimeType='application/vnd.google-apps.folder'"
-            
-            results = self.service.files().list(
-                q=query, 
-                fields="files(id, name)",
-                pageSize=1000
-            ).execute()
-            
-            folders = results.get('files', [])
-            
-            # Filtrar y procesar carpetas de grupo
-            group_folders = {}
-            
-            for folder in folders:
-                folder_name = folder['name']
-                
-                # Solo procesar carpetas que contengan "grupo" (case insensitive)
-                if 'grupo' not in folder_name.lower():
-                    continue
-                
-                # Patrones más flexibles para extraer números
-                patterns = [
-                    r'[Gg]rupo\s*0*(\d+)',         # "Grupo 01", "grupo 1", "GRUPO 001"
-                    r'[Gg]rupo\s*(\d+)',           # "Grupo1", "grupo23"
-                    r'(\d+).*[Gg]rupo',            # "01 Grupo", "1-Grupo"
-                    r'(\d+)',                      # Cualquier número en el nombre
-                ]
-                
-                group_number = None
-                for pattern in patterns:
-                    match = re.search(pattern, folder_name)
-                    if match:
-                        # Remover ceros a la izquierda pero mantener al menos un dígito
-                        group_number = match.group(1).lstrip('0') or '0'
-                        break
-                
-                if group_number:
-                    # Usar el número como clave para evitar duplicados
-                    if group_number not in group_folders:
-                        group_folders[group_number] = folder
-                    else:
-                        # Si hay múltiples carpetas con el mismo número, elegir la más "estándar"
-                        current_name = group_folders[group_number]['name']
-                        new_name = folder['name']
-                        
-                        # Preferir nombres más estándar (con "Grupo" al inicio)
-                        if (new_name.lower().startswith('grupo') and 
-                            not current_name.lower().startswith('grupo')):
-                            group_folders[group_number] = folder
-            
-            return list(group_folders.values()), group_folders
-            
+            with self.metrics.stage('indice_bm25', items=len(documents)):
+                indexed, removed = self.get_search_index().update(documents)
+            if indexed or removed:
+                print(f"🔎 Índice de búsqueda actualizado: {indexed} documentos indexados, {removed} eliminados")
         except Exception as e:
-            print(f"Error al obtener carpetas mejorado: {e}")
-            return [], {}
-
-    def find_sistematizacion_file(self, folder_id):
+            print(f"Error al actualizar el índice de búsqueda {self.search_index_path}: {e}")
+    
+    def search_text(self, query, top_k=20):
         """
-        Busca un archivo .docx que contenga "SISTEMATIZACION" en su nombre dentro de la carpeta
+        Búsqueda de texto libre sobre títulos y resúmenes con BM25
         
         Args:
-            folder_id (str): ID de la carpeta donde buscar
+            query (str): Texto a buscar
+            top_k (int): Número máximo de resultados
             
         Returns:
-            dict: Información del archivo encontrado o None
+            list: Tuplas (ID de archivo, puntaje) ordenadas por relevancia
         """
         try:
-            query = f"'{folder_id}' in parents and mimeType='application/vnd.openxmlformats-officedocument.wordprocessingml.document'"
-            results = self.service.files().list(q=query, fields="files(id, name)").execute()
-            files = results.get('files', [])
-            
-            for file in files:
-                if ('SISTEMATIZACION' in file['name'].upper()) or (('SISTEMATIZACIÓN' in file['name'].upper())):
-                    # Obtener información adicional del archivo incluyendo webViewLink
-                    file_details = self.service.files().get(
-                        fileId=file['id'], 
-                        fields="id, name, webViewLink"
-                    ).execute()
-                    return file_details
-            
-            return None
-            
+            search_index = self.get_search_index()
+            if search_index is None:
+                return []
+            return search_index.search(query, top_k=top_k)
         except Exception as e:
-            print(f"Error al buscar archivo: {e}")
-            return None
+            print(f"Error en la búsqueda de texto: {e}")
+            return []
     
-    def download_file_content(self, file_id):
+    def get_vector_index(self):
         """
-        Descarga el contenido de un archivo de Google Drive
+        Devuelve el índice semántico de resúmenes (lo abre en el primer uso)
         
-        Args:
-            file_id (str): ID del archivo a descargar
-            
         Returns:
-            bytes: Contenido del archivo
+            VectorIndex: Índice semántico o None si está desactivado
         """
-        try:
-            request = self.service.files().get_media(fileId=file_id)
-            file_content = io.BytesIO()
-            downloader = MediaIoBaseDownload(file_content, request)
-            
-            done = False
-            while done is False:
-                status, done = downloader.next_chunk()
-            
-            file_content.seek(0)
-            return file_content.getvalue()
-            
-        except Exception as e:
-            print(f"Error al descargar archivo: {e}")
-            return None
-
-    def extraer_titulo_proyecto_from_bytes(self, file_bytes, filename):
+        if self._vector_index is None and self.vector_index_path:
+            self._vector_index = VectorIndex(
+                self.vector_index_path, embedding_model_key(KEYBERT_MODEL_NAME, self.embedding_backend),
+                dtype=self.vector_dtype, ann_threshold=self.ann_threshold
+            )
+        return self._vector_index
+    
+    def embed_texts(self, texts):
         """
-        Extrae el título del proyecto desde la primera tabla del documento
-        Busca la celda que está a la derecha de "TÍTULO" o "TITULO"
+        Calcula los embeddings de varios textos con el modelo de KeyBERT
         
         Args:
-            file_bytes (bytes): Contenido del archivo DOCX en bytes
-            filename (str): Nombre del archivo para logging
-        
+            texts (list): Textos a embeber
+            
         Returns:
-            str: Título del proyecto extraído
+            np.ndarray: Matriz de embeddings, una fila por texto
         """
-        try:
-            # Crear un objeto BytesIO desde los bytes
-            file_stream = io.BytesIO(file_bytes)
-            
-            # Cargar el documento desde el stream
-            doc = docx.Document(file_stream)
-            
-            # Buscar en todas las tablas del documento
-            for tabla in doc.tables:
-                # Recorrer todas las filas de la tabla
-                for fila in tabla.rows:
-                    # Recorrer todas las celdas de la fila
-                    for i, celda in enumerate(fila.cells):
-                        celda_text = celda.text.strip().upper()
-                        
-                        # Verificar si la celda contiene "TÍTULO" o "TITULO"
-                        if 'TÍTULO' in celda_text or 'TITULO' in celda_text:
-                            # Intentar obtener la celda siguiente (a la derecha)
-                            if i + 1 < len(fila.cells):
-                                titulo = fila.cells[i + 1].text.strip()
-                                if titulo and len(titulo) > 5:  # Verificar que no esté vacío
-                                    return titulo
-                            
-                            # Si no hay celda a la derecha, intentar en la misma celda después del texto "TÍTULO"
-                            if ':' in celda.text:
-                                partes = celda.text.split(':', 1)
-                                if len(partes) > 1:
-                                    titulo = partes[1].strip()
-                                    if titulo and len(titulo) > 5:
-                                        return titulo
-            
-            # Si no se encuentra en tablas, buscar en párrafos
-            for para in doc.paragraphs:
-                text = para.text.strip()
-                if ('TÍTULO' in text.upper() or 'TITULO' in text.upper()) and ':' in text:
-                    partes = text.split(':', 1)
-                    if len(partes) > 1:
-                        titulo = partes[1].strip()
-                        if titulo and len(titulo) > 5:
-                            return titulo
-            
-            print(f"No se pudo extraer el título del proyecto de {filename}")
-            return "TÍTULO NO ENCONTRADO"
-            
-        except Exception as e:
-            print(f"Error al extraer título de {filename}: {e}")
-            return "ERROR AL EXTRAER TÍTULO"
-
-    def extraer_resumen_ejecutivo_from_bytes(self, file_bytes, filename):
+        return self.keybert_model.model.embed(texts)
+    
+    def embed_query(self, query):
         """
-        Extrae el contenido de la primera celda de la tabla que contiene el Resumen Ejecutivo
-        desde bytes del archivo.
+        Calcula el embedding de una consulta de búsqueda. No pasa por el caché de
+        embeddings: las consultas no se repiten como los resúmenes y solo lo llenarían
         
         Args:
-            file_bytes (bytes): Contenido del archivo DOCX en bytes
-            filename (str): Nombre del archivo para logging
-        
+            query (str): Texto de la consulta
+            
         Returns:
-            str: Texto extraído de la primera celda de la tabla del Resumen Ejecutivo
+            np.ndarray: Vector de la consulta
         """
+        embedder = self.keybert_model.model
+        if isinstance(embedder, CachedEmbedder):
+            embedder = embedder.embedder
+        return embedder.embed([query])[0]
+    
+    def update_vector_index(self):
+        """
+        Sincroniza el índice semántico con el manifiesto. Solo se embeben los resúmenes
+        nuevos o modificados (normalmente ya están en el caché de embeddings)
+        """
+        if not self.vector_index_path or self.manifest is None:
+            return
+        
+        documents = self._manifest_documents()
+        
         try:
-            # Crear un objeto BytesIO desde los bytes
-            file_stream = io.BytesIO(file_bytes)
-            
-            # Cargar el documento desde el stream
-            doc = docx.Document(file_stream)
-            
-            # Variable para indicar que hemos encontrado la sección
-            seccion_encontrada = False
-            
-            # Buscar el párrafo que contiene "1. Resumen ejecutivo"
-            for i, para in enumerate(doc.paragraphs):
-                if "Resumen ejecutivo" in para.text:
-                    seccion_encontrada = True
-                    break
-            
-            if not seccion_encontrada:
-                print(f"No se encontró la sección de Resumen Ejecutivo en {filename}")
-                # Si no hay resumen ejecutivo, obtener todo el texto del documento
-                full_text = []
-                for para in doc.paragraphs:
-                    if para.text.strip():  # Solo añadir párrafos no vacíos
-                        full_text.append(para.text)
-                return ' '.join(full_text)
-            
-            # Buscar la tabla que sigue después del título
-            for tabla in doc.tables:
-                # Verificamos si estamos en la tabla correcta (la que contiene el resumen)
-                texto_primera_celda = ""
+            vector_index = self.get_vector_index()
+            fingerprints = {file_id: doc['fingerprint'] for file_id, doc in documents.items()}
+            stale_ids = vector_index.stale_ids(fingerprints)
+            
+            if not stale_ids and len(vector_index) == len(fingerprints):
+                return
+            
+            with self.metrics.stage('indice_semantico', items=len(stale_ids)):
+                new_vectors = {}
+                if stale_ids:
+                    embeddings = self.embed_texts([documents[file_id]['resumen'] for file_id in stale_ids])
+                    new_vectors = dict(zip(stale_ids, embeddings))
                 
-                # Recorrer las filas de la tabla
-                for fila in tabla.rows:
-                    # Verificar si hay celdas
-                    if fila.cells and len(fila.cells) > 0:
-                        celda = fila.cells[0]  # Primera celda
-                        
-                        # Extraer texto de la primera celda
-                        texto_primera_celda = celda.text.strip()
-                        
-                        # Verificar si este texto contiene contenido del resumen ejecutivo
-                        if len(texto_primera_celda) > 50:  # Bajamos el umbral para ser más flexibles
-                            return texto_primera_celda
-            
-            # Si no se encontró en tablas, intentar extraer texto de párrafos después de "Resumen ejecutivo"
-            full_text = []
-            found_section = False
-            next_section = False
-            
-            for para in doc.paragraphs:
-                text = para.text.strip()
-                if not found_section and "Resumen ejecutivo" in text:
-                    found_section = True
-                    continue
-                elif found_section and text and not next_section:
-                    # Verificar si llegamos a la siguiente sección (usualmente comienza con un número)
-                    if re.match(r'^\d+\.', text) and "Resumen" not in text:
-                        next_section = True
-                    else:
-                        full_text.append(text)
-                elif next_section:
-                    break
-            
-            if full_text:
-                return ' '.join(full_text)
-            
-            # Si todo falla, extraer todo el contenido del documento
-            full_text = []
-            for para in doc.paragraphs:
-                if para.text.strip():  # Solo añadir párrafos no vacíos
-                    full_text.append(para.text)
-            
-            print(f"No se pudo extraer el resumen específico de {filename}, usando texto completo")
-            return ' '.join(full_text)
-            
+                vector_index.update(fingerprints, new_vectors)
+            print(f"🧭 Índice semántico actualizado: {len(stale_ids)} documentos embebidos, {len(vector_index)} en total")
         except Exception as e:
-            print(f"Error al procesar {filename}: {e}")
-            return ""
-
-    def preprocess_text(self, text):
+            print(f"Error al actualizar el índice semántico {self.vector_index_path}: {e}")
+    
+    def search_semantic(self, query, top_k=20):
         """
-        Preprocesa el texto para análisis
+        Búsqueda semántica: embebe la consulta una vez y la compara con los resúmenes
         
         Args:
-            text (str): Texto a preprocesar
+            query (str): Texto a buscar
+            top_k (int): Número máximo de resultados
             
         Returns:
-            list: Lista de tokens procesados
+            list: Tuplas (ID de archivo, similitud) ordenadas por similitud
         """
-        # Verificar si text es None o vacío
-        if not text:
+        if not query or not query.strip():
             return []
-            
-        # Convertir a minúsculas y eliminar caracteres especiales
-        text = text.lower()
-        text = re.sub(r'[^\w\s]', '', text)
-        
-        # Tokenizar el texto
-        tokens = word_tokenize(text)
-        
-        # Eliminar stopwords y palabras cortas
-        tokens = [token for token in tokens if token not in self.stop_words and len(token) > 2]
         
-        return tokens
+        try:
+            vector_index = self.get_vector_index()
+            if vector_index is None or not len(vector_index):
+                return []
+            query_vector = self.embed_query(query)
+            return vector_index.search(query_vector, top_k=top_k)
+        except Exception as e:
+            print(f"Error en la búsqueda semántica: {e}")
+            return []
     
-    def extract_keywords_keybert(self, text, top_n=10):
+    def _report_progress(self, event, **data):
         """
-        Extrae palabras clave usando KeyBERT
+        Envía un evento de progreso al callback de la ejecución en curso, si hay uno
         
         Args:
-            text (str): Texto del documento
-            top_n (int): Número de palabras clave a extraer
-            
-        Returns:
-            list: Lista de tuplas (palabra_clave, puntuación)
+            event (str): Tipo de evento ('diplomados', 'grupos' o 'grupo')
+            **data: Datos del evento (por ejemplo total, estado o documento)
         """
+        callback = self._progress_callback
+        if callback is None:
+            return
+        
         try:
-            if not text or len(text.strip()) < 100:  # Verificar que hay suficiente texto
-                print("Texto insuficiente para extraer palabras clave")
-                return []
-                
-            keywords = self.keybert_model.extract_keywords(
-                text, 
-                keyphrase_ngram_range=(1, 2), 
-                stop_words=list(self.stop_words),
-                top_n=top_n
-            )
-            return keywords
+            callback(event, data)
         except Exception as e:
-            print(f"Error al extraer palabras clave: {e}")
-            return []
-
-    def process_single_diplomado(self, diplomado_folder):
+            print(f"Error en el callback de progreso: {e}")
+    
+    def is_cancelled(self):
         """
-        Procesa un diplomado individual
+        Indica si se pidió cancelar la ejecución en curso
+        
+        Returns:
+            bool: True si el evento de cancelación está activo
+        """
+        return self._cancel_event is not None and self._cancel_event.is_set()
+    
+    def _collect_group_folders(self, diplomado_folder):
+        """
+        Navega desde un diplomado hasta sus carpetas de grupo en MÓDULO IV
         
         Args:
             diplomado_folder (dict): Información de la carpeta del diplomado
             
         Returns:
-            list: Lista de registros para este diplomado
+            list: Lista ordenada de tuplas (número de grupo, carpeta)
         """
         diplomado_name = diplomado_folder['name']
-        print(f"\n=== PROCESANDO DIPLOMADO: {diplomado_name} ===")
         
         # Navegar hasta MÓDULO IV
         modulo_iv_id = self.navigate_to_modulo_iv(diplomado_folder['id'])
@@ -566,63 +1554,183 @@ class GoogleDriveTopicModelling:
             print(f"No se encontraron grupos en {diplomado_name}")
             return []
         
-        # Lista para almacenar registros de este diplomado
-        diplomado_records = []
-        
-        # Procesar cada grupo
         group_numbers = sorted(group_folders_dict.keys(), key=int)
         print(f"Procesando {len(group_numbers)} grupos en {diplomado_name}")
         
-        for group_num in group_numbers:
-            folder = group_folders_dict[group_num]
-            print(f"  Procesando Grupo {group_num}: {folder['name']}")
+        return [(group_num, group_folders_dict[group_num]) for group_num in group_numbers]
+    
+    def _process_group(self, diplomado_name, group_num, folder, discovered=None):
+        """
+        Procesa la carpeta de un grupo: busca, descarga y analiza su sistematización
+        
+        Args:
+            diplomado_name (str): Nombre del diplomado al que pertenece el grupo
+            group_num (str): Número del grupo
+            folder (dict): Información de la carpeta del grupo
+            discovered (dict): Resultado de find_sistematizacion_files_batch
+                (None para buscar el archivo con una consulta individual)
             
-            # Buscar archivo de sistematización
+        Returns:
+            dict: {'record': registro, 'text': resumen, 'file': archivo} o None si no se
+                pudo generar. 'text' es None cuando el registro se reutilizó del manifiesto;
+                si no, las keywords se agregan después con _complete_records
+        """
+        if self.is_cancelled():
+            return None
+        
+        sistematizacion_file, cached_result = self._resolve_group_file(diplomado_name, group_num, folder, discovered)
+        
+        if sistematizacion_file is None or cached_result is not None:
+            return cached_result
+        
+        # Descargar contenido
+        file_content = self.download_file_content(
+            sistematizacion_file['id'], sistematizacion_file.get('md5Checksum'), sistematizacion_file.get('size')
+        )
+        
+        if not file_content:
+            print(f"    ❌ Error al descargar archivo")
+            self._report_failed_document(sistematizacion_file)
+            if file_content is not None:
+                file_content.close()
+            return None
+        
+        # Extraer título del proyecto y texto del resumen ejecutivo en una sola lectura
+        with file_content:
+            datos = self.extraer_datos_documento_from_bytes(file_content, sistematizacion_file['name'])
+        
+        return self._build_group_result(diplomado_name, sistematizacion_file, datos)
+    
+    def _resolve_group_file(self, diplomado_name, group_num, folder, discovered=None):
+        """
+        Busca la sistematización de un grupo y, si no cambió, reutiliza su registro
+        
+        Returns:
+            tuple: (archivo, resultado reutilizado). El archivo es None si no hay nada que
+                procesar; el resultado es None si el archivo hay que descargarlo y analizarlo
+        """
+        print(f"  Procesando Grupo {group_num}: {folder['name']}")
+        
+        # Buscar archivo de sistematización
+        if discovered is not None:
+            sistematizacion_file = discovered.get(folder['id'])
+        else:
             sistematizacion_file = self.find_sistematizacion_file(folder['id'])
+        
+        if not sistematizacion_file:
+            print(f"    ❌ No se encontró archivo de sistematización")
+            self._report_progress('grupo', estado='sin_archivo', documento=folder['name'])
+            return None, None
+        
+        print(f"    ✅ Archivo encontrado: {sistematizacion_file['name']}")
+        self._seen_file_ids.add(sistematizacion_file['id'])
+        self._group_files[folder['id']] = sistematizacion_file['id']
+        
+        # Reutilizar el registro si el archivo no cambió desde el último procesamiento
+        manifest_entry = self.get_manifest_entry(sistematizacion_file)
+        if manifest_entry is not None:
+            if manifest_entry.get('record') is None:
+                print(f"    ⏭️ Sin cambios (documento sin registro en el procesamiento anterior)")
+                self._report_progress('grupo', estado='sin_cambios', documento=sistematizacion_file['name'])
+                return None, None
+            
+            record = dict(manifest_entry['record'])
+            record['Diplomado'] = diplomado_name
+            print(f"    ⏭️ Sin cambios, registro reutilizado")
+            self._report_progress('grupo', estado='sin_cambios', documento=sistematizacion_file['name'])
+            return sistematizacion_file, {'record': record, 'text': None, 'file': sistematizacion_file}
+        
+        return sistematizacion_file, None
+    
+    def _build_group_result(self, diplomado_name, sistematizacion_file, datos):
+        """
+        Construye el registro (todavía sin keywords) a partir de los datos extraídos
+        
+        Args:
+            diplomado_name (str): Nombre del diplomado
+            sistematizacion_file (dict): Metadatos del archivo de sistematización
+            datos (dict): Resultado de extraer_datos_documento_from_bytes
             
-            if not sistematizacion_file:
-                print(f"    ❌ No se encontró archivo de sistematización")
-                continue
-            
-            print(f"    ✅ Archivo encontrado: {sistematizacion_file['name']}")
-            
-            # Descargar contenido
-            file_content = self.download_file_content(sistematizacion_file['id'])
-            
-            if not file_content:
-                print(f"    ❌ Error al descargar archivo")
-                continue
-            
-            # Extraer título del proyecto
-            titulo_proyecto = self.extraer_titulo_proyecto_from_bytes(file_content, sistematizacion_file['name'])
-            
-            # Extraer texto del resumen ejecutivo
-            text = self.extraer_resumen_ejecutivo_from_bytes(file_content, sistematizacion_file['name'])
-            
-            if not text or len(text.strip()) < 50:
-                print(f"    ❌ Texto insuficiente para análisis")
-                continue
+        Returns:
+            dict: {'record': registro, 'text': resumen, 'file': archivo} o None
+        """
+        titulo_proyecto = datos['titulo']
+        text = datos['resumen']
+        
+        if titulo_proyecto == "ERROR AL EXTRAER TÍTULO":
+            # Error al leer el DOCX (por ejemplo, una descarga truncada): se reintenta
+            self._report_failed_document(sistematizacion_file)
+            return None
+        
+        if not text or len(text.strip()) < 50:
+            print(f"    ❌ Texto insuficiente para análisis en {sistematizacion_file['name']}")
+            self._report_progress('grupo', estado='fallido', documento=sistematizacion_file['name'])
+            # El contenido no cambiará mientras el archivo no cambie
+            self.update_manifest_entry(sistematizacion_file, None)
+            return None
+        
+        # Construir enlace de descarga
+        download_link = f"https://docs.google.com/document/d/{sistematizacion_file['id']}/export?format=docx"
+
+        record = {
+            'ID de archivo': sistematizacion_file['id'],
+            'Diplomado': diplomado_name,
+            'Nombre de documento': sistematizacion_file['name'],
+            'Título del proyecto': titulo_proyecto,
+            'Enlace de descarga': download_link
+        }
+        
+        # Las keywords se extraen después, en lote para todos los documentos
+        return {'record': record, 'text': text, 'file': sistematizacion_file}
+    
+    def _complete_records(self, results, top_n=5):
+        """
+        Extrae en un solo lote las keywords de todos los documentos pendientes y
+        completa sus registros
+        
+        Args:
+            results (list): Resultados de _process_group (pueden incluir None)
+            top_n (int): Número de palabras clave por documento (máximo 5)
             
-            # Extraer keywords
-            keywords_with_scores = self.extract_keywords_keybert(text, top_n=5)
+        Returns:
+            list: Registros completos, en el mismo orden que results
+        """
+        pending = [result for result in results if result is not None and result['text'] is not None]
+        
+        if pending:
+            print(f"\nExtrayendo keywords de {len(pending)} documentos en lote")
+        self.assign_keywords(pending, top_n=top_n)
+        
+        # Guardar el avance para no repetir trabajo si el proceso se interrumpe
+        self.save_manifest()
+        
+        return [result['record'] for result in results if result is not None and result['record'] is not None]
+    
+    def assign_keywords(self, pending, top_n=5):
+        """
+        Extrae en lote las keywords de resultados pendientes y completa sus registros.
+        Los resultados sin keywords quedan con 'record' en None.
+        
+        Args:
+            pending (list): Resultados de _process_group con 'text' pendiente de analizar
+            top_n (int): Número de palabras clave por documento (máximo 5)
+        """
+        keywords_by_doc = self.extract_keywords_keybert_batch(
+            [result['text'] for result in pending], top_n=top_n
+        )
+        
+        for result, keywords_with_scores in zip(pending, keywords_by_doc):
+            record = result['record']
             
             if not keywords_with_scores:
-                print(f"    ❌ No se pudieron extraer keywords")
+                print(f"    ❌ No se pudieron extraer keywords de {record['Nombre de documento']}")
+                self._report_failed_document(result['file'])
+                result['record'] = None
                 continue
             
             # Crear registro
             keywords_list = [keyword for keyword, score in keywords_with_scores]
             
-            # Construir enlace de descarga
-            download_link = f"https://docs.google.com/document/d/{sistematizacion_file['id']}/export?format=docx"
-
-            record = {
-                'Diplomado': diplomado_name,
-                'Nombre de documento': sistematizacion_file['name'],
-                'Título del proyecto': titulo_proyecto,
-                'Enlace de descarga': download_link
-            }
-            
             # Agregar keywords (máximo 5)
             for i in range(5):
                 key_name = f'keyword {i+1}'
@@ -631,47 +1739,157 @@ class GoogleDriveTopicModelling:
                 else:
                     record[key_name] = ""
             
-            diplomado_records.append(record)
-            print(f"    ✅ Registro creado exitosamente")
+            self.update_manifest_entry(result['file'], record, result['text'])
+            self._report_progress('grupo', estado='procesado', documento=record['Nombre de documento'])
+    
+    def process_single_diplomado(self, diplomado_folder):
+        """
+        Procesa un diplomado individual
+        
+        Args:
+            diplomado_folder (dict): Información de la carpeta del diplomado
+            
+        Returns:
+            list: Lista de registros para este diplomado
+        """
+        diplomado_name = diplomado_folder['name']
+        print(f"\n=== PROCESANDO DIPLOMADO: {diplomado_name} ===")
+        
+        groups = self._collect_group_folders(diplomado_folder)
         
-        return diplomado_records
+        if not groups:
+            return []
+        
+        # Descubrir las sistematizaciones de todos los grupos con peticiones batch
+        discovered = self.find_sistematizacion_files_batch([folder['id'] for _, folder in groups])
+        
+        # Procesar cada grupo (en paralelo si hay más de un worker configurado)
+        results = self._map_concurrently(
+            lambda group: self._process_group(diplomado_name, group[0], group[1], discovered),
+            groups
+        )
+        
+        # Lista para almacenar registros de este diplomado (el avance queda guardado)
+        return self._complete_records(results)
 
-    def process_all_diplomados(self, parent_folder_id, top_keywords=5):
+    def process_all_diplomados(self, parent_folder_id, top_keywords=5, progress_callback=None, cancel_event=None):
         """
         Procesa todos los diplomados encontrados en la carpeta padre
         
         Args:
             parent_folder_id (str): ID de la carpeta padre que contiene los diplomados
             top_keywords (int): Número de palabras clave por documento (máximo 5)
+            progress_callback (callable): Recibe (evento, datos) a medida que avanza el
+                procesamiento: 'diplomados' y 'grupos' con el total encontrado, y 'grupo'
+                con el estado de cada documento ('procesado', 'sin_cambios', 'fallido'
+                o 'sin_archivo')
+            cancel_event (threading.Event): Si se activa, no se procesan más grupos y se
+                devuelve un DataFrame vacío (el manifiesto conserva lo ya procesado)
             
         Returns:
             pd.DataFrame: DataFrame con todos los resultados
         """
+        self._progress_callback = progress_callback
+        self._cancel_event = cancel_event
+        self.metrics = MetricsRecorder()
+        self.drive_scheduler.metrics = self.metrics
+        try:
+            return self._process_all_diplomados(parent_folder_id, top_keywords)
+        finally:
+            self._progress_callback = None
+            self._cancel_event = None
+            
+            # Reporte por etapa de esta ejecución (JSON y formato Prometheus)
+            self.metrics.finish()
+            if self.metrics_dir:
+                self.metrics.export(self.metrics_dir)
+    
+    def _process_all_diplomados(self, parent_folder_id, top_keywords=5):
+        """
+        Cuerpo de process_all_diplomados
+        """
         if not self.service:
             raise Exception("Primero debes autenticarte con Google Drive")
         
-        # Encontrar todas las carpetas de diplomados
-        diplomado_folders = self.find_diplomado_folders(parent_folder_id)
+        # Recorrer por niveles todo el árbol de carpetas con consultas multi-padre
+        self.crawl_incomplete = False
+        exhausted_before = self.drive_scheduler.exhausted
+        tree = self.crawl_folder_tree(parent_folder_id)
+        self._folder_tree = tree
+        diplomado_folders = [node['diplomado'] for node in tree]
         
         if not diplomado_folders:
             print("No se encontraron carpetas de diplomados!")
             return pd.DataFrame()
         
-        # Lista para almacenar todos los registros
-        all_records = []
+        self._report_progress('diplomados', total=len(diplomado_folders))
         
-        # Procesar cada diplomado
-        for diplomado_folder in diplomado_folders:
-            diplomado_records = self.process_single_diplomado(diplomado_folder)
-            all_records.extend(diplomado_records)
+        # Cargar el manifiesto para reutilizar los documentos sin cambios
+        self.load_manifest()
+        self._seen_file_ids = set()
+        self._failed_file_ids = set()
+        self._group_files = {}
+        
+        # Procesar todos los grupos en un único pool; executor.map conserva
+        # el orden, así los registros salen igual que en el modo secuencial
+        tasks = [
+            (node['diplomado']['name'], group_num, folder)
+            for node in tree
+            for group_num, folder in node['groups']
+        ]
+        print(f"\nProcesando {len(tasks)} grupos con {self._effective_workers()} hilo(s)")
+        self._report_progress('grupos', total=len(tasks))
+        
+        # Descubrir las sistematizaciones de todos los grupos con peticiones batch
+        discovered = self.find_sistematizacion_files_batch([folder['id'] for _, _, folder in tasks])
+        
+        if self.use_pipeline:
+            # Descarga, parseo y embeddings superpuestos, con colas acotadas entre etapas
+            all_records = ProcessingPipeline(self, download_workers=self.max_workers).run(
+                tasks, discovered, top_n=top_keywords
+            )
+        else:
+            # Cada MANIFEST_CHECKPOINT_GROUPS grupos se extraen sus keywords en lote y se
+            # guarda el manifiesto, así una interrupción no pierde lo ya procesado
+            results = self._map_concurrently(
+                lambda task: self._process_group(*task, discovered), tasks,
+                on_chunk=lambda chunk: self._complete_records(chunk, top_n=top_keywords),
+                chunk_size=MANIFEST_CHECKPOINT_GROUPS
+            )
+            
+            # Lista para almacenar todos los registros
+            all_records = [result['record'] for result in results if result is not None and result['record'] is not None]
+        
+        if self.is_cancelled():
+            # Conservar lo ya procesado, pero sin podar el manifiesto: el recorrido quedó incompleto
+            self.save_manifest()
+            print("Procesamiento cancelado")
+            return pd.DataFrame()
+        
+        # Una petición abandonada tras agotar los reintentos también deja el recorrido
+        # incompleto, aunque quien la hizo haya seguido adelante con el error
+        if self.drive_scheduler.exhausted > exhausted_before:
+            self._mark_crawl_incomplete("peticiones a Drive abandonadas tras agotar los reintentos")
+        
+        # Olvidar los documentos que ya no aparecen en Drive, solo si se pudo consultar todo
+        # el árbol: un error de listado haría parecer vacíos grupos o diplomados enteros
+        if self.crawl_incomplete:
+            print("No se poda el manifiesto: el recorrido quedó incompleto")
+        else:
+            self.prune_manifest(self._seen_file_ids)
+        self.save_manifest()
+        
+        # Reindexar solo los resúmenes nuevos o modificados
+        self.update_search_index()
+        self.update_vector_index()
         
         # Crear DataFrame
         if all_records:
-            df = pd.DataFrame(all_records)
+            # El ID del archivo de Drive identifica cada proyecto (índice del DataFrame)
+            df = pd.DataFrame(all_records).set_index('ID de archivo')
             
             # Reordenar columnas
-            columns_order = ['Diplomado', 'Nombre de documento', 'Título del proyecto', 'Enlace de descarga'] + [f'keyword {i+1}' for i in range(5)]
-            df = df[columns_order]
+            df = df[RESULT_COLUMNS]
             
             print(f"\n=== RESUMEN FINAL ===")
             print(f"Total de diplomados procesados: {len(diplomado_folders)}")
@@ -686,6 +1904,65 @@ class GoogleDriveTopicModelling:
             print("No se procesaron proyectos exitosamente")
             return pd.DataFrame()
         
+    def process_groups(self, tasks, top_keywords=5, stale_file_ids=()):
+        """
+        Vuelve a procesar solo algunos grupos (por ejemplo, los que cambiaron en Drive)
+        sin recorrer el árbol de carpetas. Si falla la consulta de algún grupo, o la
+        descarga o el análisis de su sistematización, se lanza una excepción y no se
+        quita nada del manifiesto
+        
+        Args:
+            tasks (list): Tuplas (nombre del diplomado, número de grupo, carpeta del grupo)
+            top_keywords (int): Número de palabras clave por documento (máximo 5)
+            stale_file_ids (iterable): IDs de archivos que ya no están en Drive o dejaron
+                de ser la sistematización de su grupo; se quitan del manifiesto y de los índices
+            
+        Returns:
+            tuple: (registros de los grupos, dict {ID de carpeta de grupo: ID de la
+                sistematización encontrada})
+        """
+        if not self.service:
+            raise Exception("Primero debes autenticarte con Google Drive")
+        
+        self.metrics = MetricsRecorder()
+        self.drive_scheduler.metrics = self.metrics
+        try:
+            self.load_manifest()
+            self._seen_file_ids = set()
+            self._failed_file_ids = set()
+            self._group_files = {}
+            self.crawl_incomplete = False
+            exhausted_before = self.drive_scheduler.exhausted
+            
+            print(f"\nProcesando {len(tasks)} grupos modificados con {self._effective_workers()} hilo(s)")
+            results = self._map_concurrently(lambda task: self._process_group(*task), tasks)
+            records = self._complete_records(results, top_n=top_keywords)
+            failed = self._failed_file_ids & set(self._group_files.values())
+            
+            if self.drive_scheduler.exhausted > exhausted_before:
+                self._mark_crawl_incomplete("peticiones a Drive abandonadas tras agotar los reintentos")
+            if self.crawl_incomplete:
+                # Conservar lo procesado; un grupo que no se pudo consultar no se da por vacío
+                self.save_manifest()
+                raise Exception("No se pudieron consultar todos los grupos modificados")
+            if failed:
+                # Sin el registro nuevo no se puede reemplazar la fila anterior del grupo
+                self.save_manifest()
+                raise Exception(f"No se pudieron procesar {len(failed)} documentos de los grupos modificados")
+            
+            self.remove_manifest_entries(set(stale_file_ids) - self._seen_file_ids)
+            self.save_manifest()
+            
+            # Reindexar solo los resúmenes nuevos o modificados
+            self.update_search_index()
+            self.update_vector_index()
+            
+            return records, dict(self._group_files)
+        finally:
+            self.metrics.finish()
+            if self.metrics_dir:
+                self.metrics.export(self.metrics_dir)
+        
     def upload_excel_to_drive(self, excel_filename, parent_folder_id, drive_filename=None):
         """
         Sube un archivo Excel a Google Drive, sobreescribiendo si ya existe
@@ -706,7 +1983,7 @@ class GoogleDriveTopicModelling:
             
             # Buscar si ya existe un archivo con el mismo nombre
             query = f"name='{drive_filename}' and '{parent_folder_id}' in parents and trashed=false"
-            results = self.service.files().list(q=query, fields="files(id, name)").execute()
+            results = self.drive_scheduler.execute(self.service.files().list(q=query, fields="files(id, name)"))
             existing_files = results.get('files', [])
             
             media = MediaFileUpload(excel_filename, 
@@ -717,11 +1994,11 @@ class GoogleDriveTopicModelling:
                 file_id = existing_files[0]['id']
                 print(f"📝 Archivo existente encontrado, actualizando ID: {file_id}")
                 
-                file = self.service.files().update(
+                file = self.drive_scheduler.execute(self.service.files().update(
                     fileId=file_id,
                     media_body=media,
                     fields='id'
-                ).execute()
+                ))
                 
                 print(f"✅ Archivo actualizado exitosamente, mismo ID: {file.get('id')}")
                 
@@ -734,11 +2011,13 @@ class GoogleDriveTopicModelling:
                     'parents': [parent_folder_id]
                 }
                 
-                file = self.service.files().create(
+                # Sin reintentos: si la respuesta se pierde después de que Drive creó el
+                # archivo, reintentar crearía un duplicado con el mismo nombre
+                file = self.drive_scheduler.execute(self.service.files().create(
                     body=file_metadata,
                     media_body=media,
                     fields='id'
-                ).execute()
+                ), max_retries=0)
                 
                 print(f"✅ Nuevo archivo creado con ID: {file.get('id')}")
             
@@ -754,7 +2033,7 @@ def main():
     Función principal que ejecuta el procesamiento automáticamente para múltiples diplomados
     """
     # Inicializar el modelo
-    topic_model = GoogleDriveTopicModelling(language='spanish')
+    topic_model = GoogleDriveTopicModelling(language='spanish', max_workers=8, use_pipeline=True)
     
     try:
         # Autenticar con Google Drive
@@ -777,12 +2056,16 @@ def main():
         return pd.DataFrame()
 
 
-def reset_auth_and_run_multi():
+def reset_auth_and_run_multi(topic_model=None):
     """
     Función para resetear autenticación y ejecutar el script para múltiples diplomados
+    
+    Args:
+        topic_model (GoogleDriveTopicModelling): Instancia a reutilizar (opcional)
     """
     print("=== RESETEANDO AUTENTICACIÓN ===")
-    topic_model = GoogleDriveTopicModelling(language='spanish')
+    if topic_model is None:
+        topic_model = GoogleDriveTopicModelling(language='spanish', max_workers=8, use_pipeline=True)
     topic_model.reset_authentication() # Elimina token.json
     
     try:
@@ -803,8 +2086,11 @@ def reset_auth_and_run_multi():
 
 
 if __name__ == "__main__":
+    # Una sola instancia para procesar y subir: el modelo y la autenticación se reutilizan
+    topic_model = GoogleDriveTopicModelling(language='spanish', max_workers=8, use_pipeline=True)
+    
     # Ejecutar procesamiento
-    result_df = reset_auth_and_run_multi()
+    result_df = reset_auth_and_run_multi(topic_model)
     
     if not result_df.empty:
         print(f"\n=== GUARDANDO RESULTADOS ===")
@@ -818,9 +2104,10 @@ if __name__ == "__main__":
         result_df.to_excel(output_filename, index=False)
         print(f"\nResultados guardados en '{output_filename}'")
         
-        # Subir el excel a la carpeta
-        topic_model = GoogleDriveTopicModelling(language='spanish')
-        topic_model.authenticate_google_drive()
+        # Snapshot que la aplicación de Streamlit carga al iniciar
+        ResultsStore().save(result_df)
+        
+        # Subir el excel a la carpeta (la instancia ya está autenticada)
         parent_folder_id = "1-_W-Esk4lzkztPSeZpqO4Gq3ao1P9XKo"
         
         uploaded_file_id = topic_model.upload_excel_to_drive(
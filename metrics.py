@@ -0,0 +1,221 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+# Límites (en segundos) de los buckets del histograma de latencias
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+
+# Prefijo de las métricas en formato Prometheus
+PROMETHEUS_PREFIX = 'sermaestro'
+
+
+class StageStats:
+    """
+    Contadores de una etapa: llamadas, errores, latencias, elementos y bytes procesados
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.items = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.latencies = []
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+
+    def add(self, seconds, items=0, bytes_=0, error=False):
+        self.calls += 1
+        self.errors += int(bool(error))
+        self.items += items
+        self.bytes += bytes_
+        self.seconds += seconds
+        self.latencies.append(seconds)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.bucket_counts[i] += 1
+                break
+
+    def percentile(self, q):
+        """
+        Percentil q (0-100) de las latencias registradas
+        """
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+class MetricsRecorder:
+    """
+    Instrumentación por etapa de una ejecución del procesamiento (listado en Drive,
+    descargas, parseo de DOCX, extracción de keywords, indexado...).
+
+    Es thread-safe: las etapas se registran desde los hilos de descarga y del pipeline.
+    Al terminar la ejecución el reporte se exporta como JSON y en el formato de texto
+    de Prometheus.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+        self.started_at = time.time()
+        self.finished_at = None
+
+    @contextmanager
+    def stage(self, name, items=0):
+        """
+        Mide una llamada a una etapa; si lanza una excepción se cuenta como error
+
+        Args:
+            name (str): Nombre de la etapa
+            items (int): Elementos (documentos, archivos) que procesa la llamada
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.record(name, time.perf_counter() - start, items=items, error=True)
+            raise
+        self.record(name, time.perf_counter() - start, items=items)
+
+    def record(self, name, seconds, items=0, bytes_=0, error=False):
+        """
+        Registra una llamada ya medida
+
+        Args:
+            name (str): Nombre de la etapa
+            seconds (float): Duración de la llamada
+            items (int): Elementos procesados
+            bytes_ (int): Bytes transferidos o leídos
+            error (bool): Si la llamada falló
+        """
+        with self._lock:
+            if name not in self._stages:
+                self._stages[name] = StageStats()
+            self._stages[name].add(seconds, items=items, bytes_=bytes_, error=error)
+
+    def finish(self):
+        """
+        Marca el fin de la ejecución (define la duración usada para el ritmo)
+        """
+        self.finished_at = time.time()
+
+    def report(self):
+        """
+        Reporte de la ejecución
+
+        Returns:
+            dict: inicio, duración y, por etapa, llamadas, errores, elementos, bytes,
+                segundos acumulados, elementos por segundo de la ejecución y latencias
+        """
+        with self._lock:
+            duration = (self.finished_at or time.time()) - self.started_at
+            stages = {}
+            for name, stats in self._stages.items():
+                stages[name] = {
+                    'llamadas': stats.calls,
+                    'errores': stats.errors,
+                    'elementos': stats.items,
+                    'bytes': stats.bytes,
+                    'segundos': round(stats.seconds, 4),
+                    'elementos_por_segundo': round(stats.items / duration, 3) if duration > 0 else 0.0,
+                    'latencia': {
+                        'p50': round(stats.percentile(50), 4),
+                        'p95': round(stats.percentile(95), 4),
+                        'max': round(max(stats.latencies, default=0.0), 4),
+                        'buckets': dict(zip([str(bound) for bound in LATENCY_BUCKETS], stats.bucket_counts)),
+                    },
+                }
+
+            return {
+                'inicio': datetime.fromtimestamp(self.started_at).isoformat(timespec='seconds'),
+                'duracion': round(duration, 3),
+                'etapas': stages,
+            }
+
+    def to_prometheus(self):
+        """
+        Reporte en el formato de texto de Prometheus
+
+        Returns:
+            str: Métricas con la etiqueta stage por etapa
+        """
+        with self._lock:
+            stages = sorted(self._stages.items())
+            duration = (self.finished_at or time.time()) - self.started_at
+
+        p = PROMETHEUS_PREFIX
+        lines = [
+            f"# HELP {p}_run_duration_seconds Duración de la última ejecución",
+            f"# TYPE {p}_run_duration_seconds gauge",
+            f"{p}_run_duration_seconds {duration:.6f}",
+        ]
+
+        counters = [
+            ('calls_total', 'Llamadas por etapa', lambda s: s.calls),
+            ('errors_total', 'Errores por etapa', lambda s: s.errors),
+            ('items_total', 'Elementos procesados por etapa', lambda s: s.items),
+            ('bytes_total', 'Bytes transferidos por etapa', lambda s: s.bytes),
+        ]
+        for metric, help_text, value in counters:
+            lines.append(f"# HELP {p}_stage_{metric} {help_text}")
+            lines.append(f"# TYPE {p}_stage_{metric} counter")
+            for name, stats in stages:
+                lines.append(f'{p}_stage_{metric}{{stage="{name}"}} {value(stats)}')
+
+        lines.append(f"# HELP {p}_stage_latency_seconds Latencia de las llamadas por etapa")
+        lines.append(f"# TYPE {p}_stage_latency_seconds histogram")
+        for name, stats in stages:
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, stats.bucket_counts):
+                cumulative += count
+                lines.append(f'{p}_stage_latency_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'{p}_stage_latency_seconds_bucket{{stage="{name}",le="+Inf"}} {stats.calls}')
+            lines.append(f'{p}_stage_latency_seconds_sum{{stage="{name}"}} {stats.seconds:.6f}')
+            lines.append(f'{p}_stage_latency_seconds_count{{stage="{name}"}} {stats.calls}')
+
+        return "\n".join(lines) + "\n"
+
+    def export(self, metrics_dir, name='ultima_ejecucion'):
+        """
+        Guarda el reporte como JSON y como texto de Prometheus (reemplazando los anteriores)
+
+        Args:
+            metrics_dir (str): Carpeta de destino
+            name (str): Nombre base de los archivos
+        """
+        try:
+            os.makedirs(metrics_dir, exist_ok=True)
+            outputs = [
+                (os.path.join(metrics_dir, f"{name}.json"),
+                 json.dumps(self.report(), ensure_ascii=False, indent=2)),
+                (os.path.join(metrics_dir, f"{name}.prom"), self.to_prometheus()),
+            ]
+            for path, content in outputs:
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error al exportar las métricas en {metrics_dir}: {e}")
+
+
+def load_report(metrics_dir, name='ultima_ejecucion'):
+    """
+    Lee el último reporte JSON exportado
+
+    Returns:
+        dict: Reporte o None si no existe
+    """
+    path = os.path.join(metrics_dir, f"{name}.json")
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error al leer el reporte de métricas {path}: {e}")
+        return None
@@ -0,0 +1,268 @@
+import os
+import re
+import json
+import tempfile
+import numpy as np
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+# Backends de embeddings de KeyBERT: el modelo de sentence-transformers en PyTorch (fp32),
+# el mismo modelo exportado a ONNX Runtime y su variante con pesos cuantizados a int8
+EMBEDDING_BACKENDS = ('pytorch', 'onnx', 'onnx-int8')
+
+# Carpeta donde se guardan los modelos exportados (se exportan una sola vez)
+ONNX_EXPORT_DIR = 'modelos_onnx'
+
+# Textos por llamada a ONNX Runtime
+ONNX_BATCH_SIZE = 64
+
+# Versión del conjunto de operadores ONNX de la exportación
+ONNX_OPSET = 14
+
+
+def embedding_model_key(model_name, backend='pytorch'):
+    """
+    Nombre con que se identifican los embeddings de un modelo en el caché de embeddings
+    y en el índice semántico. ONNX fp32 da los mismos vectores que PyTorch y comparte la
+    clave; los de int8 difieren levemente y se guardan aparte
+
+    Args:
+        model_name (str): Modelo de sentence-transformers
+        backend (str): Uno de EMBEDDING_BACKENDS
+
+    Returns:
+        str: Clave del modelo
+    """
+    return f"{model_name}-int8" if backend == 'onnx-int8' else model_name
+
+
+def _model_dir(model_name, export_dir):
+    return os.path.join(export_dir, re.sub(r'[^A-Za-z0-9_.-]', '_', model_name))
+
+
+@contextmanager
+def _export_lock(model_dir):
+    """
+    Bloqueo exclusivo entre procesos mientras se exporta o cuantiza un modelo: los demás
+    esperan y después encuentran el archivo ya exportado
+    """
+    os.makedirs(model_dir, exist_ok=True)
+    with open(os.path.join(model_dir, 'export.lock'), 'a+') as fd:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def _temp_path(model_dir, suffix):
+    """
+    Archivo temporal único en la carpeta del modelo (se reemplaza atómicamente al final)
+    """
+    fd, path = tempfile.mkstemp(dir=model_dir, suffix=suffix)
+    os.close(fd)
+    return path
+
+
+def _export_fp32(model_name, model_dir):
+    """
+    Exporta el transformer de un modelo de sentence-transformers a ONNX junto con su
+    tokenizador y la configuración de pooling (necesita PyTorch solo esta vez)
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    print(f"Exportando el modelo {model_name} a ONNX...")
+    st_model = SentenceTransformer(model_name, device='cpu')
+    transformer = st_model[0]
+    tokenizer = transformer.tokenizer
+    input_names = list(tokenizer.model_input_names)
+
+    pooling = None
+    for module in st_model:
+        if hasattr(module, 'get_pooling_mode_str'):
+            pooling = module.get_pooling_mode_str()
+    if pooling not in ('mean', 'cls', 'max'):
+        raise ValueError(f"Pooling no soportado para ONNX: {pooling}")
+
+    class _Encoder(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs)), return_dict=False)[0]
+
+    sample = tokenizer(['texto de ejemplo para exportar'], return_tensors='pt')
+    dynamic_axes = {name: {0: 'lote', 1: 'secuencia'} for name in input_names + ['last_hidden_state']}
+
+    tmp_path = _temp_path(model_dir, '.onnx')
+    try:
+        with torch.no_grad():
+            torch.onnx.export(
+                _Encoder(transformer.auto_model).eval(),
+                tuple(sample[name] for name in input_names),
+                tmp_path,
+                input_names=input_names,
+                output_names=['last_hidden_state'],
+                dynamic_axes=dynamic_axes,
+                opset_version=ONNX_OPSET
+            )
+
+        tokenizer.save_pretrained(model_dir)
+        config = {
+            'model_name': model_name,
+            'pooling': pooling,
+            'normalize': any(type(module).__name__ == 'Normalize' for module in st_model),
+            'max_length': st_model.max_seq_length,
+            'pad_token_id': tokenizer.pad_token_id,
+            'pad_token': tokenizer.pad_token,
+        }
+        with open(os.path.join(model_dir, 'config_onnx.json'), 'w', encoding='utf-8') as f:
+            json.dump(config, f, ensure_ascii=False)
+
+        # El modelo queda disponible recién cuando está completo
+        os.replace(tmp_path, os.path.join(model_dir, 'model.onnx'))
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def export_onnx_model(model_name, export_dir=ONNX_EXPORT_DIR, quantized=False):
+    """
+    Devuelve el modelo exportado a ONNX, exportándolo la primera vez. La variante
+    cuantizada se obtiene del modelo fp32 con cuantización dinámica: los pesos de las
+    capas lineales pasan a int8 y las activaciones se cuantizan al vuelo (solo CPU)
+
+    Args:
+        model_name (str): Modelo de sentence-transformers
+        export_dir (str): Carpeta de los modelos exportados
+        quantized (bool): Devolver la variante int8
+
+    Returns:
+        str: Ruta del archivo .onnx
+    """
+    model_dir = _model_dir(model_name, export_dir)
+    fp32_path = os.path.join(model_dir, 'model.onnx')
+    int8_path = os.path.join(model_dir, 'model_int8.onnx')
+    path = int8_path if quantized else fp32_path
+    if os.path.exists(path):
+        return path
+
+    with _export_lock(model_dir):
+        # Otro proceso pudo terminar la exportación mientras se esperaba el bloqueo
+        if not os.path.exists(fp32_path):
+            _export_fp32(model_name, model_dir)
+
+        if quantized and not os.path.exists(int8_path):
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+
+            print(f"Cuantizando el modelo {model_name} a int8...")
+            tmp_path = _temp_path(model_dir, '.onnx')
+            try:
+                quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+                os.replace(tmp_path, int8_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    return path
+
+
+class OnnxEmbedder:
+    """
+    Backend de KeyBERT que calcula los embeddings con ONNX Runtime en CPU, con el modelo
+    de sentence-transformers exportado (fp32 o int8). Reproduce el pooling y la
+    normalización del modelo original, así los vectores quedan en el mismo espacio.
+
+    Como CachedEmbedder, solo implementa embed(), que es lo que usa KeyBERT. La
+    inferencia no pasa por PyTorch ni carga los pesos fp32 del modelo original, pero
+    KeyBERT sigue importando sentence-transformers (y con él torch), así que ambos
+    deben estar instalados.
+    """
+
+    def __init__(self, model_name, quantized=False, threads=None, export_dir=ONNX_EXPORT_DIR,
+                 batch_size=ONNX_BATCH_SIZE):
+        """
+        Args:
+            model_name (str): Modelo de sentence-transformers
+            quantized (bool): Usar la variante con pesos int8
+            threads (int): Hilos intra-op de ONNX Runtime (None = uno por núcleo físico)
+            export_dir (str): Carpeta de los modelos exportados
+            batch_size (int): Textos por llamada al modelo
+        """
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_path = export_onnx_model(model_name, export_dir, quantized=quantized)
+        model_dir = os.path.dirname(model_path)
+        with open(os.path.join(model_dir, 'config_onnx.json'), 'r', encoding='utf-8') as f:
+            self.config = json.load(f)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads or 0
+        # Una sola inferencia a la vez (el modelo se usa con un lock): los hilos van intra-op
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=['CPUExecutionProvider'])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, 'tokenizer.json'))
+        self.tokenizer.enable_truncation(max_length=self.config['max_length'])
+        self.tokenizer.enable_padding(pad_id=self.config['pad_token_id'], pad_token=self.config['pad_token'])
+
+        self.model_name = model_name
+        self.quantized = quantized
+        self.batch_size = batch_size
+
+    def _pool(self, hidden, attention_mask):
+        """
+        Vector por texto a partir de los vectores por token
+        """
+        pooling = self.config['pooling']
+        if pooling == 'cls':
+            vectors = hidden[:, 0]
+        elif pooling == 'max':
+            vectors = np.where(attention_mask[:, :, None] > 0, hidden, -1e9).max(axis=1)
+        else:
+            mask = attention_mask[:, :, None].astype(hidden.dtype)
+            vectors = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+        if self.config['normalize']:
+            vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        return vectors.astype(np.float32)
+
+    def embed(self, documents, verbose=False):
+        documents = list(documents)
+        if not documents:
+            return np.empty((0, 0), dtype=np.float32)
+
+        # Agrupar textos de largo parecido: cada lote se rellena hasta su texto más largo
+        order = sorted(range(len(documents)), key=lambda i: len(documents[i]))
+        embeddings = [None] * len(documents)
+
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            encodings = self.tokenizer.encode_batch([documents[i] for i in batch])
+
+            attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+            feeds = {
+                'input_ids': np.array([encoding.ids for encoding in encodings], dtype=np.int64),
+                'attention_mask': attention_mask,
+                'token_type_ids': np.array([encoding.type_ids for encoding in encodings], dtype=np.int64),
+            }
+            hidden = self.session.run(
+                ['last_hidden_state'], {name: value for name, value in feeds.items() if name in self.input_names}
+            )[0]
+
+            for i, vector in zip(batch, self._pool(hidden, attention_mask)):
+                embeddings[i] = vector
+
+        return np.vstack(embeddings)
@@ -0,0 +1,227 @@
+import os
+import time
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from docx_extractor import extraer_datos_documento
+
+# Marca de fin de cola
+_FIN = object()
+
+
+def _parse_pool_context():
+    """
+    Contexto de los procesos de parseo. No se usa fork: el proceso ya tiene hilos y el
+    modelo (torch) cargado, y copiarlo con fork puede dejar locks tomados en el hijo.
+    forkserver arranca los procesos desde un servidor limpio (spawn donde no existe)
+    """
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
+
+
+def _parsear_documento(source, filename, motor):
+    """
+    Parsea un documento en un proceso del pool y devuelve también cuánto tardó
+
+    Args:
+        source (bytes | str): Contenido del documento o ruta del archivo temporal de la
+            descarga (los documentos grandes se leen desde disco y no se copian entre procesos)
+    """
+    start = time.perf_counter()
+    datos = extraer_datos_documento(source, filename, motor)
+    size = os.path.getsize(source) if isinstance(source, str) else len(source)
+    return datos, time.perf_counter() - start, size
+
+
+class ProcessingPipeline:
+    """
+    Motor de procesamiento por etapas con colas acotadas entre ellas:
+
+    1. Descarga: hilos de E/S, cada uno con su propio cliente de Drive
+    2. Parseo: pool de procesos que extrae título y resumen de cada DOCX
+    3. Embeddings: un único hilo dueño del modelo que extrae keywords por lotes
+
+    Las etapas trabajan a la vez, así la red, el CPU del parser y el modelo no quedan
+    ociosos. Cuando una etapa se atrasa, las colas llenas frenan a la anterior
+    (backpressure), lo que acota los documentos en memoria.
+    """
+
+    def __init__(self, topic_model, download_workers=8, parse_workers=None,
+                 queue_size=32, embed_batch_size=64):
+        """
+        Args:
+            topic_model (GoogleDriveTopicModelling): Instancia autenticada
+            download_workers (int): Hilos de descarga
+            parse_workers (int): Procesos de parseo (None = número de CPUs)
+            queue_size (int): Capacidad de cada cola entre etapas
+            embed_batch_size (int): Documentos por lote de extracción de keywords
+        """
+        self.topic_model = topic_model
+        self.download_workers = max(1, int(download_workers))
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.embed_batch_size = embed_batch_size
+
+    def run(self, tasks, discovered, top_n=5):
+        """
+        Procesa los grupos por el pipeline
+
+        Args:
+            tasks (list): Tuplas (nombre del diplomado, número de grupo, carpeta)
+            discovered (dict): Resultado de find_sistematizacion_files_batch
+            top_n (int): Número de palabras clave por documento
+
+        Returns:
+            list: Registros completos, en el mismo orden que tasks
+        """
+        model = self.topic_model
+        results = [None] * len(tasks)
+
+        download_queue = queue.Queue(maxsize=self.queue_size)
+        parse_queue = queue.Queue(maxsize=self.queue_size)
+
+        # Sin credenciales no se pueden crear clientes por hilo: una sola descarga a la vez
+        download_workers = self.download_workers if model.credentials is not None else 1
+
+        with ProcessPoolExecutor(max_workers=self.parse_workers, mp_context=_parse_pool_context()) as parse_pool:
+
+            def download_stage():
+                service_ready = True
+                if model.credentials is not None:
+                    try:
+                        model._init_worker_service()
+                    except Exception as e:
+                        # Sin cliente este hilo no puede descargar, pero debe seguir vaciando
+                        # la cola hasta la marca de fin para que el productor no se bloquee
+                        print(f"    ❌ Error al crear el cliente de Drive del hilo de descarga: {e}")
+                        service_ready = False
+
+                while True:
+                    job = download_queue.get()
+                    if job is _FIN:
+                        return
+
+                    index, diplomado_name, sistematizacion_file = job
+                    if model.is_cancelled():
+                        continue
+                    if not service_ready:
+                        model._report_failed_document(sistematizacion_file)
+                        continue
+                    try:
+                        file_content = model.download_file_content(
+                            sistematizacion_file['id'], sistematizacion_file.get('md5Checksum'),
+                            sistematizacion_file.get('size')
+                        )
+                        if not file_content:
+                            print(f"    ❌ Error al descargar {sistematizacion_file['name']}")
+                            model._report_failed_document(sistematizacion_file)
+                            if file_content is not None:
+                                file_content.close()
+                            continue
+
+                        try:
+                            future = parse_pool.submit(
+                                _parsear_documento, file_content.source(),
+                                sistematizacion_file['name'], model.docx_engine
+                            )
+                        except Exception:
+                            file_content.close()
+                            raise
+                        # Bloquea si la etapa de embeddings va atrasada. El buffer se cierra
+                        # (y libera su parte del límite de bytes) cuando termina el parseo
+                        parse_queue.put((index, diplomado_name, sistematizacion_file, future, file_content))
+                    except Exception as e:
+                        print(f"    ❌ Error en la descarga de {sistematizacion_file['name']}: {e}")
+                        model._report_failed_document(sistematizacion_file)
+
+            def embed_stage():
+                batch = []
+
+                def flush():
+                    if model.is_cancelled():
+                        batch.clear()
+                        return
+                    try:
+                        model.assign_keywords([result for _, result in batch], top_n=top_n)
+                        for index, result in batch:
+                            results[index] = result
+                        # Guardar el avance para no repetir trabajo si el proceso se interrumpe
+                        model.save_manifest()
+                    except Exception as e:
+                        print(f"Error al extraer keywords del lote: {e}")
+                        for _, result in batch:
+                            model._report_failed_document(result['file'])
+                    batch.clear()
+
+                while True:
+                    item = parse_queue.get()
+                    if item is _FIN:
+                        break
+
+                    index, diplomado_name, sistematizacion_file, future, file_content = item
+                    if model.is_cancelled():
+                        # Descartar lo que queda en cola sin parsearlo ni extraer keywords
+                        future.cancel()
+                        file_content.close()
+                        continue
+                    try:
+                        datos, seconds, size = future.result()
+                        model.record_parse_metrics(datos, seconds, size)
+                    except Exception as e:
+                        print(f"    ❌ Error al procesar {sistematizacion_file['name']}: {e}")
+                        model.metrics.record('parseo', 0.0, error=True)
+                        model._report_failed_document(sistematizacion_file)
+                        continue
+                    finally:
+                        file_content.close()
+
+                    try:
+                        result = model._build_group_result(diplomado_name, sistematizacion_file, datos)
+                    except Exception as e:
+                        # Un error aquí no debe detener el hilo: la etapa de parseo se quedaría
+                        # bloqueada en una cola llena y run() no terminaría nunca
+                        print(f"    ❌ Error al procesar {sistematizacion_file['name']}: {e}")
+                        model._report_failed_document(sistematizacion_file)
+                        continue
+                    if result is not None:
+                        batch.append((index, result))
+                        if len(batch) >= self.embed_batch_size:
+                            flush()
+
+                if batch:
+                    flush()
+
+            downloaders = [
+                threading.Thread(target=download_stage, name=f"descarga-{i}", daemon=True)
+                for i in range(download_workers)
+            ]
+            embedder = threading.Thread(target=embed_stage, name="embeddings", daemon=True)
+            for thread in downloaders:
+                thread.start()
+            embedder.start()
+
+            # Alimentar la etapa de descarga; los registros sin cambios no pasan por el pipeline.
+            # Las marcas de fin se envían aunque falle, así los hilos terminan y el pool se cierra
+            try:
+                for index, (diplomado_name, group_num, folder) in enumerate(tasks):
+                    if model.is_cancelled():
+                        break
+                    sistematizacion_file, cached_result = model._resolve_group_file(
+                        diplomado_name, group_num, folder, discovered
+                    )
+                    if cached_result is not None:
+                        results[index] = cached_result
+                    elif sistematizacion_file is not None:
+                        download_queue.put((index, diplomado_name, sistematizacion_file))
+            finally:
+                for _ in downloaders:
+                    download_queue.put(_FIN)
+                for thread in downloaders:
+                    thread.join()
+
+                parse_queue.put(_FIN)
+                embedder.join()
+
+        return [result['record'] for result in results if result is not None and result['record'] is not None]
@@ -0,0 +1,150 @@
+import time
+import threading
+import traceback
+
+# Estados de un trabajo de procesamiento
+ESTADO_EN_CURSO = 'en curso'
+ESTADO_COMPLETADO = 'completado'
+ESTADO_CANCELADO = 'cancelado'
+ESTADO_ERROR = 'error'
+
+# Documentos recientes que se conservan para mostrar en la interfaz
+MAX_EVENTOS_RECIENTES = 20
+
+
+class ProcessingJob:
+    """
+    Procesamiento de todos los diplomados en un hilo en segundo plano.
+
+    Recibe los eventos de progreso de GoogleDriveTopicModelling.process_all_diplomados
+    y mantiene contadores que la interfaz consulta con progress(): diplomados
+    encontrados, grupos terminados, documentos fallidos, ritmo y tiempo estimado.
+    Al terminar guarda el resultado como nuevo snapshot en el ResultsStore, así los
+    resultados anteriores se siguen usando mientras el trabajo corre.
+    """
+
+    def __init__(self, topic_model, parent_folder_id, results_store, top_keywords=5):
+        """
+        Args:
+            topic_model (GoogleDriveTopicModelling): Instancia autenticada (de uso exclusivo del trabajo)
+            parent_folder_id (str): ID de la carpeta padre que contiene los diplomados
+            results_store (ResultsStore): Donde se guarda el resultado al terminar
+            top_keywords (int): Número de palabras clave por documento
+        """
+        self.topic_model = topic_model
+        self.parent_folder_id = parent_folder_id
+        self.results_store = results_store
+        self.top_keywords = top_keywords
+
+        self._lock = threading.Lock()
+        self._cancel_event = threading.Event()
+        self._thread = None
+
+        self.estado = ESTADO_EN_CURSO
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self.diplomados = 0
+        self.grupos_total = 0
+        self.conteos = {'procesado': 0, 'sin_cambios': 0, 'fallido': 0, 'sin_archivo': 0}
+        self.recientes = []
+        self.proyectos = 0
+
+    def start(self):
+        """
+        Inicia el procesamiento en un hilo en segundo plano
+        """
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="procesamiento", daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        """
+        Pide cancelar el procesamiento; los grupos en curso terminan y no se inician más
+        """
+        self._cancel_event.set()
+
+    def is_running(self):
+        """
+        Returns:
+            bool: True mientras el hilo de procesamiento sigue activo
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def _on_progress(self, event, data):
+        """
+        Callback de progreso de process_all_diplomados (se llama desde varios hilos)
+        """
+        with self._lock:
+            if event == 'diplomados':
+                self.diplomados = data['total']
+            elif event == 'grupos':
+                self.grupos_total = data['total']
+            elif event == 'grupo':
+                estado = data.get('estado')
+                self.conteos[estado] = self.conteos.get(estado, 0) + 1
+                self.recientes.append((estado, data.get('documento')))
+                del self.recientes[:-MAX_EVENTOS_RECIENTES]
+
+    def _run(self):
+        try:
+            result_df = self.topic_model.process_all_diplomados(
+                self.parent_folder_id,
+                top_keywords=self.top_keywords,
+                progress_callback=self._on_progress,
+                cancel_event=self._cancel_event
+            )
+
+            if self._cancel_event.is_set():
+                estado = ESTADO_CANCELADO
+            elif result_df.empty:
+                estado = ESTADO_ERROR
+                self.error = "No se encontraron documentos para procesar"
+            elif self.results_store.save(result_df):
+                estado = ESTADO_COMPLETADO
+                self.proyectos = len(result_df)
+            else:
+                estado = ESTADO_ERROR
+                self.error = "No se pudieron guardar los resultados"
+
+        except Exception as e:
+            traceback.print_exc()
+            estado = ESTADO_ERROR
+            self.error = str(e)
+
+        with self._lock:
+            self.estado = estado
+            self.finished_at = time.time()
+
+    def progress(self):
+        """
+        Estado actual del trabajo
+
+        Returns:
+            dict: estado, error, diplomados, grupos (total y terminados), conteos por
+                estado, documentos por segundo, segundos transcurridos, tiempo estimado
+                restante (None si todavía no se puede estimar) y documentos recientes
+        """
+        with self._lock:
+            grupos_terminados = sum(self.conteos.values())
+            elapsed = (self.finished_at or time.time()) - (self.started_at or time.time())
+            throughput = grupos_terminados / elapsed if elapsed > 0 else 0.0
+
+            eta = None
+            if self.estado == ESTADO_EN_CURSO and self.grupos_total and throughput > 0:
+                eta = max(0.0, (self.grupos_total - grupos_terminados) / throughput)
+
+            return {
+                'estado': self.estado,
+                'error': self.error,
+                'diplomados': self.diplomados,
+                'grupos_total': self.grupos_total,
+                'grupos_terminados': grupos_terminados,
+                'conteos': dict(self.conteos),
+                'documentos_por_segundo': throughput,
+                'transcurrido': elapsed,
+                'eta': eta,
+                'proyectos': self.proyectos,
+                'recientes': list(self.recientes),
+                'cancelando': self._cancel_event.is_set() and self.estado == ESTADO_EN_CURSO,
+            }
@@ -0,0 +1,141 @@
+import os
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+# Versión del formato del snapshot de resultados.
+# Incrementarla hace que los snapshots anteriores se ignoren hasta reprocesar
+RESULTS_STORE_VERSION = 2
+
+# Tabla con una fila por proyecto (las mismas columnas del DataFrame de resultados)
+PROJECTS_TABLE = 'proyectos'
+
+
+class ResultsSnapshot:
+    """
+    Vista de solo lectura de un snapshot de resultados ya cargado en memoria.
+    Las sesiones comparten la misma instancia, así que el DataFrame no debe modificarse.
+    """
+
+    def __init__(self, df, version, created_at, stamp):
+        """
+        Args:
+            df (pd.DataFrame): Resultados del procesamiento
+            version (int): Versión del formato con que se guardó
+            created_at (str): Fecha de creación (ISO 8601)
+            stamp (tuple): Identificador del archivo del que se cargó
+        """
+        self.df = df
+        self.version = version
+        self.created_at = created_at
+        self.stamp = stamp
+
+
+class ResultsStore:
+    """
+    Snapshot persistente de los resultados del procesamiento en un archivo SQLite.
+
+    Cada guardado escribe un archivo nuevo y lo reemplaza de forma atómica con
+    os.replace: quien ya cargó (o tiene abierto) el snapshot anterior lo sigue usando
+    y nunca se lee un archivo a medio escribir.
+    """
+
+    def __init__(self, path='resultados.sqlite'):
+        """
+        Args:
+            path (str): Ruta del archivo SQLite con el snapshot
+        """
+        self.path = path
+
+    def stamp(self):
+        """
+        Identificador del snapshot actual en disco; cambia cada vez que se reemplaza
+
+        Returns:
+            tuple: (inodo, mtime en ns, tamaño) o None si no hay snapshot
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def save(self, df):
+        """
+        Guarda los resultados como nuevo snapshot, reemplazando el anterior
+
+        Args:
+            df (pd.DataFrame): Resultados del procesamiento (un índice con nombre, como
+                el ID de archivo, se guarda y se restaura al cargar)
+
+        Returns:
+            bool: True si se guardó correctamente
+        """
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+            conn = sqlite3.connect(tmp_path)
+            try:
+                with conn:
+                    conn.execute("CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT)")
+                    conn.executemany(
+                        "INSERT INTO meta (name, value) VALUES (?, ?)",
+                        [
+                            ('version', str(RESULTS_STORE_VERSION)),
+                            ('created_at', datetime.now().isoformat(timespec='seconds')),
+                            ('proyectos', str(len(df))),
+                            ('indice', df.index.name or ''),
+                        ]
+                    )
+                df.to_sql(PROJECTS_TABLE, conn, index=bool(df.index.name))
+                conn.commit()
+            finally:
+                conn.close()
+
+            os.replace(tmp_path, self.path)
+            print(f"💾 Snapshot de resultados guardado en {self.path} ({len(df)} proyectos)")
+            return True
+
+        except Exception as e:
+            print(f"Error al guardar el snapshot de resultados {self.path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+    def load(self):
+        """
+        Carga el snapshot actual en memoria
+
+        Returns:
+            ResultsSnapshot: Snapshot cargado, o None si no existe o es de otra versión
+        """
+        stamp = self.stamp()
+        if stamp is None:
+            return None
+
+        try:
+            # Abrir en solo lectura: un reemplazo concurrente no afecta a esta conexión
+            conn = sqlite3.connect(f"file:{os.path.abspath(self.path)}?mode=ro", uri=True)
+            try:
+                meta = dict(conn.execute("SELECT name, value FROM meta"))
+                version = int(meta.get('version', 0))
+                if version != RESULTS_STORE_VERSION:
+                    print(f"Snapshot de resultados con versión {version}, se ignora")
+                    return None
+
+                df = pd.read_sql_query(
+                    f'SELECT * FROM "{PROJECTS_TABLE}"', conn, index_col=meta.get('indice') or None
+                )
+            finally:
+                conn.close()
+
+            return ResultsSnapshot(df, version, meta.get('created_at'), stamp)
+
+        except Exception as e:
+            print(f"Error al cargar el snapshot de resultados {self.path}: {e}")
+            return None
@@ -0,0 +1,178 @@
+import math
+import sqlite3
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+# Versión del formato del índice. Incrementarla obliga a reconstruirlo
+SEARCH_INDEX_VERSION = 1
+
+# Parámetros de BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Cuántas veces cuenta cada aparición de un término en el título respecto del resumen
+TITLE_WEIGHT = 2
+
+
+class BM25Index:
+    """
+    Índice de texto completo BM25 sobre el título y el resumen ejecutivo de cada proyecto.
+
+    Vive en un archivo SQLite con listas de postings (término -> documento, frecuencia),
+    así una búsqueda solo lee las listas de los términos de la consulta. Se actualiza de
+    forma incremental: solo se reindexan los documentos nuevos o cuya huella cambió.
+    """
+
+    def __init__(self, path, tokenize):
+        """
+        Args:
+            path (str): Ruta del archivo SQLite del índice
+            tokenize (callable): Función texto -> lista de tokens (preprocess_text)
+        """
+        self.path = path
+        self.tokenize = tokenize
+        self._lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER)")
+            row = conn.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+            if row is not None and row[0] != SEARCH_INDEX_VERSION:
+                print(f"Índice de búsqueda con versión {row[0]}, se reconstruye")
+                conn.execute("DROP TABLE IF EXISTS documents")
+                conn.execute("DROP TABLE IF EXISTS postings")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents "
+                "(doc_id TEXT PRIMARY KEY, fingerprint TEXT, titulo TEXT, resumen TEXT, length REAL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS postings "
+                "(term TEXT, doc_id TEXT, tf REAL, PRIMARY KEY (term, doc_id)) WITHOUT ROWID"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id)")
+            conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('version', ?)", (SEARCH_INDEX_VERSION,))
+
+    @contextmanager
+    def _connect(self):
+        """
+        Conexión al índice que confirma la transacción y se cierra al salir
+        """
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _term_frequencies(self, titulo, resumen):
+        """
+        Frecuencias ponderadas de los términos de un documento
+
+        Returns:
+            Counter: término -> frecuencia (las del título pesan TITLE_WEIGHT)
+        """
+        frequencies = Counter(self.tokenize(resumen or ""))
+        for term in self.tokenize(titulo or ""):
+            frequencies[term] += TITLE_WEIGHT
+        return frequencies
+
+    def fingerprints(self):
+        """
+        Huellas de los documentos indexados
+
+        Returns:
+            dict: doc_id -> huella
+        """
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT doc_id, fingerprint FROM documents"))
+
+    def update(self, documents):
+        """
+        Sincroniza el índice con el conjunto actual de documentos: indexa los nuevos o
+        modificados y elimina los que ya no están
+
+        Args:
+            documents (dict): doc_id -> {'fingerprint', 'titulo', 'resumen'}
+
+        Returns:
+            tuple: (documentos indexados, documentos eliminados)
+        """
+        with self._lock:
+            indexed = self.fingerprints()
+
+            changed = [
+                doc_id for doc_id, doc in documents.items()
+                if indexed.get(doc_id) != doc['fingerprint']
+            ]
+            removed = [doc_id for doc_id in indexed if doc_id not in documents]
+
+            if not changed and not removed:
+                return 0, 0
+
+            # Tokenizar fuera de la transacción
+            rows = []
+            for doc_id in changed:
+                doc = documents[doc_id]
+                frequencies = self._term_frequencies(doc['titulo'], doc['resumen'])
+                rows.append((doc_id, doc, frequencies))
+
+            with self._connect() as conn:
+                for doc_id in changed + removed:
+                    conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+                    conn.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,))
+
+                conn.executemany(
+                    "INSERT INTO documents (doc_id, fingerprint, titulo, resumen, length) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (doc_id, doc['fingerprint'], doc['titulo'], doc['resumen'], sum(frequencies.values()))
+                        for doc_id, doc, frequencies in rows
+                    ]
+                )
+                conn.executemany(
+                    "INSERT INTO postings (term, doc_id, tf) VALUES (?, ?, ?)",
+                    [
+                        (term, doc_id, tf)
+                        for doc_id, _, frequencies in rows
+                        for term, tf in frequencies.items()
+                    ]
+                )
+
+            return len(changed), len(removed)
+
+    def search(self, query, top_k=20):
+        """
+        Busca los documentos más relevantes para una consulta de texto libre
+
+        Args:
+            query (str): Texto de la consulta
+            top_k (int): Número máximo de resultados
+
+        Returns:
+            list: Tuplas (doc_id, puntaje) ordenadas por relevancia
+        """
+        terms = set(self.tokenize(query or ""))
+        if not terms:
+            return []
+
+        scores = Counter()
+        with self._connect() as conn:
+            total_docs, avg_length = conn.execute("SELECT COUNT(*), AVG(length) FROM documents").fetchone()
+            if not total_docs:
+                return []
+            avg_length = avg_length or 1.0
+
+            for term in terms:
+                postings = conn.execute(
+                    "SELECT p.doc_id, p.tf, d.length FROM postings p "
+                    "JOIN documents d ON d.doc_id = p.doc_id WHERE p.term = ?",
+                    (term,)
+                ).fetchall()
+                if not postings:
+                    continue
+
+                idf = math.log(1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf, length in postings:
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+                    scores[doc_id] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        return scores.most_common(top_k)
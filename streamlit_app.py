@@ -5,13 +5,49 @@ import io
 import json
 from datetime import datetime
 import traceback
+import threading
+import html
+import math
+import numpy as np
 
-# Importar librerías necesarias para Google Drive
-from googleapiclient.discovery import build
-from google.oauth2 import service_account
+# Importar tu clase principal (las librerías de Google Drive y el modelo se cargan al usarse)
+from main import GoogleDriveTopicModelling, DriveServicePool, get_shared_keybert, KEYBERT_MODEL_NAME
+from onnx_embedder import embedding_model_key
+from results_store import ResultsStore
+from keyword_index import KeywordIndex, KEYWORD_COLUMNS
+from vector_index import VectorIndex
+from metrics import load_report
+from processing_job import ProcessingJob, ESTADO_EN_CURSO, ESTADO_COMPLETADO, ESTADO_CANCELADO, ESTADO_ERROR
 
-# Importar tu clase principal
-from main import GoogleDriveTopicModelling
+# Hilos para procesar grupos en paralelo (cada hilo usa su propio cliente de Drive)
+MAX_WORKERS = 8
+
+# Cálculo de los embeddings de KeyBERT: 'pytorch', 'onnx' u 'onnx-int8' (ONNX Runtime
+# con pesos int8, el más rápido y liviano en CPU; requiere onnxruntime)
+EMBEDDING_BACKEND = "pytorch"
+
+# Snapshot de resultados compartido por todas las sesiones
+RESULTS_STORE_PATH = "resultados.sqlite"
+
+# Carpeta padre que contiene los diplomados
+PARENT_FOLDER_ID = "1-_W-Esk4lzkztPSeZpqO4Gq3ao1P9XKo"
+
+# Cada cuántos segundos se refresca el avance de un procesamiento en curso
+JOB_POLL_SECONDS = 2
+
+# Carpeta con las métricas por etapa de la última ejecución
+METRICS_DIR = "metricas"
+
+# Resultados de la búsqueda de texto libre
+TEXT_SEARCH_TOP_K = 50
+
+# Opciones de paginación y orden de los resultados
+PAGE_SIZES = [10, 20, 50, 100]
+SORT_OPTIONS = {
+    "Relevancia": None,
+    "Título (A-Z)": 'Título del proyecto',
+    "Diplomado": 'Diplomado',
+}
 
 # Configuración de la página
 st.set_page_config(
@@ -85,117 +121,301 @@ def initialize_session_state():
         st.session_state.processing_complete = False
     if 'result_df' not in st.session_state:
         st.session_state.result_df = pd.DataFrame()
-    if 'topic_model' not in st.session_state:
-        st.session_state.topic_model = None
     if 'all_keywords' not in st.session_state:
         st.session_state.all_keywords = []
+    if 'results_stamp' not in st.session_state:
+        st.session_state.results_stamp = None
+    if 'keyword_index' not in st.session_state:
+        st.session_state.keyword_index = None
+    if 'sort_ranks' not in st.session_state:
+        st.session_state.sort_ranks = {}
+
+@st.cache_resource(max_entries=2)
+def load_results_snapshot(stamp):
+    """Carga una vez por proceso el snapshot de resultados identificado por stamp"""
+    return ResultsStore(RESULTS_STORE_PATH).load()
+
+@st.cache_resource(max_entries=2)
+def load_keyword_index(stamp):
+    """Índice invertido de keywords del snapshot, construido una vez por proceso"""
+    snapshot = load_results_snapshot(stamp)
+    if snapshot is None:
+        return None
+    return KeywordIndex(snapshot.df)
+
+def compute_sort_ranks(result_df):
+    """Rango de cada fila según cada columna de orden, para ordenar resultados sin materializarlos"""
+    return {
+        column: result_df[column].fillna('').astype(str).str.casefold().rank(method='first').to_numpy()
+        for column in SORT_OPTIONS.values()
+        if column is not None and column in result_df.columns
+    }
+
+@st.cache_resource(max_entries=2)
+def load_sort_ranks(stamp):
+    """Rangos de orden del snapshot, calculados una vez por proceso"""
+    snapshot = load_results_snapshot(stamp)
+    if snapshot is None:
+        return {}
+    return compute_sort_ranks(snapshot.df)
+
+def set_session_results(result_df, keyword_index, sort_ranks):
+    """Deja los resultados, su índice de keywords y sus rangos de orden en la sesión"""
+    st.session_state.result_df = result_df
+    st.session_state.keyword_index = keyword_index
+    st.session_state.sort_ranks = sort_ranks
+    st.session_state.all_keywords = keyword_index.keywords
+    st.session_state.processing_complete = True
+
+def sync_results_from_store():
+    """Muestra en la sesión el último snapshot guardado, si cambió desde la última vez"""
+    stamp = ResultsStore(RESULTS_STORE_PATH).stamp()
+    if stamp is None or stamp == st.session_state.results_stamp:
+        return
+    
+    snapshot = load_results_snapshot(stamp)
+    if snapshot is None or snapshot.df.empty:
+        return
+    
+    set_session_results(snapshot.df, load_keyword_index(stamp), load_sort_ranks(stamp))
+    st.session_state.results_stamp = stamp
+
+@st.cache_resource(show_spinner="Cargando modelo de palabras clave...")
+def get_keyword_model():
+    """Modelo KeyBERT cargado una sola vez y compartido por todas las sesiones"""
+    return get_shared_keybert(backend=EMBEDDING_BACKEND)
 
-def authenticate_drive():
-    """Función para autenticar con Google Drive usando secrets de Streamlit"""
+@st.cache_resource
+def get_drive_pool():
+    """Pool de clientes de Google Drive compartido por todas las sesiones (secrets de Streamlit)"""
+    credentials_info = st.secrets["google_credentials"]
+    credentials_dict = {}
+    for key, value in credentials_info.items():
+        if key == "private_key":
+            credentials_dict[key] = value.replace('\\n', '\n')
+        else:
+            credentials_dict[key] = value
+    
+    from google.oauth2 import service_account
+    
+    credentials = service_account.Credentials.from_service_account_info(
+        credentials_dict, 
+        scopes=['https://www.googleapis.com/auth/drive']
+    )
+    return DriveServicePool(credentials, size=MAX_WORKERS)
+
+@st.cache_resource
+def get_job_holder():
+    """Trabajo de procesamiento del proceso: uno a la vez, visible para todas las sesiones"""
+    return {'job': None, 'lock': threading.Lock()}
+
+def current_job():
+    """Devuelve el último trabajo de procesamiento lanzado (o None)"""
+    return get_job_holder()['job']
+
+def start_processing():
+    """Lanza el procesamiento de los diplomados en segundo plano"""
     try:
-        if st.session_state.topic_model is None:
-            st.session_state.topic_model = GoogleDriveTopicModelling(language='spanish')
-        
         if "google_credentials" not in st.secrets:
             st.error("❌ No se encontraron credenciales de Google en los secrets de Streamlit")
             return False
         
-        credentials_info = st.secrets["google_credentials"]
-        credentials_dict = {}
-        for key, value in credentials_info.items():
-            if key == "private_key":
-                credentials_dict[key] = value.replace('\\n', '\n')
-            else:
-                credentials_dict[key] = value
-        
-        credentials = service_account.Credentials.from_service_account_info(
-            credentials_dict, 
-            scopes=st.session_state.topic_model.SCOPES
-        )
+        holder = get_job_holder()
+        with holder['lock']:
+            if holder['job'] is not None and holder['job'].is_running():
+                st.warning("⏳ Ya hay un procesamiento en curso")
+                return False
+            
+            # Instancia propia del trabajo: los clientes de Drive y el modelo (que se carga
+            # en el hilo del trabajo la primera vez) son del proceso y se comparten
+            # El pipeline por etapas informa el avance documento por documento
+            topic_model = GoogleDriveTopicModelling(language='spanish', max_workers=MAX_WORKERS, use_pipeline=True,
+                                                    embedding_backend=EMBEDDING_BACKEND)
+            topic_model.use_drive_pool(get_drive_pool())
+            
+            job = ProcessingJob(topic_model, PARENT_FOLDER_ID, ResultsStore(RESULTS_STORE_PATH), top_keywords=5)
+            job.start()
+            holder['job'] = job
         
-        st.session_state.topic_model.service = build('drive', 'v3', credentials=credentials)
         return True
         
     except Exception as e:
-        st.error(f"❌ Error de autenticación: {str(e)}")
+        st.error(f"❌ Error al iniciar el procesamiento: {str(e)}")
         return False
 
-def process_diplomados():
-    """Función principal para procesar los diplomados"""
-    try:
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        status_text.text("🔐 Autenticando con Google Drive...")
-        progress_bar.progress(20)
-        
-        if not authenticate_drive():
-            st.error("❌ Error en la autenticación")
-            return False
-        
-        status_text.text("📁 Buscando diplomados...")
-        progress_bar.progress(40)
-        
-        parent_folder_id = "1-_W-Esk4lzkztPSeZpqO4Gq3ao1P9XKo"
+def format_duration(seconds):
+    """Formatea una duración en segundos como '1h 02m', '3m 05s' o '12s'"""
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
+
+def show_run_metrics():
+    """Muestra en el panel lateral el desglose por etapa de la última ejecución"""
+    report = load_report(METRICS_DIR)
+    if not report or not report.get('etapas'):
+        return
+    
+    with st.expander("📊 Última ejecución por etapa"):
+        st.caption(f"{report['inicio']} · {format_duration(report['duracion'])}")
+        rows = [
+            {
+                'Etapa': name,
+                'Llamadas': stage['llamadas'],
+                'Errores': stage['errores'],
+                'Tiempo (s)': stage['segundos'],
+                'p50 (s)': stage['latencia']['p50'],
+                'p95 (s)': stage['latencia']['p95'],
+                'Elem./s': stage['elementos_por_segundo'],
+                'MB': round(stage['bytes'] / 1e6, 2),
+            }
+            for name, stage in report['etapas'].items()
+        ]
+        st.dataframe(pd.DataFrame(rows).set_index('Etapa'), use_container_width=True)
+
+def show_job_progress(job):
+    """Muestra en el panel lateral el avance del procesamiento en segundo plano"""
+    progress = job.progress()
+    
+    if progress['estado'] == ESTADO_EN_CURSO:
+        st.subheader("⚙️ Procesando documentos")
+        total = progress['grupos_total']
+        done = progress['grupos_terminados']
+        if total:
+            st.progress(min(done / total, 1.0), text=f"{done} de {total} grupos")
+        else:
+            st.progress(0, text="📁 Buscando diplomados...")
         
-        status_text.text("⚙️ Procesando documentos...")
-        progress_bar.progress(70)
+        col1, col2 = st.columns(2)
+        col1.metric("Diplomados", progress['diplomados'])
+        col2.metric("Fallidos", progress['conteos'].get('fallido', 0))
+        col1.metric("Procesados", progress['conteos'].get('procesado', 0))
+        col2.metric("Sin cambios", progress['conteos'].get('sin_cambios', 0))
         
-        result_df = st.session_state.topic_model.process_all_diplomados(
-            parent_folder_id, 
-            top_keywords=5
-        )
+        eta = f" · faltan ~{format_duration(progress['eta'])}" if progress['eta'] is not None else ""
+        st.caption(f"{progress['documentos_por_segundo']:.1f} documentos/s · {format_duration(progress['transcurrido'])}{eta}")
         
-        if not result_df.empty:
-            st.session_state.result_df = result_df
-            st.session_state.processing_complete = True
-            
-            # Extraer todas las keywords únicas
-            all_keywords = set()
-            for i in range(1, 6):  # keyword 1 a keyword 5
-                col_name = f'keyword {i}'
-                if col_name in result_df.columns:
-                    keywords = result_df[col_name].dropna()
-                    keywords = keywords[keywords != '']
-                    all_keywords.update(keywords.tolist())
-            
-            st.session_state.all_keywords = sorted(list(all_keywords))
-            
-            status_text.text("✅ Procesamiento completado!")
-            progress_bar.progress(100)
-            
-            return True
-        else:
-            st.error("⚠️ No se encontraron documentos para procesar")
-            return False
-            
-    except Exception as e:
-        st.error(f"❌ Error durante el procesamiento: {str(e)}")
-        return False
+        if progress['cancelando']:
+            st.info("⏹️ Cancelando...")
+        elif st.button("⏹️ Cancelar procesamiento", use_container_width=True):
+            job.cancel()
+            st.rerun(scope="fragment")
+    elif progress['estado'] == ESTADO_COMPLETADO:
+        st.caption(f"✅ Último procesamiento: {progress['proyectos']} proyectos en {format_duration(progress['transcurrido'])}")
+    elif progress['estado'] == ESTADO_CANCELADO:
+        st.caption("⏹️ El último procesamiento se canceló; se siguen mostrando los resultados anteriores")
+    elif progress['estado'] == ESTADO_ERROR:
+        st.error(f"❌ Error durante el procesamiento: {progress['error']}")
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def job_progress_panel(job):
+    """Refresca solo el avance de un procesamiento en curso, sin volver a ejecutar la página"""
+    show_job_progress(job)
+    
+    # Al terminar, ejecutar la página completa para tomar el snapshot nuevo
+    if not job.is_running():
+        st.rerun()
+
+@st.cache_resource
+def get_search_model():
+    """Instancia liviana y compartida para las consultas: tokeniza como en la indexación
+    y embebe con el modelo compartido del proceso"""
+    return GoogleDriveTopicModelling(language='spanish', embedding_backend=EMBEDDING_BACKEND)
+
+@st.cache_resource
+def get_search_index():
+    """Índice BM25 de títulos y resúmenes, abierto una vez por proceso"""
+    return get_search_model().get_search_index()
+
+@st.cache_resource(max_entries=2)
+def load_vector_index(stamp):
+    """Índice semántico identificado por stamp, cargado una vez por proceso"""
+    search_model = get_search_model()
+    return VectorIndex(search_model.vector_index_path, embedding_model_key(KEYBERT_MODEL_NAME, EMBEDDING_BACKEND),
+                       dtype=search_model.vector_dtype, ann_threshold=search_model.ann_threshold)
+
+def semantic_hits(query, top_k):
+    """Proyectos más cercanos a la consulta según los embeddings de sus resúmenes"""
+    try:
+        stat = os.stat(get_search_model().vector_index_path)
+    except OSError:
+        return []
+    
+    vector_index = load_vector_index((stat.st_ino, stat.st_mtime_ns, stat.st_size))
+    if not len(vector_index):
+        return []
+    
+    # La consulta se embebe una sola vez; los documentos ya están en el índice
+    get_keyword_model()
+    query_vector = get_search_model().embed_query(query)
+    return vector_index.search(query_vector, top_k=top_k)
+
+def search_text_projects(query, selected_keywords=None, mode='or', semantic=False):
+    """Busca proyectos por texto libre (BM25 o semántica) y opcionalmente los filtra por
+    las keywords seleccionadas. Devuelve las posiciones de las filas, por relevancia"""
+    result_df = st.session_state.result_df
+    if result_df.empty or not query.strip():
+        return np.array([], dtype=np.int64)
+    
+    if semantic:
+        hits = semantic_hits(query, TEXT_SEARCH_TOP_K)
+    else:
+        hits = get_search_index().search(query, top_k=TEXT_SEARCH_TOP_K)
+    
+    # Los documentos del índice que no están en el snapshot quedan en -1
+    positions = result_df.index.get_indexer([file_id for file_id, _ in hits])
+    positions = positions[positions >= 0]
+    
+    if selected_keywords:
+        positions = positions[np.isin(positions, search_projects(selected_keywords, mode))]
+    
+    return positions
 
-def search_projects(selected_keywords):
-    """Busca proyectos que contengan las keywords seleccionadas"""
-    if st.session_state.result_df.empty:
-        return pd.DataFrame()
+def search_projects(selected_keywords, mode='or'):
+    """Busca proyectos que contengan alguna ('or') o todas ('and') las keywords seleccionadas.
+    Devuelve las posiciones de las filas, en el orden de los resultados"""
+    if st.session_state.result_df.empty or st.session_state.keyword_index is None:
+        return np.array([], dtype=np.int64)
     
     if not selected_keywords:
-        return pd.DataFrame()
+        return np.array([], dtype=np.int64)
     
-    # Filtrar proyectos que contengan alguna de las keywords seleccionadas
-    mask = pd.Series([False] * len(st.session_state.result_df))
+    return np.array(st.session_state.keyword_index.match(selected_keywords, mode), dtype=np.int64)
+
+def sort_positions(positions, sort_column):
+    """Ordena las posiciones de los resultados según una columna (None = relevancia)"""
+    ranks = st.session_state.sort_ranks.get(sort_column)
+    if ranks is None or not len(positions):
+        return positions
+    return positions[np.argsort(ranks[positions], kind='stable')]
+
+def render_results_page(page_df):
+    """Genera en un solo bloque HTML las tarjetas de los proyectos de una página"""
+    keyword_columns = [col for col in KEYWORD_COLUMNS if col in page_df.columns]
+    titles = page_df.get('Título del proyecto', pd.Series('Sin título', index=page_df.index)).tolist()
+    links = page_df.get('Enlace de descarga', pd.Series('#', index=page_df.index)).tolist()
+    keywords = page_df[keyword_columns].values.tolist()
     
-    for i in range(1, 6):  # keyword 1 a keyword 5
-        col_name = f'keyword {i}'
-        if col_name in st.session_state.result_df.columns:
-            mask = mask | st.session_state.result_df[col_name].isin(selected_keywords)
+    items = []
+    for title, link, project_keywords in zip(titles, links, keywords):
+        project_keywords = [keyword for keyword in project_keywords if isinstance(keyword, str) and keyword.strip()]
+        items.append(f"""
+        <div class="result-item">
+            <div class="project-title">📋<strong style='color:#001d57;'> Título del proyecto: </strong> {html.escape(str(title))} </div>
+            <div class="project-keywords">🔑<strong style='color:#001d57;'> Palabras clave:</strong> {html.escape(', '.join(project_keywords))}</div>
+            <div class="project-link">🔗 <strong style='color:#001d57;'>Proyecto / documento: </strong><a href="{html.escape(str(link), quote=True)}" target="_blank">Enlace de descarga</a></div>
+        </div>
+        """)
     
-    filtered_df = st.session_state.result_df[mask]
-    return filtered_df
+    st.markdown("".join(items), unsafe_allow_html=True)
 
 def main():
     """Función principal de la aplicación Streamlit"""
     
     initialize_session_state()
+    sync_results_from_store()
     
     # Header verde simple
     st.markdown("""
@@ -210,21 +430,33 @@ def main():
      
         st.header("⚙️ Configuración")
         
+        job = current_job()
+        job_running = job is not None and job.is_running()
+        if job_running:
+            job_progress_panel(job)
+        elif job is not None:
+            show_job_progress(job)
+        if not job_running:
+            show_run_metrics()
+        
         if not st.session_state.processing_complete:
             st.info("📋 Primero procesa los documentos")
-            if st.button("🔄 Actualizar Base de Datos", use_container_width=True):
-                with st.spinner("Procesando documentos..."):
-                    process_diplomados()
-                    st.rerun()
+            if not job_running and st.button("🔄 Actualizar Base de Datos", use_container_width=True):
+                start_processing()
+                st.rerun()
         else:
             st.success("✅ Base de datos actualizada")
             st.metric("Proyectos encontrados", len(st.session_state.result_df))
             st.metric("Keywords disponibles", len(st.session_state.all_keywords))
             
-            if st.button("🔄 Reprocesar Documentos", use_container_width=True):
-                st.session_state.processing_complete = False
-                st.session_state.result_df = pd.DataFrame()
-                st.session_state.all_keywords = []
+            if st.session_state.results_stamp is not None:
+                snapshot = load_results_snapshot(st.session_state.results_stamp)
+                if snapshot is not None and snapshot.created_at:
+                    st.caption(f"Última actualización: {snapshot.created_at}")
+            
+            # Mientras se reprocesa se sigue mostrando (y buscando en) el snapshot anterior
+            if not job_running and st.button("🔄 Reprocesar Documentos", use_container_width=True):
+                start_processing()
                 st.rerun()
     
     # Contenido principal
@@ -235,6 +467,16 @@ def main():
         st.markdown('<div class="filters-section">', unsafe_allow_html=True)
         st.markdown('<h2 class="filters-title">🔍 Filtros</h2>', unsafe_allow_html=True)
         
+        # Búsqueda de texto libre en títulos y resúmenes
+        text_query = st.text_input(
+            "Buscar en títulos y resúmenes",
+            placeholder="Escribe un tema, por ejemplo: lectura comprensiva en primaria"
+        )
+        semantic_search = st.toggle(
+            "Buscar por significado",
+            help="Compara el sentido de la búsqueda con el de cada resumen, aunque no compartan palabras"
+        )
+        
         st.text("Seleccione todos los temas que desea buscar")
         
         # Multiselect para keywords
@@ -245,41 +487,55 @@ def main():
             label_visibility="collapsed"
         )
         
+        # Combinar las keywords: proyectos con alguna o con todas
+        match_mode = st.radio(
+            "Coincidencia",
+            options=['or', 'and'],
+            format_func=lambda mode: "Alguna de las palabras clave" if mode == 'or' else "Todas las palabras clave",
+            horizontal=True
+        )
+        
         # Botón de búsqueda
         search_clicked = st.button("Buscar Proyectos", type="primary")
         
         st.markdown('</div>', unsafe_allow_html=True)
         
         # Mostrar resultados
-        if search_clicked or selected_keywords:
-            filtered_projects = search_projects(selected_keywords)
+        if search_clicked or selected_keywords or text_query.strip():
+            # Solo posiciones de filas: el total se cuenta sin materializar los proyectos
+            if text_query.strip():
+                positions = search_text_projects(text_query, selected_keywords, match_mode, semantic_search)
+            else:
+                positions = search_projects(selected_keywords, match_mode)
             
-            if not filtered_projects.empty:
+            if len(positions):
+                total = len(positions)
                 st.markdown("### Proyectos encontrados:")
                 
-                for _, project in filtered_projects.iterrows():
-                    # Obtener keywords del proyecto
-                    project_keywords = []
-                    for i in range(1, 6):
-                        col_name = f'keyword {i}'
-                        if col_name in project.index and project[col_name] and project[col_name].strip():
-                            project_keywords.append(project[col_name])
-                    
-                    # Crear el item de resultado
-                    st.markdown(f"""
-                    <div class="result-item">
-                        <div class="project-title">📋<strong style='color:#001d57;'> Título del proyecto: </strong> {project.get('Título del proyecto', 'Sin título')} </div>
-                        <div class="project-keywords">🔑<strong style='color:#001d57;'> Palabras clave:</strong> {', '.join(project_keywords)}</div>
-                        <div class="project-link">🔗 <strong style='color:#001d57;'>Proyecto / documento: </strong><a href="{project.get('Enlace de descarga', '#')}" target="_blank">Enlace de descarga</a></div>
-                    </div>
-                    """, unsafe_allow_html=True)
+                col_sort, col_size, col_page = st.columns([2, 1, 1])
+                with col_sort:
+                    sort_label = st.selectbox("Ordenar por", options=list(SORT_OPTIONS))
+                with col_size:
+                    page_size = st.selectbox("Por página", options=PAGE_SIZES, index=1)
+                n_pages = max(1, math.ceil(total / page_size))
+                with col_page:
+                    page = st.number_input("Página", min_value=1, max_value=n_pages, value=1, step=1)
+                
+                # Ordenar, cortar la página y recién ahí leer sus filas
+                positions = sort_positions(positions, SORT_OPTIONS[sort_label])
+                start = (int(page) - 1) * page_size
+                page_positions = positions[start:start + page_size]
+                render_results_page(st.session_state.result_df.iloc[page_positions])
                 
-                st.success(f"Se encontraron {len(filtered_projects)} proyectos")
+                st.caption(f"Página {int(page)} de {n_pages}")
+                st.success(f"Se encontraron {total} proyectos")
             else:
-                if selected_keywords:
+                if text_query.strip():
+                    st.warning("No se encontraron proyectos para la búsqueda")
+                elif selected_keywords:
                     st.warning("No se encontraron proyectos con las palabras clave seleccionadas")
         else:
-            st.info("Selecciona palabras clave y haz clic en 'Buscar Proyectos' para ver los resultados")
+            st.info("Escribe un tema o selecciona palabras clave y haz clic en 'Buscar Proyectos' para ver los resultados")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,187 @@
+import io
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+from fake_drive import FakeDriveService, DOCX_MIME_TYPE
+
+# Vocabulario de los textos generados (proyectos pedagógicos de los diplomados)
+TEMAS = [
+    "lectura", "escritura", "matemáticas", "convivencia escolar", "educación ambiental",
+    "pensamiento crítico", "inclusión", "tecnologías digitales", "ciencias naturales",
+    "educación física", "arte", "historia local", "oralidad", "resolución de problemas",
+    "huerto escolar", "ciudadanía", "interculturalidad", "salud emocional",
+]
+SUJETOS = [
+    "los estudiantes", "las y los docentes", "las familias", "la comunidad educativa",
+    "el colectivo docente", "los alumnos de primaria", "los jóvenes de secundaria",
+]
+VERBOS = [
+    "fortalecer", "desarrollar", "promover", "mejorar", "sistematizar", "analizar",
+    "diseñar", "implementar", "evaluar", "acompañar",
+]
+COMPLEMENTOS = [
+    "mediante estrategias de aprendizaje colaborativo",
+    "a partir de proyectos comunitarios",
+    "con secuencias didácticas contextualizadas",
+    "desde un enfoque de evaluación formativa",
+    "a través de la investigación acción",
+    "con el uso de recursos digitales",
+    "en articulación con el plan de estudios",
+    "mediante la reflexión sobre la práctica docente",
+]
+SECCIONES = [
+    "2. Planteamiento del problema", "3. Justificación", "4. Objetivos",
+    "5. Marco teórico", "6. Metodología", "7. Resultados", "8. Conclusiones",
+]
+
+WORD_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+
+CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+
+PACKAGE_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+
+def _paragraph(text):
+    return f'<w:p><w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>'
+
+
+def _table(rows):
+    xml_rows = []
+    for row in rows:
+        cells = ''.join(f'<w:tc>{_paragraph(cell)}</w:tc>' for cell in row)
+        xml_rows.append(f'<w:tr>{cells}</w:tr>')
+    return f'<w:tbl>{"".join(xml_rows)}</w:tbl>'
+
+
+def generar_oracion(rng):
+    """
+    Genera una oración sobre un proyecto pedagógico
+    """
+    return (f"El proyecto busca {rng.choice(VERBOS)} {rng.choice(TEMAS)} con {rng.choice(SUJETOS)} "
+            f"{rng.choice(COMPLEMENTOS)}.")
+
+
+def generar_titulo(rng):
+    """
+    Genera el título de un proyecto
+    """
+    return (f"{rng.choice(VERBOS).capitalize()} {rng.choice(TEMAS)} con {rng.choice(SUJETOS)} "
+            f"{rng.choice(COMPLEMENTOS)}")
+
+
+def generar_docx(titulo, resumen, secciones=6, parrafos_por_seccion=4, seed=None):
+    """
+    Genera un archivo de sistematización .docx con la estructura de los documentos reales:
+    tabla de datos generales con el título, sección "1. Resumen ejecutivo" con el resumen
+    en la primera celda de una tabla y secciones adicionales de texto
+
+    Args:
+        titulo (str): Título del proyecto
+        resumen (str): Texto del resumen ejecutivo
+        secciones (int): Número de secciones después del resumen
+        parrafos_por_seccion (int): Párrafos de texto de cada sección
+        seed (int): Semilla del texto de relleno
+
+    Returns:
+        bytes: Contenido del archivo .docx
+    """
+    rng = random.Random(seed)
+
+    body = [
+        _paragraph("SISTEMATIZACIÓN DE LA EXPERIENCIA"),
+        _table([
+            ["TÍTULO DEL PROYECTO", titulo],
+            ["DOCENTES PARTICIPANTES", ", ".join(f"Docente {rng.randint(1, 500)}" for _ in range(3))],
+            ["NIVEL EDUCATIVO", rng.choice(["Preescolar", "Primaria", "Secundaria"])],
+        ]),
+        _paragraph("1. Resumen ejecutivo"),
+        _table([[resumen]]),
+    ]
+    for section in SECCIONES[:secciones]:
+        body.append(_paragraph(section))
+        for _ in range(parrafos_por_seccion):
+            body.append(_paragraph(" ".join(generar_oracion(rng) for _ in range(rng.randint(3, 6)))))
+
+    document_xml = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<w:document xmlns:w="{WORD_NS}"><w:body>{"".join(body)}<w:sectPr/></w:body></w:document>'
+    )
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('[Content_Types].xml', CONTENT_TYPES_XML)
+        zf.writestr('_rels/.rels', PACKAGE_RELS_XML)
+        zf.writestr('word/document.xml', document_xml)
+    return buffer.getvalue()
+
+
+def generar_corpus(n_grupos, grupos_por_diplomado=25, prob_sin_archivo=0.02, seed=0,
+                   secciones=6, latency=0.0, error_rate=0.0, bandwidth=None):
+    """
+    Construye un FakeDriveService con un árbol sintético de diplomados:
+    "N. DIPLOMADO ..." / "6. EVIDENCIA DE TRABAJOS" / "MÓDULO IV" / "Grupo NN", cada grupo
+    con su archivo de sistematización y algunos archivos que el procesamiento debe ignorar
+
+    Args:
+        n_grupos (int): Número total de carpetas de grupo
+        grupos_por_diplomado (int): Grupos de cada diplomado
+        prob_sin_archivo (float): Probabilidad de que un grupo no tenga sistematización
+        seed (int): Semilla del contenido generado
+        secciones (int): Secciones de texto de cada documento (define su tamaño)
+        latency (float): Latencia simulada por petición, en segundos
+        error_rate (float): Probabilidad de error por petición
+        bandwidth (float): Bytes por segundo de las descargas (None = sin límite)
+
+    Returns:
+        tuple: (FakeDriveService, ID de la carpeta padre de los diplomados)
+    """
+    rng = random.Random(seed)
+    service = FakeDriveService(latency=latency, error_rate=error_rate, seed=seed, bandwidth=bandwidth)
+
+    parent_id = service.add_folder("DIPLOMADOS (sintético)")
+    # Carpetas del padre que no son diplomados
+    service.add_folder("Formatos y plantillas", parent_id)
+
+    n_diplomados = max(1, -(-n_grupos // grupos_por_diplomado))
+    grupo = 0
+    for d in range(n_diplomados):
+        diplomado_id = service.add_folder(f"{d}. DIPLOMADO EN {rng.choice(TEMAS).upper()} {d}", parent_id)
+        for name in ["1. PROGRAMA", "2. LISTAS", "6. EVIDENCIA DE TRABAJOS"]:
+            folder_id = service.add_folder(name, diplomado_id)
+            if 'EVIDENCIA' in name:
+                evidencia_id = folder_id
+
+        for modulo in ["MÓDULO I", "MÓDULO II", "MÓDULO III", "MÓDULO IV"]:
+            modulo_id = service.add_folder(modulo, evidencia_id)
+
+        for _ in range(min(grupos_por_diplomado, n_grupos - grupo)):
+            grupo += 1
+            grupo_id = service.add_folder(f"Grupo {grupo:02d}", modulo_id)
+
+            service.add_file(f"Lista de asistencia grupo {grupo}.pdf", grupo_id, b"%PDF-1.4", mime_type='application/pdf')
+            service.add_file("Anexo fotográfico.docx", grupo_id, generar_docx("Anexo", "Fotografías de las sesiones", secciones=0))
+            if rng.random() < prob_sin_archivo:
+                continue
+
+            titulo = generar_titulo(rng)
+            resumen = " ".join(generar_oracion(rng) for _ in range(rng.randint(4, 8)))
+            content = generar_docx(titulo, resumen, secciones=secciones, seed=rng.random())
+            service.add_file(f"SISTEMATIZACION GRUPO {grupo:02d}.docx", grupo_id, content, mime_type=DOCX_MIME_TYPE)
+
+    return service, parent_id
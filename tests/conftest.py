@@ -0,0 +1,106 @@
+import zlib
+
+import numpy as np
+import pytest
+
+from fake_drive import FakeDrivePool
+from main import GoogleDriveTopicModelling
+from synthetic_corpus import generar_corpus
+
+# Stopwords fijas, así las pruebas no dependen de los datos de NLTK
+STOP_WORDS = {
+    'a', 'al', 'con', 'de', 'del', 'desde', 'el', 'en', 'la', 'las', 'los', 'mediante',
+    'para', 'por', 'que', 'se', 'su', 'un', 'una', 'y',
+}
+
+# Dimensión de los embeddings de FakeEmbedder
+EMBEDDING_DIM = 16
+
+
+class FakeEmbedder:
+    """
+    Embeddings deterministas: suma de un vector pseudoaleatorio por palabra, normalizada
+    """
+
+    def embed(self, documents, verbose=False):
+        vectors = []
+        for document in documents:
+            vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+            for word in document.lower().split():
+                rng = np.random.default_rng(zlib.crc32(word.encode('utf-8')))
+                vector += rng.standard_normal(EMBEDDING_DIM).astype(np.float32)
+            vectors.append(vector / max(np.linalg.norm(vector), 1e-12))
+        return np.vstack(vectors)
+
+
+class FakeKeyBERT:
+    """
+    Sustituto determinista de KeyBERT con la interfaz que usa GoogleDriveTopicModelling:
+    las keywords de un documento son sus candidatos (los n-gramas del vectorizador) más
+    frecuentes. Cuenta los lotes que recibe
+    """
+
+    def __init__(self):
+        self.model = FakeEmbedder()
+        self.batches = []
+
+    def extract_embeddings(self, docs, vectorizer=None):
+        self.batches.append(len(docs))
+        return None, None
+
+    def extract_keywords(self, docs, vectorizer=None, top_n=5, **kwargs):
+        analyzer = vectorizer.build_analyzer()
+        keywords = []
+        for doc in docs:
+            candidates = analyzer(doc)
+            counts = {}
+            for candidate in candidates:
+                counts[candidate] = counts.get(candidate, 0) + 1
+            ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:top_n]
+            keywords.append([(candidate, round(count / len(candidates), 4)) for candidate, count in ranked])
+        # Como KeyBERT: con un solo documento devuelve la lista de ese documento
+        return keywords[0] if len(docs) == 1 else keywords
+
+
+@pytest.fixture
+def corpus():
+    """
+    Árbol sintético de 3 diplomados con 30 grupos en un FakeDriveService
+
+    Returns:
+        tuple: (FakeDriveService, ID de la carpeta padre)
+    """
+    return generar_corpus(30, grupos_por_diplomado=10, prob_sin_archivo=0.1, seed=7, secciones=2)
+
+
+@pytest.fixture
+def make_topic_model(tmp_path):
+    """
+    Fábrica de GoogleDriveTopicModelling conectados a un FakeDriveService, con el
+    manifiesto en tmp_path y los demás índices y cachés desactivados salvo que se pidan
+    """
+    def make(service, **kwargs):
+        options = {
+            'manifest_path': str(tmp_path / 'manifest.json'),
+            'max_workers': 4,
+            'embedding_cache_dir': None,
+            'search_index_path': None,
+            'vector_index_path': None,
+            'metrics_dir': None,
+            'blob_cache_dir': None,
+            'keybert_model': FakeKeyBERT(),
+        }
+        options.update(kwargs)
+        topic_model = GoogleDriveTopicModelling(**options)
+        topic_model._stop_words = set(STOP_WORDS)
+        topic_model.use_drive_pool(FakeDrivePool(service))
+        return topic_model
+
+    return make
+
+
+def sistematizaciones(service):
+    """
+    IDs de los archivos de sistematización del FakeDriveService, en orden de creación
+    """
+    return [file_id for file_id, metadata in service._files.items() if metadata['name'].startswith('SISTEMATIZACION')]
@@ -0,0 +1,125 @@
+import io
+import zipfile
+from xml.sax.saxutils import escape
+
+import pytest
+
+from docx_extractor import extraer_datos_python_docx, extraer_datos_stream
+from synthetic_corpus import CONTENT_TYPES_XML, PACKAGE_RELS_XML, WORD_NS, generar_docx
+
+TITULO = "Huerto escolar para aprender ciencias naturales"
+RESUMEN = ("El proyecto busca fortalecer la educación ambiental con los estudiantes de primaria "
+           "mediante un huerto escolar cuidado por la comunidad educativa.")
+
+
+def p(text):
+    return f'<w:p><w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>'
+
+
+def tc(text, span=None, vmerge=None, paragraphs=None):
+    props = ''
+    if span:
+        props += f'<w:gridSpan w:val="{span}"/>'
+    if vmerge:
+        props += '<w:vMerge w:val="restart"/>' if vmerge == 'restart' else '<w:vMerge/>'
+    content = paragraphs if paragraphs is not None else p(text)
+    return f'<w:tc>{f"<w:tcPr>{props}</w:tcPr>" if props else ""}{content}</w:tc>'
+
+
+def tr(*cells, grid_before=None):
+    props = f'<w:trPr><w:gridBefore w:val="{grid_before}"/></w:trPr>' if grid_before else ''
+    return f'<w:tr>{props}{"".join(cells)}</w:tr>'
+
+
+def tbl(*rows, cols=3):
+    grid = ''.join('<w:gridCol w:w="2000"/>' for _ in range(cols))
+    return f'<w:tbl><w:tblGrid>{grid}</w:tblGrid>{"".join(rows)}</w:tbl>'
+
+
+def docx_bytes(*body):
+    document_xml = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<w:document xmlns:w="{WORD_NS}"><w:body>{"".join(body)}<w:sectPr/></w:body></w:document>'
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('[Content_Types].xml', CONTENT_TYPES_XML)
+        zf.writestr('_rels/.rels', PACKAGE_RELS_XML)
+        zf.writestr('word/document.xml', document_xml)
+    return buffer.getvalue()
+
+
+SECCIONES = [p("2. Planteamiento del problema"), p("La escuela no tiene espacios verdes para la clase de ciencias.")]
+
+DOCUMENTS = {
+    'sintetico sin secciones': generar_docx(TITULO, RESUMEN, secciones=0, seed=1),
+    'sintetico con secciones': generar_docx(TITULO, RESUMEN, secciones=3, seed=2),
+    'sintetico completo': generar_docx("Círculos de lectura con las familias", RESUMEN * 3, secciones=7, seed=3),
+    'etiqueta combinada horizontalmente': docx_bytes(
+        tbl(tr(tc("TÍTULO DEL PROYECTO", span=2), tc(TITULO))),
+        p("1. Resumen ejecutivo"), tbl(tr(tc(RESUMEN)), cols=1), *SECCIONES,
+    ),
+    'titulo combinado horizontalmente': docx_bytes(
+        tbl(tr(tc("TÍTULO:"), tc(TITULO, span=2)), tr(tc("NIVEL"), tc("Primaria"), tc("")),),
+        p("1. Resumen ejecutivo"), tbl(tr(tc(RESUMEN)), cols=1), *SECCIONES,
+    ),
+    'titulo combinado verticalmente': docx_bytes(
+        tbl(
+            tr(tc("DOCENTES"), tc("Docente 1", vmerge='restart'), tc("")),
+            tr(tc("TÍTULO:"), tc("", vmerge='continue'), tc("Sin título")),
+        ),
+        p("1. Resumen ejecutivo"), tbl(tr(tc(RESUMEN)), cols=1), *SECCIONES,
+    ),
+    'resumen combinado verticalmente': docx_bytes(
+        tbl(tr(tc("TÍTULO"), tc(TITULO), tc(""))),
+        p("1. Resumen ejecutivo"),
+        tbl(tr(tc("Texto corto", vmerge='restart'), tc("a")), tr(tc("", vmerge='continue'), tc(RESUMEN)), cols=2),
+        *SECCIONES,
+    ),
+    'fila con celdas omitidas al inicio': docx_bytes(
+        tbl(tr(tc("TÍTULO"), tc(TITULO), grid_before=1)),
+        p("1. Resumen ejecutivo"), tbl(tr(tc(RESUMEN)), cols=1), *SECCIONES,
+    ),
+    'celda con varios parrafos y tabla anidada': docx_bytes(
+        tbl(tr(tc("TÍTULO"), tc("", paragraphs=p("Huerto escolar") + tbl(tr(tc("anidada"))) + p(TITULO))), cols=2),
+        p("1. Resumen ejecutivo"), tbl(tr(tc(RESUMEN)), cols=1), *SECCIONES,
+    ),
+    'runs con hipervinculo, tabulacion y salto': docx_bytes(
+        '<w:p><w:r><w:t>Título:</w:t><w:tab/></w:r><w:hyperlink><w:r><w:t>Radio escolar</w:t></w:r></w:hyperlink>'
+        '<w:r><w:br/><w:t xml:space="preserve"> comunitaria</w:t></w:r></w:p>',
+        p("1. Resumen ejecutivo"), tbl(tr(tc(RESUMEN)), cols=1), *SECCIONES,
+    ),
+    'sin titulo': docx_bytes(
+        tbl(tr(tc("DOCENTES"), tc("Docente 1"))),
+        p("1. Resumen ejecutivo"), tbl(tr(tc(RESUMEN)), cols=1), *SECCIONES,
+    ),
+    'titulo en un parrafo': docx_bytes(
+        p(f"Título: {TITULO}"), p("1. Resumen ejecutivo"), tbl(tr(tc(RESUMEN)), cols=1), *SECCIONES,
+    ),
+    'sin seccion de resumen': docx_bytes(
+        tbl(tr(tc("TÍTULO"), tc(TITULO))), p("Introducción"), p(RESUMEN), *SECCIONES,
+    ),
+    'resumen en parrafos': docx_bytes(
+        tbl(tr(tc("TÍTULO"), tc(TITULO))), p("1. Resumen ejecutivo"), p(RESUMEN[:60]), p(RESUMEN[60:]), *SECCIONES,
+    ),
+    'resumen vacio': docx_bytes(
+        tbl(tr(tc("TÍTULO"), tc(TITULO))), p("1. Resumen ejecutivo"), tbl(tr(tc("Pendiente")), cols=1), *SECCIONES,
+    ),
+    'documento vacio': docx_bytes(p("")),
+}
+
+
+@pytest.mark.parametrize('name', list(DOCUMENTS))
+def test_stream_reader_matches_python_docx(name):
+    content = DOCUMENTS[name]
+
+    expected = extraer_datos_python_docx(content, name)
+    actual = extraer_datos_stream(content, name)
+
+    assert actual['titulo'] == expected['titulo']
+    assert actual['resumen'] == expected['resumen']
+
+
+def test_stream_reader_stops_early_only_when_everything_was_found():
+    assert extraer_datos_stream(DOCUMENTS['sintetico completo'], 'completo')['texto_completo'] is None
+    assert extraer_datos_stream(DOCUMENTS['sin titulo'], 'sin titulo')['texto_completo'] is not None
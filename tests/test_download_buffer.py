@@ -0,0 +1,115 @@
+import os
+import tempfile
+import threading
+
+import pytest
+
+from download_buffer import ByteBudget, DownloadBuffer
+
+
+@pytest.fixture
+def spool_dir(tmp_path, monkeypatch):
+    """
+    Carpeta temporal propia, para comprobar que no quedan archivos de descarga
+    (descarga_*.tmp)
+    """
+    path = tmp_path / 'spool'
+    path.mkdir()
+    monkeypatch.setattr(tempfile, 'tempdir', str(path))
+    return path
+
+
+def test_small_download_stays_in_memory(spool_dir):
+    with DownloadBuffer(spool_threshold=100) as buffer:
+        buffer.write(b'a' * 60)
+        buffer.write(b'b' * 40)
+
+        assert not buffer.on_disk
+        assert len(buffer) == 100
+        assert buffer.reader().read() == b'a' * 60 + b'b' * 40
+        assert buffer.source() == b'a' * 60 + b'b' * 40
+
+    assert not list(spool_dir.glob('descarga_*'))
+
+
+def test_large_download_spills_to_a_temp_file_that_close_removes(spool_dir):
+    buffer = DownloadBuffer(spool_threshold=100)
+    buffer.write(b'a' * 60)
+    buffer.write(b'b' * 60)
+
+    assert buffer.on_disk
+    assert buffer.reader().read() == b'a' * 60 + b'b' * 60
+    path = buffer.source()
+    assert os.path.dirname(path) == str(spool_dir)
+    with open(path, 'rb') as f:
+        assert f.read() == b'a' * 60 + b'b' * 60
+
+    buffer.close()
+
+    assert not os.path.exists(path)
+    assert not list(spool_dir.glob('descarga_*'))
+
+
+def test_close_returns_the_reservation_including_the_in_memory_copy(spool_dir):
+    budget = ByteBudget(1000)
+    budget.acquire(100)
+    buffer = DownloadBuffer(spool_threshold=1000, budget=budget, reserved=100)
+    buffer.write(b'x' * 100)
+
+    buffer.source()
+    assert budget.in_use == 200
+
+    buffer.close()
+    buffer.close()
+    assert budget.in_use == 0
+
+
+def test_reservations_wait_for_room_unless_nothing_is_in_flight():
+    budget = ByteBudget(100)
+    budget.acquire(150)
+    assert budget.in_use == 150
+
+    acquired = threading.Event()
+
+    def reserve():
+        budget.acquire(50)
+        acquired.set()
+
+    thread = threading.Thread(target=reserve)
+    thread.start()
+    assert not acquired.wait(0.1)
+
+    budget.release(150)
+    assert acquired.wait(5)
+    thread.join()
+    assert budget.in_use == 50
+
+    budget.acquire(80, wait=False)
+    assert budget.in_use == 130
+
+
+@pytest.mark.parametrize('use_pipeline', [False, True])
+@pytest.mark.parametrize('spool_threshold', [1024, 8 * 1024 ** 2])
+def test_a_run_returns_the_budget_to_zero_and_leaves_no_temp_files(corpus, make_topic_model, spool_dir,
+                                                                   use_pipeline, spool_threshold):
+    service, parent_id = corpus
+    reference = make_topic_model(service, manifest_path=None).process_all_diplomados(parent_id)
+    peak = []
+
+    topic_model = make_topic_model(
+        service, manifest_path=None, use_pipeline=use_pipeline,
+        spool_threshold=spool_threshold, max_inflight_bytes=16 * 1024
+    )
+    budget = topic_model.download_budget
+    acquire = budget.acquire
+
+    def tracked_acquire(size, wait=True):
+        acquire(size, wait)
+        peak.append(budget.in_use)
+
+    budget.acquire = tracked_acquire
+    df = topic_model.process_all_diplomados(parent_id)
+
+    assert df.equals(reference)
+    assert peak and budget.in_use == 0
+    assert not list(spool_dir.glob('descarga_*'))
@@ -0,0 +1,168 @@
+import json
+import ssl
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+from conftest import sistematizaciones
+from drive_scheduler import DriveScheduler, classify_error
+
+
+def _error(status, reason='backendError', retry_after=None):
+    headers = {'status': status}
+    if retry_after is not None:
+        headers['retry-after'] = str(retry_after)
+    content = json.dumps({'error': {'code': status, 'errors': [{'reason': reason}]}}).encode('utf-8')
+    return HttpError(httplib2.Response(headers), content)
+
+
+def _scheduler(**kwargs):
+    options = {'max_concurrency': 8, 'base_delay': 0.001, 'max_delay': 0.01, 'cooldown': 0}
+    options.update(kwargs)
+    return DriveScheduler(**options)
+
+
+class Flaky:
+    """
+    Llamada que falla con los errores indicados y después devuelve 'ok'
+    """
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return 'ok'
+
+
+@pytest.mark.parametrize('error, kind', [
+    (_error(403, 'rateLimitExceeded'), 'limite'),
+    (_error(403, 'userRateLimitExceeded'), 'limite'),
+    (_error(429, 'rateLimitExceeded'), 'limite'),
+    (_error(500), 'servidor'),
+    (_error(503), 'servidor'),
+    (ConnectionError("conexión reiniciada"), 'red'),
+    (TimeoutError("tiempo agotado"), 'red'),
+    (ssl.SSLError("conexión TLS interrumpida"), 'red'),
+    (httplib2.ServerNotFoundError("no se resolvió www.googleapis.com"), 'red'),
+    (OSError(101, "red inalcanzable"), 'red'),
+    (FileNotFoundError("archivo temporal borrado"), None),
+    (_error(403, 'insufficientFilePermissions'), None),
+    (_error(404, 'notFound'), None),
+    (ValueError("otro error"), None),
+])
+def test_classify_error(error, kind):
+    assert classify_error(error) == kind
+
+
+def test_transient_errors_are_retried_until_success():
+    scheduler = _scheduler()
+    func = Flaky(_error(429, 'rateLimitExceeded'), _error(503), ConnectionError("caída"))
+
+    assert scheduler.call(func) == 'ok'
+    assert func.calls == 4
+    assert scheduler.stats()['reintentos'] == 3
+    assert scheduler.stats()['limitadas'] == 2
+    assert scheduler.stats()['agotadas'] == 0
+    assert scheduler.stats()['en_curso'] == 0
+
+
+def test_errors_that_should_not_be_retried_propagate_at_once():
+    scheduler = _scheduler()
+
+    for error in (_error(403, 'insufficientFilePermissions'), ValueError("otro error")):
+        func = Flaky(error)
+        with pytest.raises(type(error)):
+            scheduler.call(func)
+        assert func.calls == 1
+
+    assert scheduler.retries == 0
+
+
+def test_exhausted_retries_raise_and_are_counted():
+    scheduler = _scheduler(max_retries=2)
+    func = Flaky(*[_error(500)] * 5)
+
+    with pytest.raises(HttpError):
+        scheduler.call(func)
+
+    assert func.calls == 3
+    assert scheduler.stats()['reintentos'] == 2
+    assert scheduler.stats()['agotadas'] == 1
+
+
+def test_a_call_can_disable_retries():
+    scheduler = _scheduler(max_retries=6)
+    func = Flaky(ConnectionError("respuesta perdida"))
+
+    with pytest.raises(ConnectionError):
+        scheduler.call(func, max_retries=0)
+
+    assert func.calls == 1
+    assert scheduler.stats()['reintentos'] == 0
+    assert scheduler.call(func) == 'ok'
+
+
+def test_concurrency_halves_on_throttling_and_recovers_with_successes():
+    scheduler = _scheduler(max_concurrency=8, min_concurrency=1)
+
+    scheduler.observe(_error(429, 'rateLimitExceeded'))
+    scheduler.observe(_error(503))
+    assert scheduler.limit == 2
+
+    # Un lugar más por cada ventana completa de éxitos (tantos como el límite actual)
+    for _ in range(2):
+        scheduler.call(Flaky())
+    assert scheduler.limit == 3
+    for _ in range(3):
+        scheduler.call(Flaky())
+    assert scheduler.limit == 4
+
+
+def test_backoff_is_exponential_with_jitter():
+    scheduler = _scheduler(base_delay=1.0, max_delay=8.0)
+    error = _error(503)
+
+    for attempt, ceiling in [(0, 1.0), (1, 2.0), (2, 4.0), (3, 8.0), (6, 8.0)]:
+        delays = [scheduler._backoff_delay(attempt, error) for _ in range(50)]
+        assert all(ceiling / 2 <= delay <= ceiling for delay in delays)
+
+
+def test_backoff_honours_retry_after_up_to_the_maximum():
+    scheduler = _scheduler(base_delay=0.5, max_delay=8.0)
+
+    assert scheduler._backoff_delay(0, _error(429, 'rateLimitExceeded', retry_after=3)) == 3.0
+    assert scheduler._backoff_delay(0, _error(429, 'rateLimitExceeded', retry_after=60)) == 8.0
+
+
+def test_crawl_with_injected_errors_matches_a_clean_crawl(corpus, make_topic_model, tmp_path):
+    service, parent_id = corpus
+    clean = make_topic_model(service, manifest_path=str(tmp_path / 'limpio.json')).process_all_diplomados(parent_id)
+
+    service.error_rate = 0.2
+    topic_model = make_topic_model(service, drive_scheduler=_scheduler(max_retries=10))
+    df = topic_model.process_all_diplomados(parent_id)
+
+    assert service.injected_errors > 0
+    assert topic_model.drive_scheduler.retries > 0
+    assert topic_model.drive_scheduler.exhausted == 0
+    assert not topic_model.crawl_incomplete
+    assert df.equals(clean)
+
+
+def test_abandoned_requests_leave_the_crawl_incomplete_and_the_manifest_unpruned(corpus, make_topic_model):
+    service, parent_id = corpus
+    make_topic_model(service).process_all_diplomados(parent_id)
+
+    service.error_rate = 0.3
+    topic_model = make_topic_model(service, drive_scheduler=_scheduler(max_retries=0))
+    topic_model.process_all_diplomados(parent_id)
+
+    assert topic_model.drive_scheduler.exhausted > 0
+    assert topic_model.crawl_incomplete
+    with open(topic_model.manifest_path, 'r', encoding='utf-8') as f:
+        assert set(json.load(f)['files']) == set(sistematizaciones(service))
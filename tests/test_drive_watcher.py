@@ -0,0 +1,151 @@
+import os
+
+import pytest
+
+from conftest import sistematizaciones
+from drive_watcher import DriveWatcher
+from results_store import ResultsStore
+from synthetic_corpus import generar_docx
+
+
+@pytest.fixture
+def watcher(corpus, make_topic_model, tmp_path):
+    service, parent_id = corpus
+    watcher = DriveWatcher(
+        make_topic_model(service), parent_id, ResultsStore(str(tmp_path / 'resultados.sqlite')),
+        state_path=str(tmp_path / 'estado_cambios.json')
+    )
+    watcher.start()
+    return watcher
+
+
+def test_start_saves_results_and_folder_tree(corpus, watcher):
+    service, _ = corpus
+    df = watcher.results_store.load().df
+
+    assert len(df) == len(sistematizaciones(service))
+    assert set(watcher.state['archivos'].values()) == set(df.index)
+    assert os.path.exists(watcher.state_path)
+
+
+def test_tick_without_changes_does_nothing(corpus, watcher):
+    service, _ = corpus
+    downloads = service.calls.get('get_media', 0)
+
+    summary = watcher.tick()
+
+    assert summary['cambios'] == 0
+    assert service.calls.get('get_media', 0) == downloads
+
+
+def test_tick_reprocesses_only_the_changed_group(corpus, watcher):
+    service, _ = corpus
+    before = watcher.results_store.load().df
+    file_id = sistematizaciones(service)[4]
+    service.update_file(file_id, generar_docx("Convivencia escolar en secundaria", "mediación de conflictos " * 10))
+    downloads = service.calls.get('get_media', 0)
+
+    summary = watcher.tick()
+
+    after = watcher.results_store.load().df
+    assert summary['grupos'] == 1 and not summary['recorrido_completo']
+    assert service.calls.get('get_media', 0) - downloads == 1
+    assert after.loc[file_id, 'Título del proyecto'] == "Convivencia escolar en secundaria"
+    assert list(after.index) == list(before.index)
+    assert after.drop(index=file_id).equals(before.drop(index=file_id))
+
+
+def test_tick_removes_a_deleted_document(corpus, watcher):
+    service, _ = corpus
+    file_id = sistematizaciones(service)[2]
+    service.delete_file(file_id)
+
+    watcher.tick()
+
+    assert file_id not in watcher.results_store.load().df.index
+    assert file_id not in watcher.topic_model.manifest['files']
+    assert file_id not in watcher.state['archivos'].values()
+
+
+def test_new_group_folder_triggers_a_full_crawl(corpus, watcher, make_topic_model, tmp_path):
+    service, parent_id = corpus
+    modulo_id = watcher.state['estructura'][-1]
+    group_id = service.add_folder("Grupo 99", modulo_id)
+    file_id = service.add_file("SISTEMATIZACION GRUPO 99.docx", group_id,
+                               generar_docx("Proyecto del grupo noventa y nueve", "huerto escolar " * 20))
+
+    summary = watcher.tick()
+
+    df = watcher.results_store.load().df
+    assert summary['recorrido_completo']
+    assert file_id in df.index
+    reference = make_topic_model(service, manifest_path=str(tmp_path / 'referencia.json'))
+    assert df.equals(reference.process_all_diplomados(parent_id))
+
+
+def test_incomplete_crawl_is_not_recorded(corpus, make_topic_model, tmp_path):
+    service, parent_id = corpus
+    topic_model = make_topic_model(service)
+    list_all_files = topic_model._list_all_files
+    calls = []
+
+    def flaky_list(query, fields="files(id, name)"):
+        calls.append(query)
+        if len(calls) == 3:
+            raise ConnectionError("caída simulada")
+        return list_all_files(query, fields)
+
+    topic_model._list_all_files = flaky_list
+    watcher = DriveWatcher(topic_model, parent_id, ResultsStore(str(tmp_path / 'resultados.sqlite')),
+                           state_path=str(tmp_path / 'estado_cambios.json'))
+
+    with pytest.raises(Exception, match="incompleto"):
+        watcher.start()
+
+    assert topic_model.crawl_incomplete
+    assert watcher.results_store.load() is None
+    assert not os.path.exists(watcher.state_path)
+
+
+def test_failed_download_keeps_the_old_row_and_the_token(corpus, watcher):
+    service, _ = corpus
+    before = watcher.results_store.load().df
+    token = watcher.state['page_token']
+    file_id = sistematizaciones(service)[4]
+    service.update_file(file_id, generar_docx("Convivencia escolar en secundaria", "mediación de conflictos " * 10))
+    topic_model = watcher.topic_model
+    download_file_content = topic_model.download_file_content
+    failures = []
+
+    def failing_once(requested_id, *args, **kwargs):
+        if requested_id == file_id and not failures:
+            failures.append(requested_id)
+            return None
+        return download_file_content(requested_id, *args, **kwargs)
+
+    topic_model.download_file_content = failing_once
+
+    with pytest.raises(Exception, match="No se pudieron procesar 1 documentos"):
+        watcher.tick()
+
+    assert watcher.results_store.load().df.equals(before)
+    assert watcher.state['page_token'] == token
+
+    # El siguiente tick vuelve a leer el cambio y esta vez lo aplica
+    watcher.tick()
+
+    assert watcher.results_store.load().df.loc[file_id, 'Título del proyecto'] == "Convivencia escolar en secundaria"
+    assert watcher.state['page_token'] != token
+
+
+def test_unreadable_document_is_not_recorded_as_empty(corpus, watcher):
+    service, _ = corpus
+    before = watcher.results_store.load().df
+    file_id = sistematizaciones(service)[4]
+    service.update_file(file_id, b"no es un docx")
+
+    with pytest.raises(Exception, match="No se pudieron procesar"):
+        watcher.tick()
+
+    assert watcher.results_store.load().df.equals(before)
+    assert watcher.topic_model.manifest['files'][file_id]['record'] is not None
@@ -0,0 +1,106 @@
+import sqlite3
+
+import numpy as np
+
+from embedding_cache import EmbeddingCache, CachedEmbedder
+
+
+def _vector(i):
+    return np.array([i, i + 0.5, -i], dtype=np.float32)
+
+
+def _entries(cache):
+    conn = sqlite3.connect(cache.index_path)
+    try:
+        return dict(conn.execute("SELECT key, slot FROM entries")), dict(conn.execute("SELECT key, last_used FROM entries"))
+    finally:
+        conn.close()
+
+
+class CountingEmbedder:
+    def __init__(self):
+        self.embedded = []
+
+    def embed(self, documents, verbose=False):
+        self.embedded.extend(documents)
+        return np.vstack([_vector(len(document)) for document in documents])
+
+
+def test_round_trip_and_misses(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), 'modelo', max_entries=4)
+    assert cache.get_many(['a']) == [None]
+
+    cache.put_many(['a', 'bb'], np.vstack([_vector(1), _vector(2)]))
+    found = cache.get_many(['bb', 'c', 'a'])
+
+    np.testing.assert_array_equal(found[0], _vector(2))
+    assert found[1] is None
+    np.testing.assert_array_equal(found[2], _vector(1))
+
+
+def test_keys_depend_on_the_model(tmp_path):
+    EmbeddingCache(str(tmp_path), 'modelo').put_many(['a'], np.vstack([_vector(1)]))
+
+    assert EmbeddingCache(str(tmp_path), 'otro-modelo').get_many(['a']) == [None]
+
+
+def test_reads_do_not_write_to_the_index(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), 'modelo', max_entries=4)
+    cache.put_many(['a', 'b'], np.vstack([_vector(1), _vector(2)]))
+    _, last_used = _entries(cache)
+
+    cache.get_many(['a', 'b'])
+
+    assert _entries(cache)[1] == last_used
+
+
+def test_full_cache_evicts_the_least_recently_used_and_reuses_their_slots(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), 'modelo', max_entries=4)
+    cache.put_many(['a', 'b', 'c', 'd'], np.vstack([_vector(i) for i in range(4)]))
+    slots_before, _ = _entries(cache)
+
+    # 'a' y 'c' se leyeron después de guardarse: se desalojan 'b' y 'd'
+    cache.get_many(['a', 'c'])
+    cache.put_many(['e', 'f'], np.vstack([_vector(10), _vector(11)]))
+
+    found = cache.get_many(['a', 'b', 'c', 'd', 'e', 'f'])
+    assert [vector is not None for vector in found] == [True, False, True, False, True, True]
+    np.testing.assert_array_equal(found[4], _vector(10))
+    np.testing.assert_array_equal(found[5], _vector(11))
+
+    slots_after, _ = _entries(cache)
+    assert sorted(slots_after.values()) == [0, 1, 2, 3]
+    assert {slots_after[cache._key('e')], slots_after[cache._key('f')]} == {
+        slots_before[cache._key('b')], slots_before[cache._key('d')]
+    }
+    assert cache._vectors.shape == (4, 3)
+
+
+def test_texts_already_cached_are_not_stored_twice_nor_evicted(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), 'modelo', max_entries=3)
+    cache.put_many(['a', 'b', 'c'], np.vstack([_vector(i) for i in range(3)]))
+
+    cache.put_many(['a', 'd', 'a'], np.vstack([_vector(0), _vector(3), _vector(0)]))
+
+    slots, _ = _entries(cache)
+    assert len(slots) == 3
+    assert cache._key('a') in slots and cache._key('d') in slots
+
+
+def test_cache_is_shared_across_instances(tmp_path):
+    EmbeddingCache(str(tmp_path), 'modelo', max_entries=4).put_many(['a'], np.vstack([_vector(1)]))
+
+    found = EmbeddingCache(str(tmp_path), 'modelo', max_entries=4).get_many(['a'])
+
+    np.testing.assert_array_equal(found[0], _vector(1))
+
+
+def test_cached_embedder_only_embeds_missing_texts(tmp_path):
+    embedder = CountingEmbedder()
+    cached = CachedEmbedder(embedder, EmbeddingCache(str(tmp_path), 'modelo', max_entries=10))
+
+    first = cached.embed(['uno', 'dos'])
+    second = cached.embed(['dos', 'tres', 'uno'])
+
+    assert embedder.embedded == ['uno', 'dos', 'tres']
+    np.testing.assert_array_equal(second, np.vstack([first[1], _vector(4), first[0]]))
@@ -0,0 +1,58 @@
+import math
+
+from conftest import sistematizaciones
+from main import KEYBERT_BATCH_SIZE
+
+# Textos con más de 100 caracteres (el mínimo para extraer keywords)
+TEXTS = [
+    "La huerta escolar permite a los estudiantes aprender ciencias naturales con proyectos de la comunidad. " * 2,
+    "Las secuencias didácticas de lectura fortalecen la comprensión lectora de los alumnos de primaria. " * 2,
+    "La evaluación formativa acompaña a las y los docentes en el diseño de estrategias de matemáticas. " * 2,
+    "El colectivo docente sistematiza la práctica de convivencia escolar mediante la investigación acción. " * 2,
+    "Los recursos digitales apoyan la escritura colaborativa de los jóvenes de secundaria en el aula. " * 2,
+]
+
+
+def test_batched_extraction_matches_one_document_at_a_time(corpus, make_topic_model):
+    service, _ = corpus
+    topic_model = make_topic_model(service)
+
+    batched = topic_model.extract_keywords_keybert_batch(TEXTS, top_n=5)
+    one_by_one = [topic_model.extract_keywords_keybert(text, top_n=5) for text in TEXTS]
+
+    assert batched == one_by_one
+    assert all(len(keywords) == 5 for keywords in batched)
+
+
+def test_batch_size_splits_the_model_calls(corpus, make_topic_model):
+    service, _ = corpus
+    topic_model = make_topic_model(service)
+
+    keywords = topic_model.extract_keywords_keybert_batch(TEXTS, top_n=3, batch_size=2)
+
+    assert topic_model.keybert_model.batches == [2, 2, 1]
+    assert keywords == topic_model.extract_keywords_keybert_batch(TEXTS, top_n=3)
+
+
+def test_short_texts_get_no_keywords_and_skip_the_model(corpus, make_topic_model):
+    service, _ = corpus
+    topic_model = make_topic_model(service)
+
+    keywords = topic_model.extract_keywords_keybert_batch(["", "texto corto", TEXTS[0]], top_n=5)
+
+    assert keywords[0] == [] and keywords[1] == []
+    assert len(keywords[2]) == 5
+    assert topic_model.keybert_model.batches == [1]
+
+
+def test_a_run_extracts_the_whole_corpus_in_batches(corpus, make_topic_model):
+    service, parent_id = corpus
+    topic_model = make_topic_model(service)
+
+    df = topic_model.process_all_diplomados(parent_id, top_keywords=3)
+
+    n_documents = len(sistematizaciones(service))
+    assert len(df) == n_documents
+    assert len(topic_model.keybert_model.batches) == math.ceil(n_documents / KEYBERT_BATCH_SIZE)
+    assert (df['keyword 3'] != '').all()
+    assert (df['keyword 4'] == '').all() and (df['keyword 5'] == '').all()
@@ -0,0 +1,71 @@
+import pandas as pd
+
+from keyword_index import KeywordIndex
+
+
+def _results():
+    return pd.DataFrame({
+        'keyword 1': ['lectura', 'matemáticas', 'lectura', 'arte', ''],
+        'keyword 2': ['escritura', 'lectura', 'convivencia', 'lectura', None],
+        'keyword 3': ['oralidad', 'resolución de problemas', 'escritura', 'murales', 'huerto escolar'],
+        'keyword 4': ['', '', '', '', ''],
+        'keyword 5': ['', '', '', '', ''],
+    })
+
+
+def test_keywords_are_the_distinct_non_empty_values():
+    index = KeywordIndex(_results())
+
+    assert index.keywords == sorted({
+        'lectura', 'escritura', 'oralidad', 'matemáticas', 'resolución de problemas',
+        'convivencia', 'arte', 'murales', 'huerto escolar',
+    })
+
+
+def test_or_returns_projects_with_any_keyword():
+    index = KeywordIndex(_results())
+
+    assert index.match(['escritura', 'arte']) == (0, 2, 3)
+    assert index.match(['lectura'], mode='or') == (0, 1, 2, 3)
+
+
+def test_and_returns_projects_with_every_keyword():
+    index = KeywordIndex(_results())
+
+    assert index.match(['lectura', 'escritura'], mode='and') == (0, 2)
+    assert index.match(['lectura', 'escritura', 'oralidad'], mode='and') == (0,)
+    assert index.match(['lectura', 'huerto escolar'], mode='and') == ()
+
+
+def test_unknown_or_empty_queries_match_nothing():
+    index = KeywordIndex(_results())
+
+    assert index.match([]) == ()
+    assert index.match(['astronomía']) == ()
+    assert index.match(['astronomía', 'lectura'], mode='and') == ()
+    assert index.match(['astronomía', 'arte'], mode='or') == (3,)
+
+
+def test_match_agrees_with_scanning_the_dataframe():
+    df = _results()
+    index = KeywordIndex(df)
+    columns = [f'keyword {i}' for i in range(1, 6)]
+    queries = [['lectura', 'escritura'], ['arte', 'murales'], ['convivencia', 'oralidad', 'lectura']]
+
+    for keywords in queries:
+        rows = [set(df.loc[position, columns]) for position in range(len(df))]
+        expected_or = tuple(p for p, row in enumerate(rows) if row & set(keywords))
+        expected_and = tuple(p for p, row in enumerate(rows) if set(keywords) <= row)
+        assert index.match(keywords, mode='or') == expected_or
+        assert index.match(keywords, mode='and') == expected_and
+
+
+def test_repeated_queries_are_memoized_regardless_of_order():
+    index = KeywordIndex(_results(), memo_size=2)
+
+    first = index.match(['lectura', 'escritura'], mode='and')
+    assert index.match(['escritura', 'lectura'], mode='and') is first
+
+    index.match(['arte'])
+    index.match(['murales'])
+    assert len(index._memo) == 2
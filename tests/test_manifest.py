@@ -0,0 +1,129 @@
+import functools
+import json
+import os
+
+import pytest
+
+import main
+from conftest import sistematizaciones
+from pipeline import ProcessingPipeline
+from synthetic_corpus import generar_docx
+
+
+def _manifest_files(topic_model):
+    with open(topic_model.manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)['files']
+
+
+def test_first_run_records_every_document(corpus, make_topic_model):
+    service, parent_id = corpus
+    topic_model = make_topic_model(service)
+
+    df = topic_model.process_all_diplomados(parent_id)
+
+    file_ids = sistematizaciones(service)
+    assert len(df) == len(file_ids)
+    manifest = _manifest_files(topic_model)
+    assert set(manifest) == set(file_ids)
+    for file_id in file_ids:
+        assert manifest[file_id]['md5Checksum'] == service._files[file_id]['md5Checksum']
+        assert manifest[file_id]['record']['Título del proyecto'] == df.loc[file_id, 'Título del proyecto']
+
+
+def test_unchanged_documents_are_reused_without_downloading(corpus, make_topic_model):
+    service, parent_id = corpus
+    first = make_topic_model(service).process_all_diplomados(parent_id)
+
+    downloads = service.calls.get('get_media', 0)
+    topic_model = make_topic_model(service)
+    second = topic_model.process_all_diplomados(parent_id)
+
+    assert service.calls.get('get_media', 0) == downloads
+    assert topic_model.keybert_model.batches == []
+    assert second.equals(first)
+
+
+def test_modified_document_is_the_only_one_reprocessed(corpus, make_topic_model):
+    service, parent_id = corpus
+    make_topic_model(service).process_all_diplomados(parent_id)
+
+    file_id = sistematizaciones(service)[3]
+    service.update_file(file_id, generar_docx("Huerto escolar en la comunidad", "agua potable y huerto escolar " * 10))
+    downloads = service.calls.get('get_media', 0)
+
+    topic_model = make_topic_model(service)
+    df = topic_model.process_all_diplomados(parent_id)
+
+    assert service.calls.get('get_media', 0) - downloads == 1
+    assert topic_model.keybert_model.batches == [1]
+    assert df.loc[file_id, 'Título del proyecto'] == "Huerto escolar en la comunidad"
+    assert _manifest_files(topic_model)[file_id]['md5Checksum'] == service._files[file_id]['md5Checksum']
+
+
+def test_deleted_document_is_pruned_from_the_manifest(corpus, make_topic_model):
+    service, parent_id = corpus
+    first = make_topic_model(service).process_all_diplomados(parent_id)
+
+    file_id = sistematizaciones(service)[0]
+    service.delete_file(file_id)
+
+    topic_model = make_topic_model(service)
+    df = topic_model.process_all_diplomados(parent_id)
+
+    assert not topic_model.crawl_incomplete
+    assert file_id not in df.index
+    assert len(df) == len(first) - 1
+    assert file_id not in _manifest_files(topic_model)
+
+
+class Interrupted(Exception):
+    pass
+
+
+def test_interrupted_run_keeps_the_checkpointed_documents(corpus, make_topic_model, monkeypatch):
+    service, parent_id = corpus
+    monkeypatch.setattr(main, 'MANIFEST_CHECKPOINT_GROUPS', 10)
+    topic_model = make_topic_model(service, max_workers=1)
+    extract = topic_model.extraer_datos_documento_from_bytes
+    parsed = []
+
+    # El proceso se cae al analizar el documento 25
+    def crashing_extract(file_bytes, filename):
+        parsed.append(filename)
+        if len(parsed) == 25:
+            raise Interrupted()
+        return extract(file_bytes, filename)
+
+    topic_model.extraer_datos_documento_from_bytes = crashing_extract
+    with pytest.raises(Interrupted):
+        topic_model.process_all_diplomados(parent_id)
+
+    saved = _manifest_files(topic_model)
+    assert len(saved) == 20
+    downloads = service.calls.get('get_media', 0)
+
+    second = make_topic_model(service)
+    df = second.process_all_diplomados(parent_id)
+
+    n_documents = len(sistematizaciones(service))
+    assert service.calls.get('get_media', 0) - downloads == n_documents - len(saved)
+    assert second.keybert_model.batches == [n_documents - len(saved)]
+    assert len(df) == n_documents
+
+
+def test_pipeline_saves_the_manifest_after_each_keyword_batch(corpus, make_topic_model, monkeypatch):
+    service, parent_id = corpus
+    monkeypatch.setattr(main, 'ProcessingPipeline', functools.partial(ProcessingPipeline, embed_batch_size=10))
+    topic_model = make_topic_model(service, use_pipeline=True)
+    extract_embeddings = topic_model.keybert_model.extract_embeddings
+    saved_before_batch = []
+
+    def recording_extract_embeddings(docs, vectorizer=None):
+        path = topic_model.manifest_path
+        saved_before_batch.append(len(_manifest_files(topic_model)) if os.path.exists(path) else 0)
+        return extract_embeddings(docs, vectorizer=vectorizer)
+
+    topic_model.keybert_model.extract_embeddings = recording_extract_embeddings
+    topic_model.process_all_diplomados(parent_id)
+
+    assert saved_before_batch == [0, 10, 20]
@@ -0,0 +1,117 @@
+import json
+import threading
+
+import pytest
+
+
+def _run(make_topic_model, service, parent_id, manifest_path, top_keywords=5, **kwargs):
+    topic_model = make_topic_model(service, manifest_path=str(manifest_path), **kwargs)
+    df = topic_model.process_all_diplomados(parent_id, top_keywords=top_keywords)
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return topic_model, df, json.load(f)['files']
+
+
+@pytest.mark.parametrize('top_keywords', [5, 3])
+def test_pipeline_produces_the_same_records_as_the_sequential_path(corpus, make_topic_model, tmp_path, top_keywords):
+    service, parent_id = corpus
+
+    _, sequential, sequential_manifest = _run(
+        make_topic_model, service, parent_id, tmp_path / 'secuencial.json', top_keywords,
+        max_workers=1, use_pipeline=False
+    )
+    _, threaded, threaded_manifest = _run(
+        make_topic_model, service, parent_id, tmp_path / 'hilos.json', top_keywords,
+        max_workers=4, use_pipeline=False
+    )
+    _, pipelined, pipelined_manifest = _run(
+        make_topic_model, service, parent_id, tmp_path / 'pipeline.json', top_keywords,
+        max_workers=4, use_pipeline=True
+    )
+
+    assert not sequential.empty
+    assert threaded.equals(sequential)
+    assert pipelined.equals(sequential)
+    assert threaded_manifest == sequential_manifest
+    assert pipelined_manifest == sequential_manifest
+
+
+def test_pipeline_reuses_the_manifest_of_a_sequential_run(corpus, make_topic_model, tmp_path):
+    service, parent_id = corpus
+    manifest_path = tmp_path / 'manifest.json'
+    _, first, _ = _run(make_topic_model, service, parent_id, manifest_path, use_pipeline=False)
+    downloads = service.calls.get('get_media', 0)
+
+    topic_model, second, _ = _run(make_topic_model, service, parent_id, manifest_path, use_pipeline=True)
+
+    assert service.calls.get('get_media', 0) == downloads
+    assert topic_model.keybert_model.batches == []
+    assert second.equals(first)
+
+
+def test_cancelled_pipeline_stops_and_releases_its_downloads(corpus, make_topic_model, tmp_path):
+    service, parent_id = corpus
+    topic_model = make_topic_model(service, manifest_path=str(tmp_path / 'manifest.json'), use_pipeline=True)
+    cancel_event = threading.Event()
+    round_trip = service._round_trip
+
+    # Cancelar durante la quinta descarga
+    def cancel_on_fifth_download(kind, size=0):
+        if kind == 'get_media' and service.calls.get('get_media', 0) == 4:
+            cancel_event.set()
+        return round_trip(kind, size)
+
+    service._round_trip = cancel_on_fifth_download
+    df = topic_model.process_all_diplomados(parent_id, cancel_event=cancel_event)
+
+    assert df.empty
+    assert service.calls['get_media'] < len(topic_model._group_files)
+    assert topic_model.keybert_model.batches == []
+    assert topic_model.download_budget.in_use == 0
+
+
+def _failing_once(method):
+    calls = []
+    lock = threading.Lock()
+
+    def wrapper(*args, **kwargs):
+        with lock:
+            calls.append(None)
+            first = len(calls) == 1
+        if first:
+            raise RuntimeError("fallo simulado")
+        return method(*args, **kwargs)
+
+    return wrapper
+
+
+def _run_with_progress(topic_model, parent_id):
+    events = []
+    df = topic_model.process_all_diplomados(
+        parent_id, progress_callback=lambda event, data: events.append((event, data))
+    )
+    states = [data['estado'] for event, data in events if event == 'grupo']
+    return df, states
+
+
+def test_pipeline_survives_an_error_while_building_a_record(corpus, make_topic_model, tmp_path):
+    service, parent_id = corpus
+    topic_model = make_topic_model(service, manifest_path=str(tmp_path / 'manifest.json'), use_pipeline=True)
+    topic_model._build_group_result = _failing_once(topic_model._build_group_result)
+
+    df, states = _run_with_progress(topic_model, parent_id)
+
+    assert states.count('fallido') == 1
+    assert len(df) == states.count('procesado') == len(topic_model._group_files) - 1
+
+
+def test_pipeline_drains_the_queue_when_a_download_thread_has_no_client(corpus, make_topic_model, tmp_path):
+    service, parent_id = corpus
+    topic_model = make_topic_model(service, manifest_path=str(tmp_path / 'manifest.json'), use_pipeline=True)
+    topic_model._init_worker_service = _failing_once(topic_model._init_worker_service)
+
+    df, states = _run_with_progress(topic_model, parent_id)
+
+    # Los trabajos que tomó el hilo sin cliente se reportan como fallidos, el resto se procesa
+    assert len(df) == states.count('procesado')
+    assert states.count('procesado') + states.count('fallido') == len(topic_model._group_files)
+    assert topic_model.download_budget.in_use == 0
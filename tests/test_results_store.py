@@ -0,0 +1,72 @@
+import sqlite3
+
+import pandas as pd
+
+from results_store import ResultsStore
+
+
+def _results():
+    df = pd.DataFrame({
+        'ID de archivo': ['a1', 'b2', 'c3'],
+        'Diplomado': ['0. DIPLOMADO EN ARTE', '0. DIPLOMADO EN ARTE', '1. DIPLOMADO EN LECTURA'],
+        'Título del proyecto': ['Murales en la escuela', 'Teatro comunitario', 'Círculos de lectura'],
+        'keyword 1': ['murales', 'teatro', 'lectura'],
+        'keyword 2': ['arte', '', 'comprensión lectora'],
+    })
+    return df.set_index('ID de archivo')
+
+
+def test_round_trip_keeps_rows_columns_and_index(tmp_path):
+    store = ResultsStore(str(tmp_path / 'resultados.sqlite'))
+    df = _results()
+
+    assert store.save(df)
+    snapshot = store.load()
+
+    assert snapshot.df.equals(df)
+    assert snapshot.df.index.name == 'ID de archivo'
+    assert snapshot.created_at
+    assert snapshot.stamp == store.stamp()
+
+
+def test_missing_snapshot_loads_as_none(tmp_path):
+    store = ResultsStore(str(tmp_path / 'resultados.sqlite'))
+
+    assert store.stamp() is None
+    assert store.load() is None
+
+
+def test_saving_replaces_the_snapshot_and_changes_the_stamp(tmp_path):
+    store = ResultsStore(str(tmp_path / 'resultados.sqlite'))
+    store.save(_results())
+    first_stamp = store.stamp()
+
+    smaller = _results().iloc[:1]
+    store.save(smaller)
+
+    assert store.stamp() != first_stamp
+    assert store.load().df.equals(smaller)
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+def test_snapshot_of_another_version_is_ignored(tmp_path):
+    path = tmp_path / 'resultados.sqlite'
+    store = ResultsStore(str(path))
+    store.save(_results())
+
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("UPDATE meta SET value = '1' WHERE name = 'version'")
+    conn.close()
+
+    assert store.load() is None
+
+
+def test_a_run_can_be_saved_and_reloaded(corpus, make_topic_model, tmp_path):
+    service, parent_id = corpus
+    df = make_topic_model(service).process_all_diplomados(parent_id)
+    store = ResultsStore(str(tmp_path / 'resultados.sqlite'))
+
+    store.save(df)
+
+    assert store.load().df.equals(df)
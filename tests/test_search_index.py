@@ -0,0 +1,87 @@
+import re
+
+from search_index import BM25Index
+
+
+def tokenize(text):
+    return [token for token in re.findall(r'\w+', text.lower()) if len(token) > 2]
+
+
+DOCUMENTS = {
+    'a': {'fingerprint': '1', 'titulo': 'Huerto escolar', 'resumen': 'Un huerto para aprender ciencias naturales en la escuela'},
+    'b': {'fingerprint': '1', 'titulo': 'Círculos de lectura', 'resumen': 'Lectura en voz alta y comprensión lectora con las familias'},
+    'c': {'fingerprint': '1', 'titulo': 'Matemáticas en el mercado', 'resumen': 'Resolución de problemas con precios del mercado y del huerto'},
+    'd': {'fingerprint': '1', 'titulo': 'Radio escolar', 'resumen': 'Oralidad y escritura de guiones para la radio de la escuela'},
+}
+
+
+def _index(tmp_path, documents=DOCUMENTS):
+    index = BM25Index(str(tmp_path / 'indice_busqueda.sqlite'), tokenize)
+    index.update(documents)
+    return index
+
+
+def test_matching_documents_are_ranked_by_relevance(tmp_path):
+    index = _index(tmp_path)
+
+    results = index.search('huerto')
+
+    assert [doc_id for doc_id, _ in results] == ['a', 'c']
+    assert results[0][1] > results[1][1] > 0
+
+
+def test_title_terms_weigh_more_than_summary_terms(tmp_path):
+    # Mismo largo; 'teatro' está en el título de uno y en el resumen del otro
+    index = _index(tmp_path, {
+        'titulo': {'fingerprint': '1', 'titulo': 'Teatro', 'resumen': 'obra con estudiantes'},
+        'resumen': {'fingerprint': '1', 'titulo': 'Obra', 'resumen': 'teatro con estudiantes'},
+    })
+
+    scores = dict(index.search('teatro'))
+
+    assert scores['titulo'] > scores['resumen'] > 0
+
+
+def test_rare_terms_score_higher_than_common_ones(tmp_path):
+    index = _index(tmp_path)
+
+    scores = dict(index.search('escuela familias'))
+
+    assert scores['b'] > scores['a']
+
+
+def test_queries_without_known_terms_return_nothing(tmp_path):
+    index = _index(tmp_path)
+
+    assert index.search('astronomía') == []
+    assert index.search('') == []
+    assert index.search('la y de') == []
+
+
+def test_top_k_limits_the_results(tmp_path):
+    index = _index(tmp_path)
+
+    assert len(index.search('escuela huerto lectura radio', top_k=2)) == 2
+
+
+def test_update_only_reindexes_new_changed_and_removed_documents(tmp_path):
+    index = _index(tmp_path)
+    assert index.update(DOCUMENTS) == (0, 0)
+
+    documents = {doc_id: dict(doc) for doc_id, doc in DOCUMENTS.items() if doc_id != 'c'}
+    documents['b'] = {'fingerprint': '2', 'titulo': 'Cuentos de la comunidad', 'resumen': 'Narración oral con las familias'}
+    documents['e'] = {'fingerprint': '1', 'titulo': 'Mercado de trueque', 'resumen': 'Economía solidaria en el mercado local'}
+
+    assert index.update(documents) == (2, 1)
+    assert index.fingerprints() == {'a': '1', 'b': '2', 'd': '1', 'e': '1'}
+    assert [doc_id for doc_id, _ in index.search('mercado')] == ['e']
+    assert index.search('lectura') == []
+
+
+def test_index_persists_across_instances(tmp_path):
+    _index(tmp_path)
+
+    reopened = BM25Index(str(tmp_path / 'indice_busqueda.sqlite'), tokenize)
+
+    assert reopened.update(DOCUMENTS) == (0, 0)
+    assert [doc_id for doc_id, _ in reopened.search('lectura')] == ['b']
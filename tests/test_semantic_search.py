@@ -0,0 +1,47 @@
+import threading
+
+import numpy as np
+
+from conftest import FakeEmbedder, FakeKeyBERT
+from embedding_cache import CachedEmbedder, EmbeddingCache
+from main import SerializedEmbedder
+
+
+class BlockingKeyBERT(FakeKeyBERT):
+    """
+    FakeKeyBERT cuya extracción de keywords se detiene a mitad de lote hasta que se
+    libera, después de embeber los documentos con el modelo
+    """
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def extract_embeddings(self, docs, vectorizer=None):
+        self.model.embed(docs)
+        self.started.set()
+        assert self.release.wait(10)
+        return super().extract_embeddings(docs, vectorizer)
+
+
+def test_query_skips_the_embedding_cache_and_does_not_wait_for_a_keyword_batch(make_topic_model, corpus, tmp_path):
+    service, _ = corpus
+    cache = EmbeddingCache(str(tmp_path / 'cache'), 'fake')
+    keybert = BlockingKeyBERT(CachedEmbedder(SerializedEmbedder(FakeEmbedder(), threading.Lock()), cache))
+    topic_model = make_topic_model(service, keybert_model=keybert)
+    texts = [f"resumen {i} " + "huerto escolar con la comunidad educativa " * 5 for i in range(3)]
+
+    batch = threading.Thread(target=topic_model.extract_keywords_keybert_batch, args=(texts,))
+    batch.start()
+    try:
+        assert keybert.started.wait(10)
+        query_vector = topic_model.embed_query("huerto escolar")
+    finally:
+        keybert.release.set()
+        batch.join()
+
+    np.testing.assert_allclose(query_vector, FakeEmbedder().embed(["huerto escolar"])[0])
+    assert cache.get_many(["huerto escolar"]) == [None]
+    assert all(vector is not None for vector in cache.get_many(texts))
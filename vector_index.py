@@ -0,0 +1,240 @@
+import os
+import numpy as np
+
+# Versión del formato del índice. Incrementarla obliga a reconstruirlo
+VECTOR_INDEX_VERSION = 1
+
+# Iteraciones de k-means al construir el índice aproximado
+KMEANS_ITERATIONS = 10
+
+
+class VectorIndex:
+    """
+    Índice semántico con los embeddings de los resúmenes de todos los proyectos.
+
+    Los vectores se guardan normalizados en una matriz contigua (float32, o int8 con
+    una escala por fila) dentro de un único archivo .npz que se reemplaza de forma
+    atómica. Una búsqueda es un producto matriz-vector con NumPy; por encima de
+    ann_threshold documentos se agrega un índice aproximado tipo IVF (k-means) y solo
+    se comparan los documentos de las listas más cercanas a la consulta.
+    """
+
+    def __init__(self, path, model_name, dtype='float32', ann_threshold=20000, nprobe=8):
+        """
+        Args:
+            path (str): Ruta del archivo .npz del índice
+            model_name (str): Modelo con que se calcularon los embeddings
+            dtype (str): Tipo de la matriz: 'float32' o 'int8'
+            ann_threshold (int): Documentos a partir de los cuales se usa el índice
+                aproximado (None para buscar siempre de forma exacta)
+            nprobe (int): Listas del índice aproximado que se recorren por consulta
+        """
+        if dtype not in ('float32', 'int8'):
+            raise ValueError(f"Tipo de matriz no soportado: {dtype}")
+
+        self.path = path
+        self.model_name = model_name
+        self.dtype = dtype
+        self.ann_threshold = ann_threshold
+        self.nprobe = nprobe
+
+        self.ids = np.array([], dtype=object)
+        self.fingerprints = np.array([], dtype=object)
+        self.vectors = None
+        self.scales = None
+        self.centroids = None
+        self.list_offsets = None
+        self.list_members = None
+
+        self.load()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def load(self):
+        """
+        Carga el índice desde disco (si existe y es compatible)
+        """
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                if (int(data['version']) != VECTOR_INDEX_VERSION or
+                        str(data['model_name']) != self.model_name or
+                        str(data['dtype']) != self.dtype):
+                    print(f"Índice semántico {self.path} incompatible, se reconstruirá")
+                    return
+
+                self.ids = data['ids'].astype(object)
+                self.fingerprints = data['fingerprints'].astype(object)
+                self.vectors = np.ascontiguousarray(data['vectors'])
+                self.scales = data['scales'] if 'scales' in data else None
+                if 'centroids' in data:
+                    self.centroids = data['centroids']
+                    self.list_offsets = data['list_offsets']
+                    self.list_members = data['list_members']
+        except Exception as e:
+            print(f"Error al cargar el índice semántico {self.path}: {e}")
+
+    def _stored_vectors(self):
+        """
+        Vectores guardados como float32 (descuantizados si la matriz es int8)
+        """
+        if self.vectors is None:
+            return None
+        if self.scales is not None:
+            return self.vectors.astype(np.float32) * self.scales[:, None]
+        return self.vectors
+
+    def stale_ids(self, documents):
+        """
+        Documentos que hay que (re)embeber porque son nuevos o cambió su huella
+
+        Args:
+            documents (dict): doc_id -> huella
+
+        Returns:
+            list: doc_ids sin un vector vigente en el índice
+        """
+        indexed = dict(zip(self.ids, self.fingerprints))
+        return [doc_id for doc_id, fingerprint in documents.items() if indexed.get(doc_id) != fingerprint]
+
+    def update(self, documents, new_vectors):
+        """
+        Reconstruye la matriz con los vectores vigentes más los nuevos y la guarda
+
+        Args:
+            documents (dict): doc_id -> huella de todos los documentos actuales
+            new_vectors (dict): doc_id -> embedding de los documentos nuevos o modificados
+        """
+        previous = self._stored_vectors()
+        positions = {doc_id: i for i, doc_id in enumerate(self.ids)}
+
+        ids, fingerprints, rows = [], [], []
+        for doc_id, fingerprint in documents.items():
+            if doc_id in new_vectors:
+                rows.append(np.asarray(new_vectors[doc_id], dtype=np.float32))
+            elif doc_id in positions and self.fingerprints[positions[doc_id]] == fingerprint:
+                rows.append(previous[positions[doc_id]])
+            else:
+                continue
+            ids.append(doc_id)
+            fingerprints.append(fingerprint)
+
+        if rows:
+            matrix = np.vstack(rows).astype(np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix /= np.where(norms == 0, 1, norms)
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+
+        self.ids = np.array(ids, dtype=object)
+        self.fingerprints = np.array(fingerprints, dtype=object)
+
+        if self.dtype == 'int8' and len(matrix):
+            # Cuantización simétrica por fila
+            self.scales = (np.abs(matrix).max(axis=1) / 127.0).astype(np.float32)
+            self.scales[self.scales == 0] = 1.0
+            self.vectors = np.round(matrix / self.scales[:, None]).astype(np.int8)
+        else:
+            self.scales = None
+            self.vectors = np.ascontiguousarray(matrix)
+
+        if self.ann_threshold is not None and len(matrix) >= self.ann_threshold:
+            self._build_ivf(matrix)
+        else:
+            self.centroids = self.list_offsets = self.list_members = None
+
+        self.save()
+
+    def _build_ivf(self, matrix):
+        """
+        Agrupa los vectores con k-means esférico (índice aproximado tipo IVF)
+        """
+        n_lists = max(1, int(np.sqrt(len(matrix))))
+        rng = np.random.default_rng(0)
+        centroids = matrix[rng.choice(len(matrix), n_lists, replace=False)].copy()
+
+        for _ in range(KMEANS_ITERATIONS):
+            assignments = np.argmax(matrix @ centroids.T, axis=1)
+            for k in range(n_lists):
+                members = matrix[assignments == k]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    centroids[k] = centroid / (np.linalg.norm(centroid) or 1)
+
+        assignments = np.argmax(matrix @ centroids.T, axis=1)
+        order = np.argsort(assignments, kind='stable')
+        counts = np.bincount(assignments, minlength=n_lists)
+
+        self.centroids = centroids.astype(np.float32)
+        self.list_members = order.astype(np.int64)
+        self.list_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+    def save(self):
+        """
+        Guarda el índice en disco de forma atómica (archivo temporal + reemplazo)
+        """
+        arrays = {
+            'version': np.array(VECTOR_INDEX_VERSION),
+            'model_name': np.array(self.model_name),
+            'dtype': np.array(self.dtype),
+            'ids': np.array(self.ids, dtype=str),
+            'fingerprints': np.array(self.fingerprints, dtype=str),
+            'vectors': self.vectors,
+        }
+        if self.scales is not None:
+            arrays['scales'] = self.scales
+        if self.centroids is not None:
+            arrays['centroids'] = self.centroids
+            arrays['list_offsets'] = self.list_offsets
+            arrays['list_members'] = self.list_members
+
+        tmp_path = f"{self.path}.tmp.npz"
+        try:
+            np.savez(tmp_path, **arrays)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error al guardar el índice semántico {self.path}: {e}")
+
+    def search(self, query_vector, top_k=20):
+        """
+        Busca los documentos más similares (coseno) a un embedding de consulta
+
+        Args:
+            query_vector (np.ndarray): Embedding de la consulta
+            top_k (int): Número máximo de resultados
+
+        Returns:
+            list: Tuplas (doc_id, similitud) ordenadas de mayor a menor similitud
+        """
+        if self.vectors is None or not len(self.ids):
+            return []
+
+        query = np.asarray(query_vector, dtype=np.float32).ravel()
+        query = query / (np.linalg.norm(query) or 1)
+
+        if self.centroids is not None:
+            # Recorrer solo las listas de los centroides más cercanos
+            nprobe = min(self.nprobe, len(self.centroids))
+            nearest = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+            candidates = np.concatenate([
+                self.list_members[self.list_offsets[k]:self.list_offsets[k + 1]] for k in nearest
+            ])
+        else:
+            candidates = None
+
+        vectors = self.vectors if candidates is None else self.vectors[candidates]
+        scores = vectors @ query if self.scales is None else (vectors @ query) * (
+            self.scales if candidates is None else self.scales[candidates]
+        )
+
+        top_k = min(top_k, len(scores))
+        if top_k == 0:
+            return []
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best])]
+
+        positions = best if candidates is None else candidates[best]
+        return [(self.ids[position], float(scores[i])) for position, i in zip(positions, best)]